@@ -25,6 +25,23 @@ class Settings(BaseSettings):
     amazon_sp_api_role_arn: str = Field(default="", validation_alias="AMAZON_SP_API_ROLE_ARN")
     amazon_sp_api_app_id: str = Field(default="", validation_alias="AMAZON_SP_API_APP_ID")
     
+    # SP-API resilience: retries for throttling/5xx and per-store circuit breaker
+    spapi_max_retries: int = 3
+    spapi_retry_base_delay_seconds: float = 1.0
+    spapi_retry_max_delay_seconds: float = 30.0
+    spapi_circuit_failure_threshold: int = 5  # Consecutive failures before the store's circuit opens
+    spapi_circuit_cooldown_seconds: int = 300
+    spapi_max_workers: int = 16  # Threads running blocking SP-API library calls
+    price_feed_min_changes: int = 50  # Per-cycle price changes at which a store switches from PATCH to a JSON_LISTINGS_FEED
+    price_feed_poll_seconds: int = 120
+    
+    # ANY_OFFER_CHANGED notifications: "off", "memory" (in-process, tests) or "file" (directory of
+    # JSON message bodies, e.g. fed by a forwarder draining the SQS subscription queue)
+    offer_notification_backend: str = "off"
+    offer_notification_path: str = "./offer_notifications"
+    offer_notification_poll_seconds: int = 5
+    offer_notification_batch_size: int = 100
+    
     @computed_field
     @property
     def amazon_sp_api_redirect_uri(self) -> str:
@@ -51,7 +68,26 @@ class Settings(BaseSettings):
     smtp_pass: str | None = None
     from_email: str = "no-reply@example.com"
 
-    scheduler_enabled: bool = True
+    scheduler_enabled: bool = True  # Run the scheduler inside API processes; disable when `python -m app.worker` runs it
+    scheduler_mode: str = "local"  # "local": one in-process cycle; "distributed": workers lease work items from Postgres
+    scheduler_interval_minutes: int = 10  # Base per-product check interval when no plan tier applies
+    scheduler_tick_seconds: int = 60  # How often the cycle looks for due products
+    scheduler_max_products_per_store: int = 1000  # Due products priced per store per tick, most overdue first
+    poll_min_interval_seconds: int = 120  # Fastest re-check of a volatile listing; plans may raise it
+    poll_max_interval_seconds: int = 3600
+    poll_busy_competitor_count: int = 10  # Listings this crowded are checked at least every half base interval
+    scheduler_store_concurrency: int = 20  # Work units in flight within one cycle
+    scheduler_store_timeout_seconds: int = 300  # Per-store deadline across all its units in a cycle (per work item in distributed mode)
+    scheduler_max_cycle_seconds: int = 600  # A cycle stops dispatching after this; unfinished stores resume first next cycle
+    scheduler_batch_size: int = 100  # Due products per (store, batch) work unit
+    scheduler_max_tenant_wait_seconds: int = 30  # A store waiting this long for a worker is served next
+    scheduler_lease_seconds: int = 120  # Work-item lease, renewed by heartbeats; an expired lease is taken over
+    scheduler_max_attempts: int = 3  # Leases of one work item before it is marked FAILED
+    decision_cache_size: int = 50000  # Memoized repricing decisions kept per process (LRU); 0 disables the cache
+    decision_cache_ttl_seconds: int = 900  # A memoized decision is recomputed after this
+    pricing_processes: int = 1  # Worker processes for flash-repricing one large store; 1 prices in-process
+    pricing_process_min_products: int = 20000  # Stores smaller than this are always priced in-process
+    planner_quota_share: float = 0.8  # Share of each seller's getPricing quota the cycle may plan; the rest serves interactive calls
     development_mode: bool = False  # Set to True only in development via DEVELOPMENT_MODE env var
     public_registration_enabled: bool = True  # Set to False in production to disable public signups temporarily
 
@@ -125,6 +125,14 @@ class Product(Base):
     competitor_count: Mapped[int] = mapped_column(Integer, default=0)
     lowest_competitor_price: Mapped[float | None] = mapped_column(Float, nullable=True)
     
+    # Adaptive Polling (see services/poll_schedule.py)
+    next_check_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True, index=True)
+    check_interval_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    observed_lowest_price: Mapped[float | None] = mapped_column(Float, nullable=True)  # lowest competitor landed price at last check
+    deferred_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)  # left out of a cycle by the call planner; taken first next cycle
+    # Offers + pricing inputs of the last settled decision; a match skips persist/compute/push (see services/offer_snapshots.py)
+    offer_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -150,6 +158,100 @@ class CompetitorOffer(Base):
     shipping: Mapped[float] = mapped_column(Float, default=0.0)
     is_buybox: Mapped[bool] = mapped_column(Boolean, default=False)
 
+class OfferSnapshot(Base):
+    """Latest offers of a product packed into one row, replacing one CompetitorOffer row per offer"""
+    __tablename__ = "offer_snapshots"
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    captured_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    offer_count: Mapped[int] = mapped_column(Integer, default=0)
+    content_hash: Mapped[str] = mapped_column(String(64))  # sha256 of the packed offers
+    offers_packed: Mapped[str] = mapped_column(Text)  # JSON parallel arrays: seller_ids, prices, shipping, buybox
+
+class PriceFeedSubmission(Base):
+    """A JSON_LISTINGS_FEED of price updates awaiting Amazon's processing report"""
+    __tablename__ = "price_feed_submissions"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    store_id: Mapped[int] = mapped_column(ForeignKey("stores.id"), index=True)
+    marketplace_id: Mapped[str] = mapped_column(String(16))
+    feed_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    status: Mapped[str] = mapped_column(String(32), default="SUBMITTED", index=True)  # SUBMITTED, IN_QUEUE, IN_PROGRESS, RECONCILED, CANCELLED, FATAL
+    items_json: Mapped[str] = mapped_column(Text)  # per-SKU price changes keyed by feed messageId
+    message_count: Mapped[int] = mapped_column(Integer, default=0)
+    accepted_count: Mapped[int] = mapped_column(Integer, default=0)
+    error_count: Mapped[int] = mapped_column(Integer, default=0)
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    reconciled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+class RepricingWorkItem(Base):
+    """A (store, batch of due products) unit of a repricing cycle, leased by scheduler workers"""
+    __tablename__ = "repricing_work_items"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    store_id: Mapped[int] = mapped_column(ForeignKey("stores.id"), index=True)
+    product_ids_json: Mapped[str] = mapped_column(Text)
+    sequence: Mapped[int] = mapped_column(Integer, default=0)  # weighted-fair dispatch order within its cycle
+    status: Mapped[str] = mapped_column(String(16), default="PENDING", index=True)  # PENDING, LEASED, DONE, FAILED
+    lease_owner: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+class RepricingRun(Base):
+    """One repricing cycle (or distributed worker tick) with per-phase timings and counters"""
+    __tablename__ = "repricing_runs"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    mode: Mapped[str] = mapped_column(String(16), default="local")  # local, distributed
+    worker_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    duration_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    lag_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    skipped_triggers: Mapped[int] = mapped_column(Integer, default=0)
+    catch_up: Mapped[bool] = mapped_column(Boolean, default=False)
+    stores_total: Mapped[int] = mapped_column(Integer, default=0)
+    stores_unfinished: Mapped[int] = mapped_column(Integer, default=0)
+    products_processed: Mapped[int] = mapped_column(Integer, default=0)
+    products_repriced: Mapped[int] = mapped_column(Integer, default=0)
+    products_deferred: Mapped[int] = mapped_column(Integer, default=0)
+    products_unchanged: Mapped[int] = mapped_column(Integer, default=0)  # skipped on an unchanged offer fingerprint
+    buybox_changes: Mapped[int] = mapped_column(Integer, default=0)
+    spapi_calls: Mapped[int] = mapped_column(Integer, default=0)
+    throttled_calls: Mapped[int] = mapped_column(Integer, default=0)  # 429 responses, retried or not
+    errors: Mapped[int] = mapped_column(Integer, default=0)
+    # Phase seconds are summed over work units, so they can exceed the duration when units overlap
+    fetch_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    persist_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    compute_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    push_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    notify_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    stores: Mapped[list["RepricingRunStore"]] = relationship(back_populates="run", cascade="all, delete-orphan")
+
+class RepricingRunStore(Base):
+    """A store's share of one RepricingRun"""
+    __tablename__ = "repricing_run_stores"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    run_id: Mapped[int] = mapped_column(ForeignKey("repricing_runs.id", ondelete="CASCADE"), index=True)
+    store_id: Mapped[int] = mapped_column(Integer, index=True)
+    products_processed: Mapped[int] = mapped_column(Integer, default=0)
+    products_repriced: Mapped[int] = mapped_column(Integer, default=0)
+    products_deferred: Mapped[int] = mapped_column(Integer, default=0)
+    products_unchanged: Mapped[int] = mapped_column(Integer, default=0)  # skipped on an unchanged offer fingerprint
+    buybox_changes: Mapped[int] = mapped_column(Integer, default=0)
+    spapi_calls: Mapped[int] = mapped_column(Integer, default=0)
+    throttled_calls: Mapped[int] = mapped_column(Integer, default=0)
+    errors: Mapped[int] = mapped_column(Integer, default=0)
+    fetch_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    persist_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    compute_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    push_seconds: Mapped[float] = mapped_column(Float, default=0.0)
+    timed_out: Mapped[bool] = mapped_column(Boolean, default=False)
+    failed: Mapped[bool] = mapped_column(Boolean, default=False)
+    run: Mapped["RepricingRun"] = relationship(back_populates="stores")
+
 class PricingRule(Base):
     __tablename__ = "pricing_rules"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -5,11 +5,20 @@ from datetime import datetime, timedelta
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 
+from ..config import settings
 from ..database import get_db
 from ..models import PriceHistory, Product, Store, Notification, User, ErrorLog
 from ..services.admin_auth import get_admin_user
 from ..services.password import hash_password, verify_password
 from ..services.jwt_token import create_access_token
+from ..services.circuit_breaker import store_breakers
+from ..services.spapi_client_cache import spapi_client_cache
+from ..services.amazon_spapi import spapi_singleflight
+from ..services.poll_schedule import tier_backlog
+from ..services.fair_scheduler import tenant_lag
+from ..services.cycle_coordinator import cycle_coordinator
+from ..services.run_log import run_summary
+from ..services.decision_cache import decision_cache
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -574,9 +583,32 @@ def get_scheduler_status(
         Product.repricing_enabled == True
     ).group_by(Product.repricing_strategy).all()
     
+    breakers = store_breakers.snapshot()
+    store_ids_by_seller = {}
+    if breakers:
+        for store_id, seller_id in db.query(Store.id, Store.selling_partner_id).filter(
+            Store.selling_partner_id.in_(list(breakers.keys()))
+        ).all():
+            store_ids_by_seller.setdefault(seller_id, []).append(store_id)
+    
+    runs = run_summary(db, last_24h)
+    latest = runs["recent"][0] if runs["recent"] else None
+    if cycle_coordinator.snapshot()["running_since"]:
+        status = "running"
+    elif latest is None:
+        status = "idle" if settings.scheduler_enabled else "disabled"
+    elif latest["finished_at"] < datetime.utcnow() - timedelta(seconds=3 * settings.scheduler_tick_seconds):
+        status = "stalled"
+    else:
+        status = "healthy"
+    
     return {
-        "status": "running",
-        "cycle_interval_minutes": 10,
+        "status": status,
+        "mode": settings.scheduler_mode,
+        "cycle_interval_seconds": settings.scheduler_tick_seconds,
+        "cycle_interval_minutes": round(settings.scheduler_tick_seconds / 60, 2),
+        "last_run": latest,
+        "runs_24h": runs,
         "last_activity": last_price_change.ts if last_price_change else None,
         "statistics_24h": {
             "price_changes": recent_price_changes,
@@ -590,5 +622,25 @@ def get_scheduler_status(
         },
         "strategies": {
             strategy: count for strategy, count in strategy_stats
-        }
+        },
+        "circuit_breakers": {
+            "open": sum(1 for b in breakers.values() if b["state"] != "closed"),
+            "total_trips": sum(b["trip_count"] for b in breakers.values()),
+            "stores": [
+                {
+                    "selling_partner_id": seller_id,
+                    "store_ids": store_ids_by_seller.get(seller_id, []),
+                    **breaker
+                }
+                for seller_id, breaker in breakers.items()
+            ]
+        },
+        "cycles": cycle_coordinator.snapshot(),
+        "polling_backlog": tier_backlog(db),
+        "tenant_lag": sorted(
+            tenant_lag.snapshot().values(), key=lambda lag: lag["p95_lag_seconds"], reverse=True
+        ),
+        "spapi_clients": spapi_client_cache.stats(),
+        "spapi_coalescing": spapi_singleflight.stats(),
+        "decision_cache": decision_cache.stats()
     }
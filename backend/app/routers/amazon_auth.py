@@ -26,6 +26,7 @@ def get_db():
         db.close()
 from ..models import Store, User, OAuthState
 from ..services.amazon_spapi import AmazonOAuthFlow, get_spapi_config, create_spapi_client
+from ..services.spapi_client_cache import get_store_client, spapi_client_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth/amazon", tags=["Amazon Authentication"])
@@ -205,7 +206,7 @@ async def amazon_oauth_callback(
         
         # Test the connection (optional, don't fail if this fails)
         try:
-            spapi_client = create_spapi_client(refresh_token)
+            spapi_client = create_spapi_client(refresh_token, selling_partner_id=selling_partner_id)
             if spapi_client:
                 test_result = await spapi_client.test_connection()
                 if not test_result["success"]:
@@ -227,6 +228,7 @@ async def amazon_oauth_callback(
             logger.info(f"[AMAZON_OAUTH] Updating existing store {existing_store.id}")
             existing_store.refresh_token = refresh_token
             existing_store.is_active = True
+            spapi_client_cache.evict(existing_store.id)
             existing_store.last_sync = datetime.utcnow()
             store = existing_store
         else:
@@ -303,6 +305,7 @@ async def disconnect_amazon_store(
     store.last_sync = datetime.utcnow()
     
     db.commit()
+    spapi_client_cache.evict(store.id)
     
     return {
         "success": True,
@@ -350,7 +353,7 @@ async def test_store_connection(
         raise HTTPException(status_code=404, detail="Store not found")
     
     # Create SP-API client
-    spapi_client = create_spapi_client(store.refresh_token, store.region)
+    spapi_client = get_store_client(store)
     if not spapi_client:
         raise HTTPException(status_code=500, detail="Failed to create SP-API client")
     
@@ -2,6 +2,8 @@
 Repricing API Endpoints - Simple yet powerful
 """
 
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
@@ -10,6 +12,8 @@ from typing import List, Optional
 from ..database import get_db
 from ..models import Product
 from ..services.repricing_engine import RepricingEngine
+from ..services.decision_cache import decision_cache
+from ..services.pricing_core import strategy_for
 
 router = APIRouter(prefix="/repricing", tags=["repricing"])
 
@@ -58,7 +62,7 @@ async def set_repricing_strategy(
         )
     
     # Update products
-    updated_count = 0
+    updated_ids = []
     for product_id in request.product_ids:
         product = db.query(Product).filter(
             Product.id == product_id,
@@ -69,9 +73,11 @@ async def set_repricing_strategy(
             product.repricing_enabled = request.enabled
             product.repricing_strategy = request.strategy
             product.target_margin_percent = request.target_margin_percent
-            updated_count += 1
+            updated_ids.append(product.id)
     
     db.commit()
+    decision_cache.invalidate(updated_ids)
+    updated_count = len(updated_ids)
     
     return {
         'success': True,
@@ -112,7 +118,7 @@ async def test_repricing(
         'estimated_buybox_chance': result['estimated_buybox_chance'],
         'competitor_count': result['competitor_count'],
         'lowest_competitor_price': result.get('lowest_competitor_price'),
-        'strategy': product.repricing_strategy
+        'strategy': strategy_for(product)
     }
 
 
@@ -127,7 +133,8 @@ async def reprice_now(
     """
     
     engine = RepricingEngine(db)
-    results = engine.reprice_all_active_products(user_id)
+    # Blocking DB work and pricing; keep the event loop serving other requests
+    results = await asyncio.to_thread(engine.reprice_all_active_products, user_id)
     
     return {
         'success': True,
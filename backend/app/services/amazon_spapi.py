@@ -14,20 +14,57 @@ Authentication flow:
 6. Refresh token is stored in database for ongoing API access
 """
 import os
+import io
+import json
+import asyncio
+import functools
+import random
+import hashlib
 import httpx
-from typing import Optional, Dict, Any
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Hashable, Callable, Awaitable
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
+from ..config import settings
+from .rate_limiter import spapi_rate_limiter
+from .circuit_breaker import store_breakers, CircuitOpenError
+
 logger = logging.getLogger(__name__)
 
 try:
     from sp_api.api import Orders, Reports, Feeds, ListingsItems, CatalogItems, Products
     from sp_api.base import SellingApiException, Marketplaces
+    from sp_api.base.exceptions import (
+        SellingApiRequestThrottledException,
+        SellingApiServerException,
+        SellingApiTemporarilyUnavailableException,
+        SellingApiGatewayTimeoutException,
+    )
+    from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
     SPAPI_AVAILABLE = True
+    # Throttling, 5xx and network errors are worth retrying and count against the store's circuit
+    RETRYABLE_EXCEPTIONS = (
+        SellingApiRequestThrottledException,
+        SellingApiServerException,
+        SellingApiTemporarilyUnavailableException,
+        SellingApiGatewayTimeoutException,
+        RequestsConnectionError,
+        RequestsTimeout,
+    )
 except ImportError as e:
     logger.warning(f"SP-API package not properly installed: {e}")
     SPAPI_AVAILABLE = False
+    RETRYABLE_EXCEPTIONS = ()
+
+# Calls Amazon may have acted on even though they failed; only throttled
+# (never processed) attempts of these are retried, so a feed is never created twice
+NON_IDEMPOTENT_OPERATIONS = {"createFeed"}
+
+# Stats dict of the work unit SP-API is being called for; `_call` adds its
+# spapi_calls / throttled_calls / errors there as well (see run_log)
+spapi_call_counter: ContextVar[Optional[dict]] = ContextVar("spapi_call_counter", default=None)
 
 # Marketplace ID to currency mapping
 MARKETPLACE_CURRENCY = {
@@ -54,15 +91,141 @@ MARKETPLACE_CURRENCY = {
     "A1VC38T7YXB528": "JPY",  # JP
 }
 
+# Products API getPricing accepts at most 20 ASINs per request
+MAX_PRICING_ASINS_PER_REQUEST = 20
+
+# python-amazon-sp-api is blocking (requests); its calls run on this bounded pool
+# so async callers - FastAPI handlers and the scheduler loop - are never stalled
+_spapi_executor = ThreadPoolExecutor(
+    max_workers=settings.spapi_max_workers,
+    thread_name_prefix="spapi"
+)
+
+class SingleflightGroup:
+    """
+    Coalesces identical in-flight SP-API reads
+
+    Concurrent callers asking for the same key (seller, operation,
+    marketplace, ASIN/SKU) share one call and its result instead of each
+    spending quota on it. Only calls in flight are shared; nothing is cached
+    once a call finishes.
+
+    `do` wraps a single read. Batch readers `claim` their keys instead and
+    must `resolve` or `release` every key they own; waiters of a released
+    key get None and fetch it themselves.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.saved = 0
+
+    def _join(self, key: Hashable, loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Future]:
+        future = self._inflight.get(key)
+        # Futures are bound to their loop; callers on another loop (a thread's asyncio.run) fetch alone
+        if future is not None and future.get_loop() is loop and not future.done():
+            self.saved += 1
+            return future
+        return None
+
+    def _forget(self, key: Hashable, future: asyncio.Future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Await `fn()`, or the call already in flight for `key`"""
+        loop = asyncio.get_running_loop()
+        future = self._join(key, loop)
+        if future is None:
+            # The shared call runs as its own task, so one caller timing out does not cancel it for the others
+            future = loop.create_task(fn())
+            self._inflight[key] = future
+            self.calls += 1
+            future.add_done_callback(functools.partial(self._forget, key))
+        result = await asyncio.shield(future)
+        if result is None:
+            # A batch owner gave up on this key
+            return await fn()
+        # Result dicts are handed to several callers; give each its own copy
+        return dict(result)
+
+    def claim(self, keys: Iterable[Hashable]) -> Tuple[List[Hashable], Dict[Hashable, asyncio.Future]]:
+        """Split `keys` into (keys to fetch now, futures of keys already in flight)"""
+        loop = asyncio.get_running_loop()
+        owned: List[Hashable] = []
+        waiting: Dict[Hashable, asyncio.Future] = {}
+        for key in dict.fromkeys(keys):
+            future = self._join(key, loop)
+            if future is None:
+                future = loop.create_future()
+                self._inflight[key] = future
+                self.calls += 1
+                owned.append(key)
+            else:
+                waiting[key] = future
+        return owned, waiting
+
+    def resolve(self, key: Hashable, result: Optional[Dict[str, Any]]):
+        future = self._inflight.get(key)
+        if future is not None and not future.done():
+            future.set_result(result)
+            self._forget(key, future)
+
+    def release(self, keys: Iterable[Hashable]):
+        """Give up on any of `keys` still unresolved (waiters receive None)"""
+        for key in keys:
+            self.resolve(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "calls_saved": self.saved, "in_flight": len(self._inflight)}
+
+
+# Shared by every SP-API client in this process
+spapi_singleflight = SingleflightGroup()
+
 def get_marketplace_currency(marketplace_id: str) -> str:
     """Get currency code for a marketplace ID"""
     return MARKETPLACE_CURRENCY.get(marketplace_id, "USD")
 
 
+def build_price_patch(marketplace_id: str, new_price: float) -> Dict[str, Any]:
+    """Listings patch that replaces the B2C offer price (used by PATCH and JSON feeds)"""
+    # Correct format per Amazon SP-API documentation
+    # Derive correct currency from marketplace ID
+    return {
+        "op": "replace",
+        "path": "/attributes/purchasableOffer",  # camelCase per Amazon SP-API spec
+        "value": [
+            {
+                "audience": "ALL",  # B2C offer (standard customers)
+                "marketplaceId": marketplace_id,  # camelCase
+                "currency": get_marketplace_currency(marketplace_id),
+                "ourPrice": [  # camelCase
+                    {
+                        "schedule": [
+                            {
+                                "valueWithTax": new_price  # camelCase
+                            }
+                        ]
+                    }
+                ]
+            }
+        ]
+    }
+
+
 class AmazonSPAPIClient:
     """Amazon SP-API client for RepriceLab"""
     
-    def __init__(self, client_id: str, client_secret: str, refresh_token: str, region: str = "NA"):
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        refresh_token: str,
+        region: str = "NA",
+        selling_partner_id: Optional[str] = None,
+        auth_token_client_class=None
+    ):
         """
         Initialize SP-API client
         
@@ -71,6 +234,8 @@ class AmazonSPAPIClient:
             client_secret: Amazon SP-API client secret  
             refresh_token: LWA refresh token from OAuth flow
             region: Region (NA, EU, FE)
+            selling_partner_id: Seller the token belongs to (keys the rate limiter)
+            auth_token_client_class: Optional LWA token client shared by all API objects
         """
         if not SPAPI_AVAILABLE:
             raise RuntimeError("SP-API package not available")
@@ -79,6 +244,9 @@ class AmazonSPAPIClient:
         self.client_secret = client_secret
         self.refresh_token = refresh_token
         self.region = region
+        self.selling_partner_id = selling_partner_id
+        # SP-API quotas are per seller; fall back to a token fingerprint when the seller is unknown
+        self.rate_limit_key = selling_partner_id or hashlib.sha256(refresh_token.encode()).hexdigest()[:16]
         
         # Credentials dictionary format for python-amazon-sp-api
         # AWS credentials are REQUIRED for production SP-API calls
@@ -110,17 +278,104 @@ class AmazonSPAPIClient:
             raise RuntimeError("AWS credentials required for real SP-API calls")
         
         # Initialize API clients
+        api_kwargs = {'credentials': self.credentials}
+        if auth_token_client_class is not None:
+            api_kwargs['auth_token_client_class'] = auth_token_client_class
         try:
-            self.orders_api = Orders(credentials=self.credentials)
-            self.reports_api = Reports(credentials=self.credentials)
-            self.feeds_api = Feeds(credentials=self.credentials)
-            self.listings_api = ListingsItems(credentials=self.credentials)
-            self.catalog_api = CatalogItems(credentials=self.credentials)
-            self.products_api = Products(credentials=self.credentials)
+            self.orders_api = Orders(**api_kwargs)
+            self.reports_api = Reports(**api_kwargs)
+            self.feeds_api = Feeds(**api_kwargs)
+            self.listings_api = ListingsItems(**api_kwargs)
+            self.catalog_api = CatalogItems(**api_kwargs)
+            self.products_api = Products(**api_kwargs)
         except Exception as e:
             logger.error(f"Failed to initialize SP-API clients: {e}")
             raise
     
+    def is_circuit_open(self) -> bool:
+        """Whether this store's circuit breaker is currently rejecting calls (checking changes nothing)"""
+        return store_breakers.get(self.rate_limit_key).is_open()
+    
+    async def _call(self, operation: str, fn, *args, **kwargs):
+        """
+        Invoke a python-amazon-sp-api method under the seller's rate limit
+        
+        Waits for a token from the (selling_partner_id, operation) bucket and
+        re-tunes the bucket from the x-amzn-RateLimit-Limit header of the
+        response (or of the error, for throttled calls).
+        
+        The blocking library call runs on a bounded thread pool, so the
+        calling event loop keeps serving other work while it is in flight.
+        
+        Throttling, 5xx and network errors are retried with jittered
+        exponential backoff (only throttling for NON_IDEMPOTENT_OPERATIONS,
+        and `fn` is called afresh on every attempt). When retries are exhausted the failure counts
+        against the store's circuit breaker; while it is open, calls raise
+        CircuitOpenError without touching the network.
+        """
+        breaker = store_breakers.get(self.rate_limit_key)
+        if not breaker.allow():
+            raise CircuitOpenError(self.rate_limit_key, breaker.retry_in())
+        
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        try:
+            while True:
+                await spapi_rate_limiter.acquire(self.rate_limit_key, operation)
+                self._count("spapi_calls")
+                try:
+                    response = await loop.run_in_executor(
+                        _spapi_executor, functools.partial(fn, *args, **kwargs)
+                    )
+                except RETRYABLE_EXCEPTIONS as e:
+                    spapi_rate_limiter.update_from_headers(self.rate_limit_key, operation, getattr(e, 'headers', None))
+                    if isinstance(e, SellingApiRequestThrottledException):
+                        self._count("throttled_calls")
+                    unsafe_to_retry = (
+                        operation in NON_IDEMPOTENT_OPERATIONS
+                        and not isinstance(e, SellingApiRequestThrottledException)
+                    )
+                    if attempt >= settings.spapi_max_retries or unsafe_to_retry:
+                        self._count("errors")
+                        breaker.record_failure(e)
+                        raise
+                    delay = self._retry_delay(attempt)
+                    attempt += 1
+                    logger.warning(
+                        f"SP-API {operation} failed for {self.rate_limit_key} ({type(e).__name__}); "
+                        f"retry {attempt}/{settings.spapi_max_retries} in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                except SellingApiException as e:
+                    # Client errors (4xx other than 429) are not a sign of an unhealthy store
+                    spapi_rate_limiter.update_from_headers(self.rate_limit_key, operation, getattr(e, 'headers', None))
+                    self._count("errors")
+                    raise
+                spapi_rate_limiter.update_from_headers(self.rate_limit_key, operation, getattr(response, 'headers', None))
+                breaker.record_success()
+                return response
+        except BaseException:
+            # Client errors and cancellation record nothing; a trial call must still end
+            breaker.release_trial()
+            raise
+    
+    @staticmethod
+    def _count(counter: str):
+        """Requests sent, throttled (429) responses and calls that failed for good"""
+        unit_stats = spapi_call_counter.get()
+        if unit_stats is not None:
+            unit_stats[counter] = unit_stats.get(counter, 0) + 1
+    
+    @staticmethod
+    def _retry_delay(attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        cap = min(
+            settings.spapi_retry_max_delay_seconds,
+            settings.spapi_retry_base_delay_seconds * (2 ** attempt)
+        )
+        return random.uniform(0, cap)
+    
     async def test_connection(self) -> Dict[str, Any]:
         """Test the SP-API connection"""
         if not SPAPI_AVAILABLE:
@@ -131,7 +386,9 @@ class AmazonSPAPIClient:
             
         try:
             # Try to fetch orders to test connection (simplified for demo)
-            response = self.orders_api.get_orders(
+            response = await self._call(
+                "getOrders",
+                self.orders_api.get_orders,
                 marketplace_ids=["ATVPDKIKX0DER"],  # US marketplace
                 created_after="2024-01-01T00:00:00"
             )
@@ -164,35 +421,43 @@ class AmazonSPAPIClient:
                 "success": False,
                 "error": "SP-API package not available"
             }
-            
+        
+        if sku:
+            # Get specific listing by SKU, sharing any identical request in flight
+            return await spapi_singleflight.do(
+                (self.rate_limit_key, "getListingsItem", marketplace_id, seller_id, sku),
+                functools.partial(self._fetch_listing, marketplace_id, seller_id, sku)
+            )
+        
+        # For demo purposes, return success with message about bulk listing
+        # In production, you'd use Reports API or iterate through known SKUs
+        return {
+            "success": True,
+            "listings": [],
+            "message": "Bulk listing retrieval requires Reports API integration or SKU iteration"
+        }
+    
+    async def _fetch_listing(self, marketplace_id: str, seller_id: str, sku: str) -> Dict[str, Any]:
         try:
-            if sku:
-                # Get specific listing by SKU
-                response = self.listings_api.get_listings_item(
-                    seller_id=seller_id,
-                    sku=sku,
-                    marketplace_ids=[marketplace_id],
-                    included_data=["summaries", "attributes", "issues", "offers", "fulfillmentAvailability"]
-                )
-                
-                if hasattr(response, 'payload') and response.payload:
-                    return {
-                        "success": True,
-                        "listing": response.payload,
-                        "message": f"Retrieved listing for SKU: {sku}"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"No listing found for SKU: {sku}"
-                    }
-            else:
-                # For demo purposes, return success with message about bulk listing
-                # In production, you'd use Reports API or iterate through known SKUs
+            response = await self._call(
+                "getListingsItem",
+                self.listings_api.get_listings_item,
+                seller_id=seller_id,
+                sku=sku,
+                marketplace_ids=[marketplace_id],
+                included_data=["summaries", "attributes", "issues", "offers", "fulfillmentAvailability"]
+            )
+            
+            if hasattr(response, 'payload') and response.payload:
                 return {
                     "success": True,
-                    "listings": [],
-                    "message": "Bulk listing retrieval requires Reports API integration or SKU iteration"
+                    "listing": response.payload,
+                    "message": f"Retrieved listing for SKU: {sku}"
+                }
+            else:
+                return {
+                    "success": False,
+                    "error": f"No listing found for SKU: {sku}"
                 }
                 
         except Exception as e:
@@ -202,16 +467,27 @@ class AmazonSPAPIClient:
                 "error": str(e)
             }
     
+    def _pricing_key(self, asin: str, marketplace_id: str, item_condition: str) -> Tuple[str, ...]:
+        return (self.rate_limit_key, "getPricing", marketplace_id, item_condition, asin)
+    
     async def get_product_pricing(self, asin: str, marketplace_id: str, item_condition: str = "New") -> Dict[str, Any]:
-        """Get competitive pricing for a product"""
+        """Get competitive pricing for a product (shares any identical request in flight)"""
         if not SPAPI_AVAILABLE:
             return {
                 "success": False,
                 "error": "SP-API package not available"
             }
-            
+        
+        return await spapi_singleflight.do(
+            self._pricing_key(asin, marketplace_id, item_condition),
+            functools.partial(self._fetch_product_pricing, asin, marketplace_id, item_condition)
+        )
+    
+    async def _fetch_product_pricing(self, asin: str, marketplace_id: str, item_condition: str) -> Dict[str, Any]:
         try:
-            response = self.products_api.get_product_pricing_for_asins(
+            response = await self._call(
+                "getPricing",
+                self.products_api.get_product_pricing_for_asins,
                 asin_list=[asin],
                 item_condition=item_condition,
                 MarketplaceId=marketplace_id
@@ -236,16 +512,131 @@ class AmazonSPAPIClient:
                 "error": str(e)
             }
     
+    async def get_product_pricing_batch(
+        self,
+        asins: List[str],
+        marketplace_id: str,
+        item_condition: str = "New"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get competitive pricing for many ASINs, up to 20 per Products API call
+        
+        ASINs already being priced for this seller by another caller are
+        awaited instead of requested again.
+        
+        Args:
+            asins: ASINs to price (duplicates are requested once)
+            marketplace_id: Amazon marketplace ID
+            item_condition: Offer condition filter (New, Used, ...)
+            
+        Returns:
+            Dict keyed by ASIN. Each value has the same shape as the result of
+            get_product_pricing(), so callers can parse it per product.
+        """
+        unique_asins = list(dict.fromkeys(a for a in asins if a))
+        if not SPAPI_AVAILABLE:
+            return {
+                asin: {"success": False, "error": "SP-API package not available"}
+                for asin in unique_asins
+            }
+        
+        asin_by_key = {self._pricing_key(a, marketplace_id, item_condition): a for a in unique_asins}
+        owned, waiting = spapi_singleflight.claim(asin_by_key)
+        owned_asins = [asin_by_key[key] for key in owned]
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            for i in range(0, len(owned_asins), MAX_PRICING_ASINS_PER_REQUEST):
+                chunk = owned_asins[i:i + MAX_PRICING_ASINS_PER_REQUEST]
+                await self._fetch_pricing_chunk(chunk, marketplace_id, item_condition, results)
+                for asin in chunk:
+                    spapi_singleflight.resolve(self._pricing_key(asin, marketplace_id, item_condition), results[asin])
+        finally:
+            spapi_singleflight.release(owned)
+        
+        abandoned = []
+        for key, future in waiting.items():
+            result = await asyncio.shield(future)
+            if result is None:
+                abandoned.append(asin_by_key[key])
+            else:
+                results[asin_by_key[key]] = dict(result)
+        if abandoned:
+            results.update(await self.get_product_pricing_batch(abandoned, marketplace_id, item_condition))
+        
+        return results
+    
+    async def _fetch_pricing_chunk(
+        self,
+        chunk: List[str],
+        marketplace_id: str,
+        item_condition: str,
+        results: Dict[str, Dict[str, Any]]
+    ):
+        """One getPricing call for up to 20 ASINs; fills `results` for every ASIN in the chunk"""
+        try:
+            response = await self._call(
+                "getPricing",
+                self.products_api.get_product_pricing_for_asins,
+                asin_list=chunk,
+                item_condition=item_condition,
+                MarketplaceId=marketplace_id
+            )
+            payload = getattr(response, 'payload', None) or []
+            
+            for entry in payload:
+                asin = entry.get("ASIN") or (
+                    entry.get("Product", {})
+                    .get("Identifiers", {})
+                    .get("MarketplaceASIN", {})
+                    .get("ASIN")
+                )
+                if not asin:
+                    continue
+                if entry.get("status", "Success") != "Success":
+                    results[asin] = {
+                        "success": False,
+                        "error": f"Pricing status {entry.get('status')} for ASIN: {asin}"
+                    }
+                else:
+                    results[asin] = {
+                        "success": True,
+                        "pricing": [entry],
+                        "message": f"Retrieved pricing for ASIN: {asin}"
+                    }
+        except Exception as e:
+            logger.error(f"Failed to get pricing for {len(chunk)} ASINs: {e}")
+            for asin in chunk:
+                results[asin] = {
+                    "success": False,
+                    "error": str(e)
+                }
+            return
+        
+        for asin in chunk:
+            results.setdefault(asin, {
+                "success": False,
+                "error": f"No pricing found for ASIN: {asin}"
+            })
+    
     async def get_product_details(self, asin: str, marketplace_id: str) -> Dict[str, Any]:
-        """Get product catalog details"""
+        """Get product catalog details (shares any identical request in flight)"""
         if not SPAPI_AVAILABLE:
             return {
                 "success": False,
                 "error": "SP-API package not available"
             }
-            
+        
+        return await spapi_singleflight.do(
+            (self.rate_limit_key, "getCatalogItem", marketplace_id, asin),
+            functools.partial(self._fetch_product_details, asin, marketplace_id)
+        )
+    
+    async def _fetch_product_details(self, asin: str, marketplace_id: str) -> Dict[str, Any]:
         try:
-            response = self.catalog_api.get_catalog_item(
+            response = await self._call(
+                "getCatalogItem",
+                self.catalog_api.get_catalog_item,
                 marketplace_ids=[marketplace_id],
                 asin=asin
             )
@@ -293,37 +684,16 @@ class AmazonSPAPIClient:
         
         try:
             # Use Listings API to update price
-            # Correct format per Amazon SP-API documentation
-            # Derive correct currency from marketplace ID
             currency = get_marketplace_currency(marketplace_id)
             
             body = {
                 "productType": "PRODUCT",
-                "patches": [
-                    {
-                        "op": "replace",
-                        "path": "/attributes/purchasableOffer",  # camelCase per Amazon SP-API spec
-                        "value": [
-                            {
-                                "audience": "ALL",  # B2C offer (standard customers)
-                                "marketplaceId": marketplace_id,  # camelCase
-                                "currency": currency,
-                                "ourPrice": [  # camelCase
-                                    {
-                                        "schedule": [
-                                            {
-                                                "valueWithTax": new_price  # camelCase
-                                            }
-                                        ]
-                                    }
-                                ]
-                            }
-                        ]
-                    }
-                ]
+                "patches": [build_price_patch(marketplace_id, new_price)]
             }
             
-            response = self.listings_api.patch_listings_item(
+            response = await self._call(
+                "patchListingsItem",
+                self.listings_api.patch_listings_item,
                 sellerId=seller_id,
                 sku=sku,
                 marketplaceIds=[marketplace_id],
@@ -393,6 +763,114 @@ class AmazonSPAPIClient:
                 "sku": sku
             }
 
+    async def submit_listings_feed(self, feed_document: Dict[str, Any], marketplace_id: str) -> Dict[str, Any]:
+        """
+        Upload a JSON_LISTINGS_FEED document and create the feed
+        
+        Args:
+            feed_document: Feed body (header + messages)
+            marketplace_id: Amazon marketplace ID the feed applies to
+            
+        Returns:
+            Dict with success status, feed_id and feed_document_id
+        """
+        if not SPAPI_AVAILABLE:
+            return {
+                "success": False,
+                "error": "SP-API package not available"
+            }
+        
+        try:
+            content = json.dumps(feed_document).encode("utf-8")
+            # The upload reads the stream, so each retry needs a fresh one
+            document = await self._call(
+                "createFeedDocument",
+                lambda: self.feeds_api.create_feed_document(
+                    io.BytesIO(content), "application/json; charset=UTF-8"
+                )
+            )
+            feed_document_id = (document.payload or {}).get("feedDocumentId")
+            
+            response = await self._call(
+                "createFeed",
+                self.feeds_api.create_feed,
+                "JSON_LISTINGS_FEED",
+                feed_document_id,
+                marketplaceIds=[marketplace_id]
+            )
+            feed_id = (response.payload or {}).get("feedId")
+            if not feed_id:
+                return {
+                    "success": False,
+                    "error": "Amazon did not return a feedId"
+                }
+            
+            logger.info(
+                f"Submitted JSON_LISTINGS_FEED {feed_id} with "
+                f"{len(feed_document.get('messages', []))} messages for {marketplace_id}"
+            )
+            return {
+                "success": True,
+                "feed_id": feed_id,
+                "feed_document_id": feed_document_id
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to submit listings feed: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def get_feed_status(self, feed_id: str) -> Dict[str, Any]:
+        """Get a feed's processing status and result document ID (once DONE)"""
+        if not SPAPI_AVAILABLE:
+            return {
+                "success": False,
+                "error": "SP-API package not available"
+            }
+        
+        try:
+            response = await self._call("getFeed", self.feeds_api.get_feed, feed_id)
+            payload = response.payload or {}
+            return {
+                "success": True,
+                "processing_status": payload.get("processingStatus"),
+                "result_document_id": payload.get("resultFeedDocumentId")
+            }
+        except Exception as e:
+            logger.error(f"Failed to get feed {feed_id}: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    async def get_feed_result(self, result_document_id: str) -> Dict[str, Any]:
+        """Download and parse a feed processing report"""
+        if not SPAPI_AVAILABLE:
+            return {
+                "success": False,
+                "error": "SP-API package not available"
+            }
+        
+        try:
+            document = await self._call(
+                "getFeedDocument",
+                self.feeds_api.get_feed_result_document,
+                result_document_id
+            )
+            report = json.loads(document) if isinstance(document, (str, bytes)) else document
+            return {
+                "success": True,
+                "report": report
+            }
+        except Exception as e:
+            logger.error(f"Failed to get feed result document {result_document_id}: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
 class AmazonOAuthFlow:
     """Handle Amazon OAuth flow for SP-API"""
     
@@ -486,7 +964,12 @@ def get_spapi_config():
         "redirect_uri": settings.amazon_sp_api_redirect_uri
     }
 
-def create_spapi_client(refresh_token: str, region: str = "NA") -> Optional[AmazonSPAPIClient]:
+def create_spapi_client(
+    refresh_token: str,
+    region: str = "NA",
+    selling_partner_id: Optional[str] = None,
+    auth_token_client_class=None
+) -> Optional[AmazonSPAPIClient]:
     """Create SP-API client with stored credentials"""
     try:
         config = get_spapi_config()
@@ -503,7 +986,9 @@ def create_spapi_client(refresh_token: str, region: str = "NA") -> Optional[Amaz
             client_id=config["client_id"],
             client_secret=config["client_secret"], 
             refresh_token=refresh_token,
-            region=region
+            region=region,
+            selling_partner_id=selling_partner_id,
+            auth_token_client_class=auth_token_client_class
         )
     except Exception as e:
         logger.error(f"Failed to create SP-API client: {e}")
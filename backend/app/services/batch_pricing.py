@@ -0,0 +1,128 @@
+# backend/app/services/batch_pricing.py
+"""
+Vectorized repricing over a whole store's products at once
+
+`price_batch` applies the same rules as
+`pricing_core.calculate_optimal_price`, which stays the reference
+implementation, to columnar NumPy arrays: one element per product, with
+NaN for a missing value. It returns new prices, a should-reprice mask and
+Buy Box chance estimates. It builds no reason strings; callers that need a
+product's explanation ask the scalar engine for it.
+
+Results match the scalar engine exactly. NumPy and Python round near-exact
+half cents differently, so those few prices are rounded with round().
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+WIN_BUYBOX, MAXIMIZE_PROFIT, BOOST_SALES = 0, 1, 2
+STRATEGY_CODES = {"win_buybox": WIN_BUYBOX, "maximize_profit": MAXIMIZE_PROFIT, "boost_sales": BOOST_SALES}
+# Strategy of products whose repricing_strategy is NULL (the column default)
+DEFAULT_STRATEGY = "win_buybox"
+
+# Rules shared with pricing_core.calculate_optimal_price
+UNDERCUT = {WIN_BUYBOX: 0.01, MAXIMIZE_PROFIT: 0.05, BOOST_SALES: 0.10}
+DEFAULT_TARGET_MARGIN = 15.0
+MIN_PRICE_FALLBACK = 0.6  # x lowest landed price when no min_price is set
+MAX_PRICE_FALLBACK = 2.0  # x lowest landed price when no max_price is set
+REPRICE_THRESHOLD = 0.05
+
+
+def strategy_code(strategy: Optional[str]) -> int:
+    """Unknown strategies price like boost_sales, as the scalar engine's fall-through does"""
+    return STRATEGY_CODES.get(strategy, BOOST_SALES)
+
+
+class PricingBatch(NamedTuple):
+    """Engine inputs for n products as float64/int8 arrays of length n; NaN where a value is missing"""
+    price: np.ndarray
+    min_price: np.ndarray
+    max_price: np.ndarray
+    target_margin: np.ndarray
+    strategy: np.ndarray  # strategy codes
+    lowest_landed: np.ndarray  # NaN when the product has no competitors
+    buybox_landed: np.ndarray  # NaN when no competitor holds the Buy Box
+
+
+class BatchDecision(NamedTuple):
+    new_price: np.ndarray
+    should_reprice: np.ndarray
+    buybox_chance: np.ndarray
+
+
+def build_batch(products: Iterable, competitors_by_product: Dict[int, List]) -> PricingBatch:
+    """Columnar inputs from Products and their competitors (StoredOffers or offer objects)"""
+    rows = []
+    for p in products:
+        competitors = competitors_by_product.get(p.id) or []
+        buybox = next((c for c in competitors if c.is_buybox), None)
+        rows.append((
+            p.price,
+            p.min_price,
+            p.max_price,
+            p.target_margin_percent,
+            strategy_code(p.repricing_strategy or DEFAULT_STRATEGY),
+            min((c.price + c.shipping for c in competitors), default=None),
+            buybox.price + buybox.shipping if buybox else None,
+        ))
+    columns = list(zip(*rows)) if rows else [()] * 7
+    floats = [np.array(column, dtype=np.float64) for column in columns]
+    return PricingBatch(
+        price=floats[0],
+        min_price=floats[1],
+        max_price=floats[2],
+        target_margin=floats[3],
+        strategy=np.array(columns[4], dtype=np.int8),
+        lowest_landed=floats[5],
+        buybox_landed=floats[6],
+    )
+
+
+def _set(values: np.ndarray) -> np.ndarray:
+    """Where a nullable setting counts as configured (the scalar engine's truthiness test)"""
+    return ~np.isnan(values) & (values != 0)
+
+
+def _round_cents(values: np.ndarray) -> np.ndarray:
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    rounded[ties] = [round(float(v), 2) for v in values[ties]]
+    return rounded
+
+
+def price_batch(batch: PricingBatch) -> BatchDecision:
+    """New prices, should-reprice mask and Buy Box chance (0-100) for every product in `batch`"""
+    lowest = batch.lowest_landed
+    has_competitors = ~np.isnan(lowest)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        min_safe = np.where(_set(batch.min_price), batch.min_price, lowest * MIN_PRICE_FALLBACK)
+        max_safe = np.where(_set(batch.max_price), batch.max_price, lowest * MAX_PRICE_FALLBACK)
+
+        win_anchor = np.where(np.isnan(batch.buybox_landed), lowest, batch.buybox_landed)
+        margin = np.where(_set(batch.target_margin), batch.target_margin, DEFAULT_TARGET_MARGIN)
+        cost_based = min_safe * (1 + margin / 100)
+        profit_target = np.where(
+            cost_based < lowest,
+            np.minimum(cost_based * 1.05, lowest - UNDERCUT[MAXIMIZE_PROFIT]),
+            lowest - UNDERCUT[MAXIMIZE_PROFIT],
+        )
+        target = np.select(
+            [batch.strategy == WIN_BUYBOX, batch.strategy == MAXIMIZE_PROFIT],
+            [win_anchor - UNDERCUT[WIN_BUYBOX], profit_target],
+            lowest - UNDERCUT[BOOST_SALES],
+        )
+        target = np.maximum(min_safe, np.minimum(target, max_safe))
+
+        competitiveness = np.where(
+            target <= lowest, 100.0, np.maximum(0, 100 - ((target - lowest) / lowest * 100))
+        )
+        chance = np.trunc(np.minimum(100, competitiveness * 25 + 70))
+
+    return BatchDecision(
+        new_price=np.where(has_competitors, _round_cents(target), batch.price),
+        should_reprice=has_competitors & (np.abs(batch.price - target) >= REPRICE_THRESHOLD),
+        buybox_chance=np.where(has_competitors, chance, 100).astype(np.int64),
+    )
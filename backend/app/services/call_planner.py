@@ -0,0 +1,99 @@
+# backend/app/services/call_planner.py
+"""
+Quota-aware planning of a store's pricing calls for one cycle
+
+Before a store fetches anything, its due products are ordered by priority
+(previously deferred, lost Buy Box, repricing enabled, most stale) and
+admitted while the getPricing calls they need fit in the seller's budget:
+what its (selling_partner_id, getPricing) token bucket can serve before the
+next tick, minus a share kept free for interactive requests and
+notifications. Everything else is deferred and recorded, so it comes first
+next cycle instead of the cycle failing partway through on 429s.
+"""
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, NamedTuple
+
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Product
+from .amazon_spapi import MAX_PRICING_ASINS_PER_REQUEST
+from .rate_limiter import spapi_rate_limiter
+
+
+class PlanCandidate(NamedTuple):
+    """The columns of a due product the planner needs"""
+    id: int
+    asin: str
+    marketplace_id: Optional[str]
+    condition_type: Optional[str]
+    buybox_owning: bool
+    repricing_enabled: bool
+    deferred_at: Optional[datetime]
+
+
+class CyclePlan(NamedTuple):
+    call_budget: Optional[int]  # None when the client has no quota to respect (mock client)
+    calls_planned: int
+    product_ids: List[int]  # Work list, highest priority first
+    deferred_ids: List[int]
+
+
+def pricing_call_budget(rate_limit_key: str, horizon_seconds: float) -> int:
+    """getPricing calls the seller's bucket allows before the next tick, less the reserved share"""
+    capacity = spapi_rate_limiter.bucket(rate_limit_key, "getPricing").capacity_within(horizon_seconds)
+    return int(math.floor(capacity * settings.planner_quota_share))
+
+
+def _priority(candidate: PlanCandidate) -> Tuple:
+    return (
+        candidate.deferred_at is None,
+        candidate.deferred_at or datetime.min,
+        candidate.buybox_owning,
+        not candidate.repricing_enabled,
+    )
+
+
+def plan_store_cycle(
+    candidates: List[PlanCandidate],
+    call_budget: Optional[int],
+    default_marketplace_id: str,
+    max_products: Optional[int] = None
+) -> CyclePlan:
+    """
+    Choose which due products a store refreshes this cycle
+
+    `candidates` must be ordered most stale first; the sort below is stable,
+    so staleness breaks ties between equal priorities. Products sharing an
+    already admitted (asin, marketplace, condition) cost nothing extra, and
+    up to 20 ASINs of one (marketplace, condition) share a call.
+    """
+    asins_by_group: Dict[Tuple[str, str], set] = {}
+    calls = 0
+    planned: List[int] = []
+    deferred: List[int] = []
+
+    for candidate in sorted(candidates, key=_priority):
+        group = (candidate.marketplace_id or default_marketplace_id, candidate.condition_type or "New")
+        asins = asins_by_group.setdefault(group, set())
+        new_call = candidate.asin not in asins and len(asins) % MAX_PRICING_ASINS_PER_REQUEST == 0
+        full = max_products is not None and len(planned) >= max_products
+        if full or (new_call and call_budget is not None and calls >= call_budget):
+            deferred.append(candidate.id)
+            continue
+        if new_call:
+            calls += 1
+        asins.add(candidate.asin)
+        planned.append(candidate.id)
+
+    return CyclePlan(call_budget, calls, planned, deferred)
+
+
+def record_deferrals(db: Session, product_ids: List[int], now: datetime):
+    """Mark products deferred (keeping the earliest deferral) so the next plan takes them first"""
+    for i in range(0, len(product_ids), 1000):
+        db.query(Product).filter(
+            Product.id.in_(product_ids[i:i + 1000]),
+            Product.deferred_at.is_(None)
+        ).update({Product.deferred_at: now}, synchronize_session=False)
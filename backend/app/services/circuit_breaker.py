@@ -0,0 +1,164 @@
+# backend/app/services/circuit_breaker.py
+"""
+Circuit breakers for Amazon SP-API access
+
+One breaker per selling partner (i.e. per connected store). After enough
+consecutive transient failures (throttling, 5xx, network) the breaker opens
+and every further call for that store fails fast until the cooldown elapses.
+The first call after the cooldown is a trial, and the only call let through
+while it is in flight: success closes the breaker, failure re-opens it for
+another cooldown. A trial that ends without either (a client error, a
+cancelled call) is released so the next call becomes the trial, and one
+left in flight for a whole cooldown is presumed lost.
+"""
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling SP-API while a store's breaker is open"""
+    def __init__(self, key: str, retry_in: float):
+        self.key = key
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {key}; retry in {retry_in:.0f}s")
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a fixed cooldown"""
+
+    def __init__(self, key: str, failure_threshold: int = 5, cooldown_seconds: float = 300.0):
+        self.key = key
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trip_count = 0
+        self.opened_at: Optional[float] = None
+        self.last_tripped_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._trial_started_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a trial call through"""
+        if self.state != OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown_seconds - time.monotonic())
+
+    def _trial_in_flight(self) -> bool:
+        return (
+            self._trial_started_at is not None
+            and time.monotonic() - self._trial_started_at < self.cooldown_seconds
+        )
+
+    def is_open(self) -> bool:
+        """Whether a call would be rejected now; unlike `allow`, never claims the trial"""
+        with self._lock:
+            if self.state == OPEN:
+                return self.retry_in() > 0
+            return self.state == HALF_OPEN and self._trial_in_flight()
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now; the caller let through while half-open is the trial"""
+        with self._lock:
+            if self.state == OPEN:
+                if self.retry_in() > 0:
+                    return False
+                self.state = HALF_OPEN
+                logger.info(f"Circuit half-open for {self.key}; allowing a trial call")
+            if self.state == HALF_OPEN:
+                if self._trial_in_flight():
+                    return False
+                self._trial_started_at = time.monotonic()
+            return True
+
+    def release_trial(self):
+        """Let the next call be the trial when this one ended without a success or failure to record"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial_started_at = None
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"Circuit closed for {self.key}")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_started_at = None
+
+    def record_failure(self, error: Any = None):
+        with self._lock:
+            self._trial_started_at = None
+            self.consecutive_failures += 1
+            if error is not None:
+                self.last_error = str(error)[:500]
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self._trip()
+
+    def _trip(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.last_tripped_at = datetime.utcnow()
+        self.trip_count += 1
+        logger.warning(
+            f"🔌 Circuit opened for {self.key} after {self.consecutive_failures} consecutive failures "
+            f"(trip #{self.trip_count}, cooldown {self.cooldown_seconds:.0f}s)"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "trip_count": self.trip_count,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": round(self.retry_in(), 1),
+            "last_tripped_at": self.last_tripped_at,
+            "last_error": self.last_error,
+        }
+
+
+class CircuitBreakerRegistry:
+    """Lazily created breakers keyed by selling partner"""
+
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    breaker = CircuitBreaker(key, self.failure_threshold, self.cooldown_seconds)
+                    self._breakers[key] = breaker
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            items = list(self._breakers.items())
+        return {key: breaker.snapshot() for key, breaker in items}
+
+    def total_trips(self) -> int:
+        with self._lock:
+            return sum(b.trip_count for b in self._breakers.values())
+
+
+# Shared per-store breakers for every SP-API client in this process
+store_breakers = CircuitBreakerRegistry(
+    failure_threshold=settings.spapi_circuit_failure_threshold,
+    cooldown_seconds=settings.spapi_circuit_cooldown_seconds
+)
@@ -0,0 +1,130 @@
+# backend/app/services/cycle_coordinator.py
+"""
+Overlap protection and bookkeeping for repricing cycles
+
+Only one cycle runs per process at a time. Triggers that arrive while a
+cycle is still running (APScheduler reports them as max-instances skips or
+misfires) are counted and coalesced into a single catch-up cycle that starts
+as soon as the overrunning one ends, instead of being dropped silently.
+
+A cycle that exceeds `scheduler_max_cycle_seconds` stops dispatching new
+work; the stores it had not finished are checkpointed and dispatched first
+by the next cycle. Products it did price are not due again, so nothing is
+redone. Every cycle is recorded with its start, end, start lag and skipped
+triggers.
+"""
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable
+
+
+class CycleRun:
+    """One running cycle: its deadline and the stores it left unfinished"""
+
+    def __init__(self, cycle_id: int, started_at: datetime, lag_seconds: float,
+                 max_seconds: Optional[float], catch_up: bool):
+        self.cycle_id = cycle_id
+        self.started_at = started_at
+        self.lag_seconds = lag_seconds
+        self.deadline = started_at + timedelta(seconds=max_seconds) if max_seconds else None
+        self.catch_up = catch_up
+        self.stores_total = 0
+        self.unfinished: set = set()
+        # Set by CycleCoordinator.finish
+        self.finished_at: Optional[datetime] = None
+        self.duration_seconds = 0.0
+        self.skipped_triggers = 0
+
+    def overran(self, now: Optional[datetime] = None) -> bool:
+        return self.deadline is not None and (now or datetime.utcnow()) >= self.deadline
+
+
+class CycleCoordinator:
+    """
+    Serializes cycles within a process and keeps a short history of them
+
+    Thread-safe: APScheduler's executor runs cycles and its scheduler thread
+    reports skipped triggers.
+    """
+
+    def __init__(self, history: int = 50):
+        self._lock = threading.Lock()
+        self._running: Optional[CycleRun] = None
+        self._next_id = 1
+        self._last_started: Optional[datetime] = None
+        self._skipped = 0
+        self._catch_up_owed = False
+        self._checkpoint: List[int] = []
+        self._history: deque = deque(maxlen=history)
+
+    def begin(self, interval_seconds: float, max_seconds: Optional[float] = None) -> Optional[CycleRun]:
+        """Start a cycle, or return None (and count a skipped trigger) if one is running"""
+        now = datetime.utcnow()
+        with self._lock:
+            if self._running is not None:
+                self._skipped += 1
+                return None
+            lag = 0.0
+            if self._last_started is not None:
+                expected = self._last_started + timedelta(seconds=interval_seconds)
+                lag = max(0.0, (now - expected).total_seconds())
+            run = CycleRun(self._next_id, now, round(lag, 1), max_seconds, self._catch_up_owed)
+            self._next_id += 1
+            self._last_started = now
+            self._skipped = 0
+            self._catch_up_owed = False
+            self._running = run
+            return run
+
+    def note_skipped(self):
+        """A trigger fired while a cycle was running"""
+        with self._lock:
+            if self._running is not None:
+                self._skipped += 1
+
+    def resume_order(self, store_ids: Iterable[int]) -> List[int]:
+        """Order stores so the ones the previous cycle left unfinished come first"""
+        store_ids = list(store_ids)
+        present = set(store_ids)
+        with self._lock:
+            first = [s for s in self._checkpoint if s in present]
+        resumed = set(first)
+        return first + [s for s in store_ids if s not in resumed]
+
+    def finish(self, run: CycleRun, interval_seconds: float) -> bool:
+        """Record the cycle; True if triggers were skipped while it ran and a catch-up cycle is owed"""
+        now = datetime.utcnow()
+        with self._lock:
+            duration = (now - run.started_at).total_seconds()
+            skipped = self._skipped
+            run.finished_at, run.duration_seconds, run.skipped_triggers = now, duration, skipped
+            self._history.append({
+                "cycle_id": run.cycle_id,
+                "started_at": run.started_at,
+                "finished_at": now,
+                "duration_seconds": round(duration, 1),
+                "lag_seconds": run.lag_seconds,
+                "overran": duration > interval_seconds,
+                "skipped_triggers": skipped,
+                "catch_up": run.catch_up,
+                "stores_total": run.stores_total,
+                "stores_unfinished": len(run.unfinished),
+            })
+            self._checkpoint = sorted(run.unfinished)
+            self._running = None
+            self._skipped = 0
+            self._catch_up_owed = skipped > 0
+            return self._catch_up_owed
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running_since": self._running.started_at if self._running else None,
+                "checkpointed_stores": list(self._checkpoint),
+                "recent": [dict(record) for record in reversed(self._history)],
+            }
+
+
+# Cycles of the scheduler in this process
+cycle_coordinator = CycleCoordinator()
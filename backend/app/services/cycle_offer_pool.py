@@ -0,0 +1,100 @@
+# backend/app/services/cycle_offer_pool.py
+"""
+Per-cycle pool of shared offer snapshots
+
+Many tenants sell the same ASIN in the same marketplace. Within a repricing
+cycle each (asin, marketplace_id, condition) key is fetched once, by the
+first credentialed store that needs it, and every other store awaits the
+same snapshot instead of spending its own pricing quota.
+
+Pricing responses describe offers relative to the requester, so the
+fetching store's own offers are attributed to its seller id: for every other
+tenant they are ordinary competitor offers, and each tenant drops only its
+own offers before pricing. A response whose Buy Box is held by another
+seller cannot be shared, though: that seller may be one of the waiting
+tenants, which would then see its own offer as a rival. Such keys are
+withheld and every other tenant fetches them with its own credentials.
+"""
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+logger = logging.getLogger(__name__)
+
+OfferKey = Tuple[str, str, str]  # (asin, marketplace_id, condition)
+
+
+class OfferSnapshot:
+    __slots__ = ("offers", "fetched_by")
+
+    def __init__(self, offers: List[Dict[str, Any]], fetched_by: str):
+        self.offers = offers
+        self.fetched_by = fetched_by
+
+
+class CycleOfferPool:
+    """
+    Offer snapshots keyed by (asin, marketplace_id, condition)
+
+    Must be used from a single event loop (one repricing cycle). A store
+    `claim`s the keys it needs: keys nobody has claimed become its own to
+    fetch and `resolve`; the rest come back as futures owned by other stores.
+    Owners must `release` their keys when done, so waiters of a failed,
+    throttled or cancelled fetch get None and fall back to fetching
+    themselves.
+    """
+
+    def __init__(self):
+        self._snapshots: Dict[OfferKey, asyncio.Future] = {}
+        self.fetched = 0
+        self.shared = 0
+
+    def claim(self, keys: Iterable[OfferKey]) -> Tuple[List[OfferKey], Dict[OfferKey, asyncio.Future]]:
+        """Split `keys` into (keys to fetch now, futures of keys another store is fetching)"""
+        loop = asyncio.get_running_loop()
+        owned: List[OfferKey] = []
+        waiting: Dict[OfferKey, asyncio.Future] = {}
+        for key in dict.fromkeys(keys):
+            future = self._snapshots.get(key)
+            if future is None:
+                self._snapshots[key] = loop.create_future()
+                owned.append(key)
+            else:
+                waiting[key] = future
+        return owned, waiting
+
+    def resolve(self, key: OfferKey, snapshot: Optional[OfferSnapshot]):
+        future = self._snapshots.get(key)
+        if future is not None and not future.done():
+            future.set_result(snapshot)
+            if snapshot is not None:
+                self.fetched += 1
+
+    def withhold(self, key: OfferKey):
+        """The owner fetched `key` but its snapshot depends on the requester; waiters fetch their own"""
+        future = self._snapshots.get(key)
+        if future is not None and not future.done():
+            future.set_result(None)
+            self.fetched += 1
+
+    def release(self, keys: Iterable[OfferKey]):
+        """Give up on any of `keys` still unresolved (waiters receive None)"""
+        for key in keys:
+            future = self._snapshots.get(key)
+            if future is not None and not future.done():
+                future.set_result(None)
+                # Let a later store claim and fetch it again
+                del self._snapshots[key]
+
+    async def wait(self, waiting: Dict[OfferKey, asyncio.Future]) -> Dict[OfferKey, Optional[OfferSnapshot]]:
+        """Await snapshots fetched by other stores; None where the owner gave up"""
+        results: Dict[OfferKey, Optional[OfferSnapshot]] = {}
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+            if results[key] is not None:
+                self.shared += 1
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {"keys_fetched": self.fetched, "keys_shared": self.shared}
+
@@ -0,0 +1,107 @@
+# backend/app/services/decision_cache.py
+"""
+Process-wide memo of repricing decisions
+
+`RepricingEngine.calculate_optimal_price` is a pure function of the
+product's price, min/max, target margin and strategy and of its competitors'
+prices, shipping and Buy Box flags. Decisions are cached per product under a
+canonical hash of those inputs: competitors are sorted, and the Buy Box
+holder the engine would pick (the first flagged one) is hashed separately.
+Any change to an input is therefore a miss, never a stale hit. Entries are
+also bounded by an LRU size limit and a TTL, and are dropped explicitly when
+a product's pricing settings change.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Sequence, Set, Tuple
+
+from ..config import settings
+
+
+def decision_key(product, competitors: Sequence[Any], strategy: str) -> str:
+    offers = sorted((c.price, c.shipping, bool(c.is_buybox)) for c in competitors)
+    buybox = next(((c.price, c.shipping) for c in competitors if c.is_buybox), None)
+    raw = json.dumps([
+        product.price, product.min_price, product.max_price, product.target_margin_percent, strategy,
+        offers, buybox,
+    ])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class DecisionCache:
+    """Bounded LRU of engine decisions keyed by (product id, input hash), each valid for `ttl_seconds`"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[Dict, float]]" = OrderedDict()
+        self._by_product: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, product, competitors: Sequence[Any], strategy: str,
+                       compute: Callable[[], Dict]) -> Dict:
+        """The cached decision for these inputs, or `compute()` stored for next time"""
+        if self.max_entries <= 0:
+            return compute()
+        key = (product.id, decision_key(product, competitors, strategy))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                # Callers may annotate the result, so never hand out the cached dict itself
+                return dict(entry[0])
+            if entry:
+                self._drop(key)
+                self.evictions += 1
+            self.misses += 1
+
+        result = compute()
+        with self._lock:
+            self._entries[key] = (dict(result), now + self.ttl_seconds)
+            self._by_product.setdefault(key[0], set()).add(key[1])
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return result
+
+    def _drop(self, key: Tuple[int, str]):
+        self._entries.pop(key, None)
+        digests = self._by_product.get(key[0])
+        if digests is not None:
+            digests.discard(key[1])
+            if not digests:
+                del self._by_product[key[0]]
+
+    def invalidate(self, product_ids: Iterable[int]):
+        """Forget the decisions of products whose pricing settings changed"""
+        with self._lock:
+            for product_id in product_ids:
+                for digest in self._by_product.pop(product_id, ()):
+                    self._entries.pop((product_id, digest), None)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_product.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+decision_cache = DecisionCache(settings.decision_cache_size, settings.decision_cache_ttl_seconds)
@@ -0,0 +1,187 @@
+# backend/app/services/fair_scheduler.py
+"""
+Weighted fair queuing of repricing work across tenants
+
+A cycle's work is split into units of (store, batch of due products). Each
+store is a flow weighted by its owner's plan. Units are dispatched in
+start-time fair queuing order: a unit's virtual finish tag grows by
+batch size / weight, so a 100k-SKU store gets its fair share of workers
+without delaying every smaller store until it is done. A flow never has
+more than one unit in flight, and a flow that has waited longer than
+`max_wait_seconds` is served next regardless of its tag (starvation
+protection).
+
+`TenantLagTracker` records how late each store's products were served, for
+the admin scheduler status.
+"""
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Hashable, Callable, Awaitable, Iterable
+
+
+class _Flow:
+    __slots__ = ("key", "weight", "batches", "start", "finish", "busy", "waiting_since")
+
+    def __init__(self, key: Hashable, weight: float, batches: Iterable[list]):
+        self.key = key
+        self.weight = max(weight, 1e-6)
+        self.batches = deque(b for b in batches if b)
+        self.start = 0.0  # Virtual start tag of the head batch, fixed when it becomes ready
+        self.finish = 0.0
+        self.busy = False
+        self.waiting_since = time.monotonic()
+
+
+class WeightedFairQueue:
+    """
+    Single-loop WFQ dispatcher over per-tenant flows of work batches
+
+    `next` hands out the idle flow's head batch with the smallest virtual
+    finish tag; callers must report each batch with `done` (or stop the
+    flow with `drop`).
+    """
+
+    def __init__(self, max_wait_seconds: float = 60.0):
+        self.max_wait_seconds = max_wait_seconds
+        self.virtual_time = 0.0
+        self._flows: Dict[Hashable, _Flow] = {}
+        self._changed: Optional[asyncio.Event] = None
+
+    def add(self, key: Hashable, weight: float, batches: Iterable[list]):
+        flow = _Flow(key, weight, batches)
+        if flow.batches:
+            flow.start = self.virtual_time
+            self._flows[key] = flow
+
+    @staticmethod
+    def _tag(flow: _Flow) -> float:
+        return flow.start + len(flow.batches[0]) / flow.weight
+
+    def next(self) -> Optional[Tuple[Hashable, list]]:
+        """Claim the next (flow key, batch), or None if every pending flow is busy"""
+        now = time.monotonic()
+        ready = [f for f in self._flows.values() if not f.busy and f.batches]
+        if not ready:
+            return None
+        starved = [f for f in ready if now - f.waiting_since > self.max_wait_seconds]
+        if starved:
+            flow = min(starved, key=lambda f: f.waiting_since)
+        else:
+            flow = min(ready, key=self._tag)
+        flow.finish = self._tag(flow)
+        self.virtual_time = max(self.virtual_time, flow.start)
+        flow.busy = True
+        return flow.key, flow.batches.popleft()
+
+    def done(self, key: Hashable):
+        flow = self._flows.get(key)
+        if flow is None:
+            return
+        flow.busy = False
+        flow.waiting_since = time.monotonic()
+        if flow.batches:
+            flow.start = max(self.virtual_time, flow.finish)
+        else:
+            del self._flows[key]
+        self._notify()
+
+    def drop(self, key: Hashable):
+        """Discard a flow's remaining batches (store failed, lost auth or tripped its circuit)"""
+        flow = self._flows.get(key)
+        if flow is not None:
+            flow.batches.clear()
+
+    def pending(self) -> bool:
+        return bool(self._flows)
+
+    def remaining(self, key: Hashable) -> int:
+        """Batches of a flow not handed out yet"""
+        flow = self._flows.get(key)
+        return len(flow.batches) if flow is not None else 0
+
+    def _notify(self):
+        if self._changed is not None:
+            self._changed.set()
+
+    async def wait_for_change(self):
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        await self._changed.wait()
+        self._changed.clear()
+
+    async def run(self, concurrency: int, run_batch: Callable[[Hashable, list], Awaitable[Any]]):
+        """Drain every flow with `concurrency` workers calling `run_batch(key, batch)`"""
+
+        async def worker():
+            while self.pending():
+                item = self.next()
+                if item is None:
+                    await self.wait_for_change()
+                    continue
+                key, batch = item
+                try:
+                    await run_batch(key, batch)
+                finally:
+                    self.done(key)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+
+def chunk(items: list, size: int) -> List[list]:
+    size = max(1, size)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class TenantLagTracker:
+    """
+    How late each store's products were checked in the latest cycle
+
+    Lag is the time between a product's `next_check_at` and the moment its
+    batch started. Thread-safe: the scheduler thread records, admin requests
+    read.
+    """
+
+    def __init__(self):
+        self._current: Dict[Hashable, List[float]] = {}
+        self._latest: Dict[Hashable, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Hashable, lags: Iterable[float]):
+        with self._lock:
+            self._current.setdefault(key, []).extend(lags)
+
+    def finish_cycle(self, labels: Optional[Dict[Hashable, Dict[str, Any]]] = None):
+        """Publish the cycle's per-store lag percentiles and start a new cycle"""
+        labels = labels or {}
+        with self._lock:
+            current, self._current = self._current, {}
+            for key, lags in current.items():
+                if not lags:
+                    continue
+                ordered = sorted(lags)
+                self._latest[key] = {
+                    **labels.get(key, {}),
+                    "products": len(ordered),
+                    "p95_lag_seconds": round(ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)], 1),
+                    "max_lag_seconds": round(ordered[-1], 1),
+                    "measured_at": datetime.utcnow(),
+                }
+
+    def retain(self, keys: Iterable[Hashable]):
+        """Drop stores that are no longer scheduled"""
+        keep = set(keys)
+        with self._lock:
+            for key in [k for k in self._latest if k not in keep]:
+                del self._latest[key]
+
+    def snapshot(self) -> Dict[Hashable, Dict[str, Any]]:
+        with self._lock:
+            return {key: dict(value) for key, value in self._latest.items()}
+
+
+# Per-store lag of the scheduler in this process
+tenant_lag = TenantLagTracker()
@@ -0,0 +1,203 @@
+# backend/app/services/offer_notifications.py
+"""
+ANY_OFFER_CHANGED notification ingestion
+
+Amazon publishes an ANY_OFFER_CHANGED notification whenever one of the top
+20 offers on an ASIN we sell changes. Amazon delivers them to an SQS queue
+named in the seller's notification subscription; nothing in this process
+reads SQS directly. To connect it, forward each SQS message body into the
+directory of the "file" backend (OFFER_NOTIFICATION_BACKEND=file,
+OFFER_NOTIFICATION_PATH) and delete the SQS message once the file is
+written. The "memory" backend is for tests, and the default "off" leaves the
+polling cycle as the only repricing path. Every backend exposes the same
+`receive` / `ack` pair, so the consumer in the scheduler does not care where
+messages come from.
+
+`parse_any_offer_changed` turns a notification into the offer dicts that
+`determine_buybox` and `RepricingEngine.calculate_optimal_price` already
+consume from the polling path.
+"""
+import os
+import json
+import uuid
+import threading
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_TYPE = "ANY_OFFER_CHANGED"
+
+
+class QueuedMessage:
+    """A received message plus the handle needed to acknowledge it"""
+    __slots__ = ("body", "receipt")
+
+    def __init__(self, body: Any, receipt: Any):
+        self.body = body
+        self.receipt = receipt
+
+
+class NotificationQueue:
+    """Queue backend interface"""
+
+    def publish(self, body: Any):
+        raise NotImplementedError
+
+    def receive(self, max_messages: int = 100) -> List[QueuedMessage]:
+        """Take up to `max_messages` messages; they stay owned until acked"""
+        raise NotImplementedError
+
+    def ack(self, messages: List[QueuedMessage]):
+        """Remove processed messages from the queue"""
+        raise NotImplementedError
+
+
+class InMemoryNotificationQueue(NotificationQueue):
+    """Process-local queue, for tests and single-process local runs"""
+
+    def __init__(self):
+        self._messages: deque = deque()
+        self._lock = threading.Lock()
+
+    def publish(self, body: Any):
+        with self._lock:
+            self._messages.append(body)
+
+    def receive(self, max_messages: int = 100) -> List[QueuedMessage]:
+        with self._lock:
+            count = min(max_messages, len(self._messages))
+            return [QueuedMessage(self._messages.popleft(), None) for _ in range(count)]
+
+    def ack(self, messages: List[QueuedMessage]):
+        # Messages leave the deque on receive
+        pass
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+
+class FileNotificationQueue(NotificationQueue):
+    """
+    Directory of JSON files, one notification per file
+
+    Drop captured SQS message bodies into the directory to replay them.
+    Files are read oldest first and deleted on ack, so a crash before ack
+    re-delivers the message (at-least-once, like SQS).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def publish(self, body: Any):
+        name = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}.json"
+        tmp_path = os.path.join(self.directory, f".{name}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(body if isinstance(body, str) else json.dumps(body))
+        os.replace(tmp_path, os.path.join(self.directory, name))
+
+    def receive(self, max_messages: int = 100) -> List[QueuedMessage]:
+        names = sorted(n for n in os.listdir(self.directory) if n.endswith(".json"))
+        messages = []
+        for name in names[:max_messages]:
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path) as f:
+                    messages.append(QueuedMessage(f.read(), path))
+            except FileNotFoundError:
+                continue
+        return messages
+
+    def ack(self, messages: List[QueuedMessage]):
+        for message in messages:
+            try:
+                os.remove(message.receipt)
+            except FileNotFoundError:
+                pass
+
+
+def build_notification_queue(backend: str, path: str = "") -> Optional[NotificationQueue]:
+    """Create the queue backend named by settings.offer_notification_backend; None when off"""
+    if backend == "off":
+        return None
+    if backend == "memory":
+        return InMemoryNotificationQueue()
+    if backend == "file":
+        return FileNotificationQueue(path)
+    raise ValueError(f"Unknown offer notification backend: {backend}")
+
+
+def _amount(money: Optional[Dict[str, Any]]) -> float:
+    try:
+        return float((money or {}).get("Amount", 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_any_offer_changed(body: Any) -> Optional[Dict[str, Any]]:
+    """
+    Parse an ANY_OFFER_CHANGED notification (raw SQS body or decoded dict)
+
+    Returns a dict with seller_id (the subscribed seller), marketplace_id,
+    asin, condition, event_time, notification_id and `offers` in the
+    scheduler's offer format, or None if the message is not a usable
+    ANY_OFFER_CHANGED notification.
+    """
+    try:
+        message = json.loads(body) if isinstance(body, (str, bytes)) else body
+        if not isinstance(message, dict):
+            return None
+        if message.get("NotificationType", NOTIFICATION_TYPE) != NOTIFICATION_TYPE:
+            return None
+
+        notification = (message.get("Payload") or {}).get("AnyOfferChangedNotification") or {}
+        trigger = notification.get("OfferChangeTrigger") or {}
+        asin = trigger.get("ASIN")
+        if not asin or not notification.get("SellerId"):
+            return None
+
+        offers = [
+            {
+                "seller_id": offer.get("SellerId", f"SELLER_{i}"),
+                "price": _amount(offer.get("ListingPrice")),
+                "shipping": _amount(offer.get("Shipping")),
+                "is_buybox": bool(offer.get("IsBuyBoxWinner", False))
+            }
+            for i, offer in enumerate(notification.get("Offers") or [])
+        ]
+
+        metadata = message.get("NotificationMetadata") or {}
+        return {
+            "seller_id": notification["SellerId"],
+            "marketplace_id": trigger.get("MarketplaceId"),
+            "asin": asin,
+            "condition": (trigger.get("ItemCondition") or "new").lower(),
+            "event_time": trigger.get("TimeOfOfferChange") or message.get("EventTime") or "",
+            "notification_id": metadata.get("NotificationId"),
+            "offers": offers
+        }
+    except Exception as e:
+        logger.error(f"Error parsing ANY_OFFER_CHANGED notification: {e}")
+        return None
+
+
+def latest_per_listing(changes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep only the newest notification per (seller, marketplace, ASIN, condition)"""
+    latest: Dict[tuple, Dict[str, Any]] = {}
+    for change in changes:
+        key = (change["seller_id"], change["marketplace_id"], change["asin"], change["condition"])
+        current = latest.get(key)
+        if current is None or change["event_time"] >= current["event_time"]:
+            latest[key] = change
+    return list(latest.values())
+
+
+# Shared queue the notification consumer drains; None disables the consumer
+offer_notification_queue = build_notification_queue(
+    settings.offer_notification_backend, settings.offer_notification_path
+)
@@ -0,0 +1,162 @@
+# backend/app/services/offer_snapshots.py
+"""
+Compact, set-based storage of the latest competitor offers
+
+A product's latest competitor offers (the tenant's own offer is left out, as
+it is no competitor) are kept in a single offer_snapshots row: parallel
+arrays of seller ids, prices, shipping and Buy Box flags packed as JSON,
+plus a content hash and capture time. Offers are sorted before packing, so
+the hash does not depend on the order SP-API returned them in. Reading a
+product's offers is a single primary-key fetch, and the table has one row
+(and one index entry) per product instead of one per competitor.
+
+`OfferSnapshotWriter` stages a work unit's offers and upserts them at flush
+time in one executemany statement per SNAPSHOT_CHUNK products. No ORM
+objects are created for offers.
+
+`offer_fingerprint` hashes a product's offers together with the inputs the
+repricing engine reads from the product. The scheduler stores it once a
+decision is settled (no price change needed) and skips persisting,
+computing and pushing for the product while the fingerprint still matches;
+the snapshot is only touched so that it stays fresh.
+"""
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Iterable
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+from ..models import OfferSnapshot
+from .pricing_core import StoredOffer, pack_offers, unpack_offers
+
+# Snapshot rows per upsert statement
+SNAPSHOT_CHUNK = 1000
+
+
+def to_stored_offers(offers: List[dict]) -> List[StoredOffer]:
+    return [
+        o if isinstance(o, StoredOffer) else StoredOffer(
+            o.get("seller_id", ""),
+            float(o.get("price", 0.0)),
+            float(o.get("shipping", 0.0)),
+            bool(o.get("is_buybox", False)),
+        )
+        for o in offers
+    ]
+
+
+def content_hash(packed: str) -> str:
+    return hashlib.sha256(packed.encode()).hexdigest()
+
+
+def offer_fingerprint(product, offers: List[StoredOffer]) -> str:
+    """Hash of the sorted offers plus the product fields the repricing engine reads"""
+    inputs = json.dumps([
+        product.price, product.min_price, product.max_price,
+        product.repricing_enabled, product.repricing_strategy, product.target_margin_percent,
+    ])
+    return content_hash(pack_offers(offers) + inputs)
+
+
+def load_offers(db: Session, product_id: int, since: Optional[datetime] = None) -> Optional[List[StoredOffer]]:
+    """A product's latest offers, or None when there is no snapshot (captured at or after `since`)"""
+    snapshot = db.get(OfferSnapshot, product_id)
+    if snapshot is None or (since is not None and snapshot.captured_at < since):
+        return None
+    return unpack_offers(snapshot.offers_packed)
+
+
+def load_offers_many(db: Session, product_ids: Iterable[int],
+                     since: Optional[datetime] = None) -> Dict[int, List[StoredOffer]]:
+    """Latest offers of many products in one query per SNAPSHOT_CHUNK ids"""
+    product_ids = list(product_ids)
+    offers: Dict[int, List[StoredOffer]] = {}
+    for i in range(0, len(product_ids), SNAPSHOT_CHUNK):
+        query = db.query(OfferSnapshot.product_id, OfferSnapshot.offers_packed).filter(
+            OfferSnapshot.product_id.in_(product_ids[i:i + SNAPSHOT_CHUNK])
+        )
+        if since is not None:
+            query = query.filter(OfferSnapshot.captured_at >= since)
+        for product_id, packed in query:
+            offers[product_id] = unpack_offers(packed)
+    return offers
+
+
+def _upsert_statement(db: Session):
+    """INSERT ... ON CONFLICT (product_id) DO UPDATE, or None where unsupported"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(OfferSnapshot)
+    return stmt.on_conflict_do_update(
+        index_elements=[OfferSnapshot.product_id],
+        set_={
+            "captured_at": stmt.excluded.captured_at,
+            "offer_count": stmt.excluded.offer_count,
+            "content_hash": stmt.excluded.content_hash,
+            "offers_packed": stmt.excluded.offers_packed,
+        }
+    )
+
+
+class OfferSnapshotWriter:
+    """Stages fresh offers per product and upserts their snapshots in bulk on `flush`"""
+
+    def __init__(self):
+        self._staged: Dict[int, List[StoredOffer]] = {}
+        self._touched: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._staged) + len(self._touched)
+
+    def stage(self, product_id: int, offers: List[dict]) -> List[StoredOffer]:
+        """Queue a product's offers to replace its snapshot; returns them for the engine"""
+        stored = to_stored_offers(offers)
+        self._staged[product_id] = stored
+        return stored
+
+    def touch(self, product_id: int):
+        """Queue a product whose offers are unchanged: only its capture time is refreshed"""
+        self._touched.append(product_id)
+
+    def flush(self, db: Session, now: Optional[datetime] = None):
+        """Write the staged products' snapshots and refresh the touched ones; the caller commits"""
+        now = now or datetime.utcnow()
+        for i in range(0, len(self._touched), SNAPSHOT_CHUNK):
+            db.execute(
+                update(OfferSnapshot).where(
+                    OfferSnapshot.product_id.in_(self._touched[i:i + SNAPSHOT_CHUNK])
+                ).values(captured_at=now),
+                execution_options={"synchronize_session": False}
+            )
+        self._touched.clear()
+        if not self._staged:
+            return
+        rows = []
+        for product_id, offers in self._staged.items():
+            packed = pack_offers(offers)
+            rows.append({
+                "product_id": product_id,
+                "captured_at": now,
+                "offer_count": len(offers),
+                "content_hash": content_hash(packed),
+                "offers_packed": packed,
+            })
+        upsert = _upsert_statement(db)
+        for i in range(0, len(rows), SNAPSHOT_CHUNK):
+            chunk = rows[i:i + SNAPSHOT_CHUNK]
+            if upsert is not None:
+                db.execute(upsert, chunk)
+            else:
+                db.execute(
+                    delete(OfferSnapshot).where(OfferSnapshot.product_id.in_([r["product_id"] for r in chunk])),
+                    execution_options={"synchronize_session": False}
+                )
+                db.execute(insert(OfferSnapshot), chunk)
+        self._staged.clear()
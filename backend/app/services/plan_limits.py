@@ -12,6 +12,8 @@ PLAN_LIMITS = {
         'stores': 1,
         'api_calls_per_day': 1000,
         'repricing_frequency_minutes': 60,  # Once per hour
+        'min_check_interval_minutes': 15,  # Fastest a volatile listing is re-checked
+        'scheduling_weight': 1,  # Share of scheduler workers relative to other tenants
         'features': {
             'advanced_repricing': False,
             'competitor_intelligence': False,
@@ -25,6 +27,8 @@ PLAN_LIMITS = {
         'stores': 3,
         'api_calls_per_day': 10000,
         'repricing_frequency_minutes': 10,  # Current default
+        'min_check_interval_minutes': 2,
+        'scheduling_weight': 2,
         'features': {
             'advanced_repricing': True,
             'competitor_intelligence': False,
@@ -38,6 +42,8 @@ PLAN_LIMITS = {
         'stores': 10,
         'api_calls_per_day': 50000,
         'repricing_frequency_minutes': 5,  # More aggressive
+        'min_check_interval_minutes': 2,
+        'scheduling_weight': 4,
         'features': {
             'advanced_repricing': True,
             'competitor_intelligence': True,
@@ -51,6 +57,8 @@ PLAN_LIMITS = {
         'stores': None,  # Unlimited
         'api_calls_per_day': None,  # Unlimited
         'repricing_frequency_minutes': 5,
+        'min_check_interval_minutes': 2,
+        'scheduling_weight': 8,
         'features': {
             'advanced_repricing': True,
             'competitor_intelligence': True,
@@ -97,6 +105,21 @@ def get_plan_limits(plan: str) -> Dict[str, Any]:
     return PLAN_LIMITS.get(plan, PLAN_LIMITS['free'])
 
 
+def get_repricing_interval_seconds(plan: str) -> int:
+    """How often the plan's products are repriced, in seconds"""
+    return get_plan_limits(plan)['repricing_frequency_minutes'] * 60
+
+
+def get_min_check_interval_seconds(plan: str) -> int:
+    """Fastest the plan's volatile listings are re-checked, in seconds"""
+    return get_plan_limits(plan)['min_check_interval_minutes'] * 60
+
+
+def get_scheduling_weight(plan: str) -> float:
+    """Relative share of repricing workers the plan's stores get when tenants compete"""
+    return get_plan_limits(plan)['scheduling_weight']
+
+
 def check_limit(plan: str, limit_type: str, current_count: int) -> bool:
     """
     Check if current usage is within plan limits.
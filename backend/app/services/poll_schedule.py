@@ -0,0 +1,191 @@
+# backend/app/services/poll_schedule.py
+"""
+Adaptive per-product polling schedule
+
+Each product carries its own check interval and `next_check_at`. After every
+check the interval adapts to how the listing's market behaved: a lost Buy
+Box or a moving lowest price pulls the next check closer, a crowded listing
+is never left longer than half the base interval, and stable or
+out-of-stock listings back off. The scheduler tick only prices products
+that are due, most overdue first, so the fixed SP-API budget goes where
+prices actually move.
+
+The owner's plan sets the cadence: its `repricing_frequency_minutes` is the
+starting interval that stable listings back off from, and its
+`min_check_interval_minutes` is the fastest a volatile listing of that tier
+is checked, so paid tiers react sooner and free tiers cannot spend much more
+quota.
+"""
+import heapq
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterable, Tuple, NamedTuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import Product, User
+from .plan_limits import PLAN_LIMITS, get_repricing_interval_seconds, get_min_check_interval_seconds
+
+# Growth factor for listings whose market did not move since the last check
+BACKOFF_FACTOR = 1.5
+# Lowest-price changes smaller than this are treated as noise
+PRICE_EPSILON = 0.005
+
+
+class Cadence(NamedTuple):
+    """Interval bounds in seconds: starting interval, fastest and slowest check"""
+    base: int
+    low: int
+    high: int
+
+
+def default_cadence() -> Cadence:
+    return Cadence(
+        settings.scheduler_interval_minutes * 60,
+        settings.poll_min_interval_seconds,
+        settings.poll_max_interval_seconds
+    )
+
+
+def plan_cadence(plan: Optional[str]) -> Cadence:
+    """Cadence for a subscription tier: repricing frequency is the base, the plan's check floor the low"""
+    plan = plan or 'free'
+    base = get_repricing_interval_seconds(plan)
+    return Cadence(
+        base,
+        min(base, max(settings.poll_min_interval_seconds, get_min_check_interval_seconds(plan))),
+        max(settings.poll_max_interval_seconds, base)
+    )
+
+
+def next_check_interval(
+    current_interval: Optional[int],
+    *,
+    lost_buybox: bool,
+    price_moved: bool,
+    competitor_count: int,
+    in_stock: bool,
+    cadence: Optional[Cadence] = None
+) -> int:
+    """Seconds until a product should be checked again"""
+    base, low, high = cadence or default_cadence()
+    interval = current_interval or base
+
+    if not in_stock:
+        return high
+    if lost_buybox:
+        interval = low
+    elif price_moved:
+        interval = interval // 2
+    else:
+        interval = int(interval * BACKOFF_FACTOR)
+
+    if competitor_count >= settings.poll_busy_competitor_count:
+        interval = min(interval, base // 2)
+    return max(low, min(high, interval))
+
+
+def lowest_offer_price(offers: List[Dict[str, Any]]) -> Optional[float]:
+    """Lowest landed price (price + shipping) among `offers`"""
+    prices = [
+        float(o.get("price", 0.0) or 0.0) + float(o.get("shipping", 0.0) or 0.0)
+        for o in offers
+    ]
+    return min(prices) if prices else None
+
+
+def schedule_next_check(
+    product,
+    competitor_offers: List[Dict[str, Any]],
+    was_owning: bool,
+    now: Optional[datetime] = None,
+    cadence: Optional[Cadence] = None
+):
+    """
+    Record this check on `product` and set its next due time
+
+    `competitor_offers` excludes the tenant's own offers; `was_owning` is the
+    Buy Box state before this check was applied.
+    """
+    now = now or datetime.utcnow()
+    lowest = lowest_offer_price(competitor_offers)
+    previous = product.observed_lowest_price
+    if product.check_interval_seconds is None:
+        # First adaptive check: nothing to compare against yet
+        price_moved = False
+    elif previous is None or lowest is None:
+        price_moved = (previous is None) != (lowest is None)
+    else:
+        price_moved = abs(lowest - previous) > PRICE_EPSILON
+    in_stock = (product.stock_qty or 0) > 0 and (product.listing_status or "active") == "active"
+
+    interval = next_check_interval(
+        product.check_interval_seconds,
+        lost_buybox=was_owning and not product.buybox_owning,
+        price_moved=price_moved,
+        competitor_count=len(competitor_offers),
+        in_stock=in_stock,
+        cadence=cadence
+    )
+    product.observed_lowest_price = lowest
+    product.deferred_at = None
+    product.check_interval_seconds = interval
+    product.next_check_at = now + timedelta(seconds=interval)
+
+
+class DueQueue:
+    """
+    Min-heap of (next_check_at, product_id)
+
+    Products that were never checked (next_check_at is None) sort first.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, Optional[datetime]]] = ()):
+        self._heap: List[Tuple[datetime, int]] = [
+            (due_at or datetime.min, product_id) for product_id, due_at in entries
+        ]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, product_id: int, due_at: Optional[datetime]):
+        heapq.heappush(self._heap, (due_at or datetime.min, product_id))
+
+    def pop_due(self, now: datetime, limit: Optional[int] = None) -> List[int]:
+        """Product ids due at `now`, most overdue first, at most `limit` of them"""
+        due: List[int] = []
+        while self._heap and self._heap[0][0] <= now and (not limit or len(due) < limit):
+            due.append(heapq.heappop(self._heap)[1])
+        return due
+
+
+def tier_backlog(db: Session, now: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-plan polling backlog
+
+    `due` counts products whose next check has passed (or that were never
+    checked), `behind` those overdue by more than a full tier interval, and
+    `max_lag_seconds` is how late the most overdue product is.
+    """
+    now = now or datetime.utcnow()
+    backlog: Dict[str, Dict[str, Any]] = {}
+    for plan in PLAN_LIMITS:
+        interval = get_repricing_interval_seconds(plan)
+        due, behind, oldest = db.query(
+            func.count(Product.id),
+            func.count(Product.id).filter(
+                Product.next_check_at < now - timedelta(seconds=interval)
+            ),
+            func.min(Product.next_check_at)
+        ).join(User, User.id == Product.user_id).filter(
+            User.subscription_plan == plan,
+            or_(Product.next_check_at.is_(None), Product.next_check_at <= now)
+        ).one()
+        backlog[plan] = {
+            "due": due,
+            "behind": behind,
+            "max_lag_seconds": round((now - oldest).total_seconds()) if oldest else 0
+        }
+    return backlog
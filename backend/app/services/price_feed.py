@@ -0,0 +1,264 @@
+# backend/app/services/price_feed.py
+"""
+Bulk price submission through the Feeds API (JSON_LISTINGS_FEED)
+
+Large per-cycle change sets are sent as one feed per store and marketplace
+instead of one patchListingsItem call per SKU. Amazon processes feeds
+asynchronously, so each submission is persisted and a reconciliation job
+polls the processing report, then applies the accepted SKUs to
+Product.price / PriceHistory (and queues PRICE_CHANGED notifications).
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import Product, PriceHistory, Notification, Store, PriceFeedSubmission
+from .amazon_spapi import build_price_patch, AmazonSPAPIClient
+from .spapi_client_cache import get_store_client
+
+logger = logging.getLogger(__name__)
+
+# Submission statuses that still need polling
+PENDING_STATUSES = ("SUBMITTED", "IN_QUEUE", "IN_PROGRESS")
+# Give up on feeds Amazon has not finished within this window
+FEED_MAX_AGE = timedelta(hours=24)
+
+
+def build_price_feed(seller_id: str, marketplace_id: str, changes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build a JSON_LISTINGS_FEED document with one PATCH message per SKU
+
+    Each change needs `sku` and `new_price`; message ids are 1-based positions
+    in `changes`.
+    """
+    return {
+        "header": {
+            "sellerId": seller_id,
+            "version": "2.0",
+            "issueLocale": "en_US"
+        },
+        "messages": [
+            {
+                "messageId": message_id,
+                "sku": change["sku"],
+                "operationType": "PATCH",
+                "productType": "PRODUCT",
+                "patches": [build_price_patch(marketplace_id, change["new_price"])]
+            }
+            for message_id, change in enumerate(changes, start=1)
+        ]
+    }
+
+
+def parse_processing_report(report: Dict[str, Any]) -> Dict[int, List[str]]:
+    """Map messageId -> list of ERROR issue messages from a JSON feed processing report"""
+    errors: Dict[int, List[str]] = {}
+    for issue in report.get("issues", []) or []:
+        if str(issue.get("severity", "")).upper() != "ERROR":
+            continue
+        try:
+            message_id = int(issue.get("messageId"))
+        except (TypeError, ValueError):
+            continue
+        errors.setdefault(message_id, []).append(
+            f"{issue.get('code', 'ERROR')}: {issue.get('message', 'Unknown')}"
+        )
+    return errors
+
+
+def record_price_change(
+    db: Session,
+    product: Product,
+    new_price: float,
+    strategy: str,
+    repricing_result: Dict[str, Any],
+    old_price: Optional[float] = None
+):
+    """Apply a confirmed price change to the product and log history + notification"""
+    old_price = product.price if old_price is None else old_price
+    product.price = new_price
+    product.last_repriced_at = datetime.utcnow()
+    if repricing_result.get('competitor_count') is not None:
+        product.competitor_count = repricing_result['competitor_count']
+    product.lowest_competitor_price = repricing_result.get('lowest_competitor_price')
+
+    # Log price change
+    db.add(PriceHistory(
+        product_id=product.id,
+        price=new_price,
+        buybox_owning=product.buybox_owning
+    ))
+
+    db.add(Notification(
+        user_id=product.user_id,
+        type="PRICE_CHANGED",
+        payload_json=json.dumps({
+            "asin": product.asin,
+            "sku": product.sku,
+            "old_price": old_price,
+            "new_price": new_price,
+            "strategy": strategy,
+            "reason": repricing_result.get('reason', ''),
+            "buybox_chance": repricing_result.get('estimated_buybox_chance', 0)
+        }),
+        sent=False
+    ))
+
+    price_change = ((new_price - old_price) / old_price) * 100 if old_price else 0.0
+    logger.info(
+        f"  💰 REPRICED {product.sku}: ${old_price:.2f} → ${new_price:.2f} ({price_change:+.1f}%) | "
+        f"Strategy: {strategy.upper()} | Buy Box: {repricing_result.get('estimated_buybox_chance', 0)}%"
+    )
+
+
+def pending_feed_product_ids(db: Session, store_id: int) -> Set[int]:
+    """Products with a price already in flight in an unreconciled feed"""
+    product_ids: Set[int] = set()
+    rows = db.query(PriceFeedSubmission.items_json).filter(
+        PriceFeedSubmission.store_id == store_id,
+        PriceFeedSubmission.status.in_(PENDING_STATUSES)
+    ).all()
+    for (items_json,) in rows:
+        for item in json.loads(items_json or "{}").values():
+            product_ids.add(item["product_id"])
+    return product_ids
+
+
+async def submit_price_feed(
+    db: Session,
+    store: Store,
+    client: AmazonSPAPIClient,
+    marketplace_id: str,
+    changes: List[Dict[str, Any]]
+) -> Optional[PriceFeedSubmission]:
+    """
+    Submit a store's price changes for one marketplace as a single feed
+
+    `changes` are dicts with product_id, sku, old_price, new_price, strategy
+    and the engine's repricing_result. Returns the persisted submission, or
+    None if Amazon rejected the upload (callers may fall back to PATCH).
+    """
+    feed = build_price_feed(store.selling_partner_id, marketplace_id, changes)
+    result = await client.submit_listings_feed(feed, marketplace_id)
+    if not result.get("success"):
+        logger.error(f"  ⚠️ Price feed submission failed for store {store.id}: {result.get('error')}")
+        return None
+
+    items = {
+        str(message_id): {
+            "product_id": change["product_id"],
+            "sku": change["sku"],
+            "old_price": change["old_price"],
+            "new_price": change["new_price"],
+            "strategy": change["strategy"],
+            "repricing_result": change["repricing_result"],
+        }
+        for message_id, change in enumerate(changes, start=1)
+    }
+    submission = PriceFeedSubmission(
+        store_id=store.id,
+        marketplace_id=marketplace_id,
+        feed_id=result["feed_id"],
+        status="SUBMITTED",
+        items_json=json.dumps(items),
+        message_count=len(changes)
+    )
+    db.add(submission)
+    db.commit()
+    logger.info(f"  📤 Store {store.id}: {len(changes)} price changes submitted as feed {result['feed_id']}")
+    return submission
+
+
+def _apply_processing_report(db: Session, submission: PriceFeedSubmission, report: Dict[str, Any]):
+    """Apply accepted SKUs from a processing report to Product / PriceHistory"""
+    errors = parse_processing_report(report)
+    items = json.loads(submission.items_json or "{}")
+    products = {
+        p.id: p for p in db.query(Product).filter(
+            Product.id.in_([item["product_id"] for item in items.values()])
+        ).all()
+    }
+
+    accepted = 0
+    failed = 0
+    for message_id, item in items.items():
+        product = products.get(item["product_id"])
+        if errors.get(int(message_id)):
+            failed += 1
+            logger.warning(f"  ⚠️ Feed {submission.feed_id}: {item['sku']} rejected - {'; '.join(errors[int(message_id)])}")
+            continue
+        if product is None:
+            continue
+        accepted += 1
+        record_price_change(
+            db, product, item["new_price"], item["strategy"], item["repricing_result"],
+            old_price=item["old_price"]
+        )
+
+    submission.accepted_count = accepted
+    submission.error_count = failed
+    submission.status = "RECONCILED"
+    submission.reconciled_at = datetime.utcnow()
+
+
+async def reconcile_price_feeds() -> Dict[str, int]:
+    """
+    Poll every pending price feed and reconcile the finished ones
+
+    Safe to run concurrently with repricing cycles: products with a feed in
+    flight are skipped by the cycle until their feed is reconciled.
+    """
+    totals = {"polled": 0, "reconciled": 0, "failed": 0}
+    db: Session = SessionLocal()
+    try:
+        submissions = db.query(PriceFeedSubmission).filter(
+            PriceFeedSubmission.status.in_(PENDING_STATUSES)
+        ).order_by(PriceFeedSubmission.created_at).all()
+
+        for submission in submissions:
+            totals["polled"] += 1
+            try:
+                if datetime.utcnow() - submission.created_at > FEED_MAX_AGE:
+                    submission.status = "FATAL"
+                    submission.error_message = "Feed not processed within 24h"
+                    totals["failed"] += 1
+                    db.commit()
+                    continue
+
+                store = db.query(Store).filter(Store.id == submission.store_id).first()
+                client = get_store_client(store) if store and store.is_active else None
+                if client is None:
+                    continue
+
+                status = await client.get_feed_status(submission.feed_id)
+                if not status.get("success"):
+                    continue
+
+                processing_status = status.get("processing_status")
+                if processing_status in ("CANCELLED", "FATAL"):
+                    submission.status = processing_status
+                    submission.error_message = f"Feed {processing_status.lower()} by Amazon"
+                    totals["failed"] += 1
+                elif processing_status == "DONE" and status.get("result_document_id"):
+                    result = await client.get_feed_result(status["result_document_id"])
+                    if not result.get("success"):
+                        continue
+                    _apply_processing_report(db, submission, result["report"])
+                    totals["reconciled"] += 1
+                    logger.info(
+                        f"📥 Feed {submission.feed_id} reconciled: {submission.accepted_count} accepted, "
+                        f"{submission.error_count} rejected"
+                    )
+                elif processing_status:
+                    submission.status = processing_status
+                db.commit()
+            except Exception as e:
+                logger.error(f"⚠️ Error reconciling price feed {submission.feed_id}: {e}")
+                db.rollback()
+        return totals
+    finally:
+        db.close()
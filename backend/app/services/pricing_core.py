@@ -0,0 +1,315 @@
+# backend/app/services/pricing_core.py
+"""
+Session-free repricing core
+
+The engine's pricing rules as plain functions over plain records: a product
+is anything with price, min_price, max_price and target_margin_percent (a
+Product row or a PricingRecord), and a competitor anything with price,
+shipping and is_buybox (a StoredOffer). Nothing here touches the database,
+so a shard of records can be priced in another process.
+
+`price_records` prices a whole store vectorized (see batch_pricing). A
+PricingRecord carries its offers still packed as stored in offer_snapshots,
+so records are flat tuples of scalars and one string that pickle cheaply.
+With `processes` > 1 the records are split into contiguous shards priced
+in a process pool, one shard per worker: reading the packed offers and
+building the arrays, the per-product Python work, then runs on every core
+instead of behind one GIL. The pool is started on first use and kept for
+the life of the process, since spawning workers costs far more than
+pricing a shard. RepricingEngine is the persistence adapter around this
+module.
+"""
+import json
+import multiprocessing
+import operator
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .batch_pricing import DEFAULT_STRATEGY, PricingBatch, price_batch, strategy_code
+
+# Strategy configurations
+STRATEGIES = {
+    'win_buybox': {
+        'name': 'Win Buy Box',
+        'description': 'Aggressively win Buy Box with smart pricing',
+        'price_below_competitor': 0.01,  # $0.01 below lowest
+        'buybox_focus': True,
+        'profit_threshold': 5.0  # Minimum 5% profit
+    },
+    'maximize_profit': {
+        'name': 'Maximize Profit',
+        'description': 'Balance profit margins with Buy Box wins',
+        'price_below_competitor': 0.05,  # More margin
+        'buybox_focus': True,
+        'profit_threshold': 15.0  # Minimum 15% profit
+    },
+    'boost_sales': {
+        'name': 'Boost Sales',
+        'description': 'Drive high sales velocity',
+        'price_below_competitor': 0.10,  # Even more aggressive
+        'buybox_focus': True,
+        'profit_threshold': 8.0  # Minimum 8% profit
+    }
+}
+
+
+
+def strategy_for(product) -> str:
+    """The strategy a product is priced with; NULL means DEFAULT_STRATEGY on every path"""
+    return product.repricing_strategy or DEFAULT_STRATEGY
+
+class StoredOffer(NamedTuple):
+    """An offer as the repricing engine reads it"""
+    seller_id: str
+    price: float
+    shipping: float
+    is_buybox: bool
+
+
+def pack_offers(offers: List[StoredOffer]) -> str:
+    """Canonical packed form: offers sorted, then split into parallel arrays"""
+    ordered = sorted(offers)
+    return json.dumps({
+        "seller_ids": [o.seller_id for o in ordered],
+        "prices": [o.price for o in ordered],
+        "shipping": [o.shipping for o in ordered],
+        "buybox": [o.is_buybox for o in ordered],
+    }, separators=(",", ":"))
+
+
+def unpack_offers(packed: str) -> List[StoredOffer]:
+    data = json.loads(packed)
+    return [
+        StoredOffer(seller_id, price, shipping, bool(buybox))
+        for seller_id, price, shipping, buybox in zip(data["seller_ids"], data["prices"], data["shipping"], data["buybox"])
+    ]
+
+
+class PricingRecord(NamedTuple):
+    """A product's pricing inputs, detached from any session"""
+    id: int
+    price: float
+    min_price: Optional[float]
+    max_price: Optional[float]
+    target_margin_percent: Optional[float]
+    repricing_strategy: Optional[str]
+    lowest_competitor_price: Optional[float]
+    offers_packed: Optional[str]  # None when the product has no fresh snapshot
+
+
+def record_for(product, competitors: Sequence[StoredOffer]) -> PricingRecord:
+    return PricingRecord(
+        product.id, product.price, product.min_price, product.max_price, product.target_margin_percent,
+        product.repricing_strategy, product.lowest_competitor_price,
+        pack_offers(competitors) if competitors else None
+    )
+
+
+def with_fallback(product, competitors: Optional[List]) -> List:
+    """The product's competitors, or a mock competitor from product data when no snapshot is fresh"""
+    if not competitors and product.lowest_competitor_price:
+        # Create a mock competitor for calculation purposes
+        return [StoredOffer('Competitor', product.lowest_competitor_price, 0.0, True)]
+    return competitors or []
+
+
+def calculate_optimal_price(product, competitors: Sequence[Any], strategy: str = 'win_buybox') -> Dict:
+    """
+    Calculate optimal price based on strategy and market conditions
+    
+    Returns dict with:
+    - new_price: Recommended price
+    - should_reprice: Whether to update price
+    - reason: Explanation of pricing decision
+    - estimated_buybox_chance: % chance of winning Buy Box
+    """
+    # Get current competitors
+    if not competitors:
+        return {
+            'new_price': product.price,
+            'should_reprice': False,
+            'reason': 'No competitors found',
+            'estimated_buybox_chance': 100
+        }
+
+    # Find lowest competitor price (including shipping)
+    buybox_competitor = next((c for c in competitors if c.is_buybox), None)
+    lowest_competitor = min(competitors, key=lambda c: c.price + c.shipping)
+    lowest_total_price = lowest_competitor.price + lowest_competitor.shipping
+
+    # Use configured min/max prices, with cost-based fallbacks independent of current price
+    # Critical: Never use current price as floor - it traps discounted products
+    if product.min_price:
+        min_safe_price = product.min_price
+    else:
+        # Fallback: Estimate cost at 60% of lowest competitor (conservative)
+        estimated_cost = lowest_total_price * 0.6
+        min_safe_price = estimated_cost
+
+    if product.max_price:
+        max_safe_price = product.max_price
+    else:
+        # Fallback: Allow up to 2x lowest competitor for premium positioning
+        max_safe_price = lowest_total_price * 2.0
+
+    # Apply strategy logic
+    if strategy == 'win_buybox':
+        # Most aggressive - aim to beat Buy Box holder
+        if buybox_competitor:
+            target_price = (buybox_competitor.price + buybox_competitor.shipping) - 0.01
+        else:
+            target_price = lowest_total_price - 0.01
+
+        reason = f"Win Buy Box: Target ${target_price:.2f} (${0.01} below competitor)"
+
+    elif strategy == 'maximize_profit':
+        # Balance profit and Buy Box - stay competitive but protect margins
+        target_margin = product.target_margin_percent or 15.0
+        cost_based_price = min_safe_price * (1 + target_margin / 100)
+
+        # Choose higher of margin-based or competitive price
+        if cost_based_price < lowest_total_price:
+            target_price = min(cost_based_price * 1.05, lowest_total_price - 0.05)
+            reason = f"Maximize Profit: ${target_price:.2f} (protected {target_margin}% margin)"
+        else:
+            target_price = lowest_total_price - 0.05
+            reason = f"Maximize Profit: ${target_price:.2f} (competitive with margin protection)"
+
+    else:  # boost_sales
+        # Most aggressive for velocity
+        target_price = lowest_total_price - 0.10
+        reason = f"Boost Sales: ${target_price:.2f} (${0.10} below to drive volume)"
+
+    # Apply safety limits
+    target_price = max(min_safe_price, min(target_price, max_safe_price))
+
+    # Estimate Buy Box win chance
+    price_competitiveness = calculate_price_competitiveness(
+        target_price,
+        lowest_total_price,
+        buybox_competitor.price if buybox_competitor else lowest_total_price
+    )
+
+    # Buy Box chance: 25% from price + assumed 75% from fulfillment/ratings
+    estimated_chance = min(100, price_competitiveness * 25 + 70)
+
+    # Decide if repricing is needed
+    price_difference = abs(product.price - target_price)
+    should_reprice = price_difference >= 0.05  # Reprice if $0.05+ difference
+
+    return {
+        'new_price': round(target_price, 2),
+        'should_reprice': should_reprice,
+        'reason': reason,
+        'estimated_buybox_chance': int(estimated_chance),
+        'competitor_count': len(competitors),
+        'lowest_competitor_price': lowest_total_price
+    }
+
+
+def calculate_price_competitiveness(
+    our_price: float,
+    lowest_price: float,
+    buybox_price: float
+) -> float:
+    """
+    Calculate how competitive our price is (0-100 scale)
+    100 = best price, 0 = not competitive
+    """
+    if our_price <= lowest_price:
+        return 100.0
+
+    price_gap = our_price - lowest_price
+    competitiveness = max(0, 100 - (price_gap / lowest_price * 100))
+
+    return competitiveness
+
+
+class StoreDecision(NamedTuple):
+    """Per-record arrays: the BatchDecision plus the competitor figures stored on repriced products"""
+    new_price: np.ndarray
+    should_reprice: np.ndarray
+    buybox_chance: np.ndarray
+    lowest_landed: np.ndarray
+    competitor_count: np.ndarray
+
+
+def _landed_prices(record: PricingRecord) -> Tuple[Optional[float], Optional[float], int]:
+    """Lowest landed price, Buy Box holder's landed price and competitor count, read off the packed arrays"""
+    landed, buybox = [], None
+    if record.offers_packed:
+        data = json.loads(record.offers_packed)
+        landed = list(map(operator.add, data["prices"], data["shipping"]))
+        buybox = next((price for price, flag in zip(landed, data["buybox"]) if flag), None)
+    if not landed:
+        # with_fallback's mock competitor
+        if record.lowest_competitor_price:
+            return record.lowest_competitor_price, record.lowest_competitor_price, 1
+        return None, None, 0
+    return min(landed), buybox, len(landed)
+
+
+def _price_shard(rows: Sequence[tuple]) -> StoreDecision:
+    records = [PricingRecord._make(row) for row in rows]
+    lowest, buybox, counts = zip(*map(_landed_prices, records)) if records else ((), (), ())
+    columns = list(zip(*records)) if records else [()] * len(PricingRecord._fields)
+    batch = PricingBatch(
+        price=np.array(columns[1], dtype=np.float64),
+        min_price=np.array(columns[2], dtype=np.float64),
+        max_price=np.array(columns[3], dtype=np.float64),
+        target_margin=np.array(columns[4], dtype=np.float64),
+        strategy=np.array([strategy_code(s or DEFAULT_STRATEGY) for s in columns[5]], dtype=np.int8),
+        lowest_landed=np.array(lowest, dtype=np.float64),
+        buybox_landed=np.array(buybox, dtype=np.float64),
+    )
+    return StoreDecision(*price_batch(batch), batch.lowest_landed, np.array(counts, dtype=np.int64))
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def _process_pool(processes: int) -> ProcessPoolExecutor:
+    """The process-wide pricing pool, (re)started when the requested size changes"""
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size != processes:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # To unpickle _price_shard, spawned workers import the app package and this module
+            # (plus the parent's __main__ as __mp_main__); none of that opens sessions or starts the scheduler
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+            _pool_size = processes
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the pricing pool's workers, if it was ever started"""
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool, _pool_size = None, 0
+
+
+def price_records(records: Sequence[PricingRecord], processes: int = 1, min_records: int = 0) -> StoreDecision:
+    """
+    Vectorized decisions for `records`, in order
+
+    Sharded over a pool of `processes` worker processes when there are at
+    least `min_records` of them; smaller sets are priced in-process, where
+    they are cheaper than the round trip to the workers.
+    """
+    # Plain tuples: pickling NamedTuples costs several times more
+    rows = [tuple(r) for r in records]
+    shard_count = min(processes, len(rows))
+    if shard_count <= 1 or len(rows) < min_records:
+        return _price_shard(rows)
+    size = -(-len(rows) // shard_count)
+    shards = [rows[i:i + size] for i in range(0, len(rows), size)]
+    decisions = list(_process_pool(processes).map(_price_shard, shards))
+    return StoreDecision(*(np.concatenate(column) for column in zip(*decisions)))
@@ -1,5 +1,4 @@
 # backend/app/services/product_sync.py
-import asyncio
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from sqlalchemy.orm import Session
@@ -7,7 +6,7 @@ from sqlalchemy import select
 import logging
 
 from ..models import Store, Product, User
-from .amazon_spapi import create_spapi_client
+from .spapi_client_cache import get_store_client
 from ..database import SessionLocal
 
 logger = logging.getLogger(__name__)
@@ -15,9 +14,6 @@ logger = logging.getLogger(__name__)
 class ProductSyncService:
     """Service for synchronizing products from Amazon SP-API"""
     
-    def __init__(self):
-        self.rate_limit_delay = 0.2  # 200ms between requests (5 req/sec limit)
-    
     async def sync_store_products(self, store_id: int, sku_list: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Sync products for a specific store from Amazon SP-API
@@ -47,7 +43,7 @@ class ProductSyncService:
                 }
             
             # Create SP-API client
-            spapi_client = create_spapi_client(store.refresh_token, store.region)
+            spapi_client = get_store_client(store)
             if not spapi_client and sku_list:
                 # If specific SKUs were requested but no SP-API client, this is an error
                 return {
@@ -100,9 +96,6 @@ class ProductSyncService:
                                 "error": result["error"]
                             })
                         
-                        # Rate limiting
-                        await asyncio.sleep(self.rate_limit_delay)
-                        
                     except Exception as e:
                         logger.error(f"Error syncing SKU {sku}: {e}")
                         sync_results["error_count"] += 1
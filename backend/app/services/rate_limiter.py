@@ -0,0 +1,144 @@
+# backend/app/services/rate_limiter.py
+"""
+Token-bucket rate limiter for Amazon SP-API calls
+
+SP-API quotas are enforced per selling partner and per operation, so buckets
+are keyed by (selling_partner_id, operation). Each bucket starts from Amazon's
+documented usage plan and is re-tuned from the `x-amzn-RateLimit-Limit`
+response header, which carries the rate actually granted to the seller.
+"""
+import asyncio
+import threading
+import time
+import logging
+from typing import Dict, Tuple, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# Documented default usage plans: operation -> (requests per second, burst)
+SPAPI_USAGE_PLANS: Dict[str, Tuple[float, int]] = {
+    "getOrders": (0.0167, 20),
+    "getPricing": (0.5, 1),
+    "getCompetitivePricing": (0.5, 1),
+    "getItemOffers": (0.5, 1),
+    "getListingsItem": (5.0, 10),
+    "patchListingsItem": (5.0, 10),
+    "getCatalogItem": (2.0, 2),
+    "createFeedDocument": (0.5, 15),
+    "createFeed": (0.0083, 15),
+    "getFeed": (2.0, 15),
+    "getFeedDocument": (0.0222, 10),
+}
+
+# Conservative plan for operations we have not catalogued
+DEFAULT_USAGE_PLAN: Tuple[float, int] = (0.5, 1)
+
+RATE_LIMIT_HEADER = "x-amzn-RateLimit-Limit"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Callers reserve a token and are told how long to wait for it. The balance
+    may go negative, which queues later callers behind earlier ones instead of
+    letting them race for the next refill.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.tokens = min(float(self.burst), self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """Take one token and return the number of seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1.0
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def capacity_within(self, seconds: float) -> float:
+        """Calls that can start within `seconds` without waiting past them (current balance plus refill)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, self.tokens + seconds * self.rate)
+
+    def set_rate(self, rate: float):
+        """Apply a new refill rate (requests per second)"""
+        if rate <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+
+class SPAPIRateLimiter:
+    """Registry of token buckets keyed by (selling_partner_id, operation)"""
+
+    def __init__(self, usage_plans: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.usage_plans = dict(usage_plans or SPAPI_USAGE_PLANS)
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, selling_partner_id: str, operation: str) -> TokenBucket:
+        """Get (or create from the documented usage plan) the bucket for a seller/operation"""
+        key = (selling_partner_id, operation)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    rate, burst = self.usage_plans.get(operation, DEFAULT_USAGE_PLAN)
+                    bucket = TokenBucket(rate, burst)
+                    self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, selling_partner_id: str, operation: str):
+        """Wait until a call to `operation` is allowed for this seller"""
+        wait = self.bucket(selling_partner_id, operation).reserve()
+        if wait > 0:
+            logger.debug(f"Rate limit: waiting {wait:.2f}s for {operation} ({selling_partner_id})")
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, selling_partner_id: str, operation: str, headers: Any):
+        """Re-tune a bucket from the x-amzn-RateLimit-Limit response header"""
+        if not headers:
+            return
+        try:
+            value = headers.get(RATE_LIMIT_HEADER) or headers.get(RATE_LIMIT_HEADER.lower())
+        except AttributeError:
+            return
+        if not value:
+            return
+        try:
+            rate = float(value)
+        except (TypeError, ValueError):
+            logger.debug(f"Ignoring unparsable {RATE_LIMIT_HEADER} header: {value!r}")
+            return
+        bucket = self.bucket(selling_partner_id, operation)
+        if abs(bucket.rate - rate) > 1e-9:
+            logger.info(f"SP-API rate for {operation} ({selling_partner_id}) updated: {bucket.rate} -> {rate} rps")
+            bucket.set_rate(rate)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current rate/burst per bucket, for diagnostics"""
+        with self._lock:
+            items = list(self._buckets.items())
+        return {
+            f"{seller}:{operation}": {"rate": bucket.rate, "burst": bucket.burst}
+            for (seller, operation), bucket in items
+        }
+
+
+# Shared limiter for every SP-API client in this process
+spapi_rate_limiter = SPAPIRateLimiter()
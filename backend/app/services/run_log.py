@@ -0,0 +1,180 @@
+# backend/app/services/run_log.py
+"""
+Persisted log of repricing cycles with per-phase timings
+
+While a cycle runs, each store's stats dict accumulates counters and the
+seconds spent in each phase:
+
+    fetch    - pricing calls to SP-API (or the mock client)
+    persist  - Buy Box updates, competitor offers and next-check scheduling
+    compute  - the repricing engine
+    push     - price PATCHes and feed submissions
+    notify   - notification dispatch (cycle-wide)
+
+When the cycle ends it is saved as a RepricingRun with one
+RepricingRunStore row per store. `run_summary` serves recent runs and
+duration/phase percentiles to /admin/scheduler/status.
+"""
+import math
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..models import RepricingRun, RepricingRunStore
+from .amazon_spapi import spapi_call_counter
+
+PHASES = ("fetch", "persist", "compute", "push", "notify")
+STORE_PHASES = ("fetch", "persist", "compute", "push")
+COUNTERS = (
+    "products_processed", "products_repriced", "products_unchanged", "buybox_changes",
+    "spapi_calls", "throttled_calls", "errors",
+)
+
+# Runs are kept this long
+RUN_RETENTION = timedelta(days=7)
+
+
+def add_phase(stats: dict, phase: str, seconds: float):
+    phases = stats.setdefault("phases", {})
+    phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timed(stats: dict, phase: str):
+    """Add the wall time of the block to `stats`' phase"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase(stats, phase, time.perf_counter() - started)
+
+
+def count(stats: dict, counter: str, n: int = 1):
+    stats[counter] = stats.get(counter, 0) + n
+
+
+@contextmanager
+def counting_calls(stats: dict):
+    """Count the SP-API calls made inside the block into `stats`"""
+    token = spapi_call_counter.set(stats)
+    try:
+        yield
+    finally:
+        spapi_call_counter.reset(token)
+
+
+def merge_stats(into: dict, stats: dict) -> dict:
+    """Fold one work unit's stats into a store's"""
+    for key, value in stats.items():
+        if key == "phases":
+            for phase, seconds in value.items():
+                add_phase(into, phase, seconds)
+        elif isinstance(value, bool):
+            into[key] = into.get(key, False) or value
+        elif isinstance(value, (int, float)):
+            into[key] = into.get(key, 0) + value
+    return into
+
+
+def save_run(db: Session, cycle, store_stats: Dict[int, dict], notify_seconds: float = 0.0,
+             mode: str = "local", worker_id: Optional[str] = None) -> RepricingRun:
+    """Persist a finished cycle (a CycleRun) and its per-store stats"""
+    rows = []
+    for store_id, stats in store_stats.items():
+        phases = stats.get("phases", {})
+        rows.append(RepricingRunStore(
+            store_id=store_id,
+            products_deferred=stats.get("deferred", 0),
+            timed_out=bool(stats.get("timed_out")),
+            failed=bool(stats.get("failed")),
+            **{counter: stats.get(counter, 0) for counter in COUNTERS},
+            **{f"{phase}_seconds": round(phases.get(phase, 0.0), 3) for phase in STORE_PHASES},
+        ))
+    run = RepricingRun(
+        mode=mode,
+        worker_id=worker_id,
+        started_at=cycle.started_at,
+        finished_at=cycle.finished_at,
+        duration_seconds=round(cycle.duration_seconds, 3),
+        lag_seconds=cycle.lag_seconds,
+        skipped_triggers=cycle.skipped_triggers,
+        catch_up=cycle.catch_up,
+        stores_total=cycle.stores_total,
+        stores_unfinished=len(cycle.unfinished),
+        products_deferred=sum(row.products_deferred for row in rows),
+        notify_seconds=round(notify_seconds, 3),
+        stores=rows,
+        **{counter: sum(getattr(row, counter) for row in rows) for counter in COUNTERS},
+        **{
+            f"{phase}_seconds": round(sum(getattr(row, f"{phase}_seconds") for row in rows), 3)
+            for phase in STORE_PHASES
+        },
+    )
+    db.add(run)
+    expired = db.query(RepricingRun.id).filter(RepricingRun.started_at < cycle.started_at - RUN_RETENTION)
+    db.query(RepricingRunStore).filter(RepricingRunStore.run_id.in_(expired.scalar_subquery())).delete(
+        synchronize_session=False
+    )
+    db.query(RepricingRun).filter(RepricingRun.started_at < cycle.started_at - RUN_RETENTION).delete(
+        synchronize_session=False
+    )
+    db.commit()
+    return run
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[max(0, math.ceil(q * len(ordered)) - 1)], 3)
+
+
+def skip_ratio(unchanged: int, processed: int) -> Optional[float]:
+    """Share of processed products skipped as unchanged"""
+    return round(unchanged / processed, 3) if processed else None
+
+
+def _run_dict(run: RepricingRun) -> Dict[str, Any]:
+    return {
+        "id": run.id,
+        "mode": run.mode,
+        "worker_id": run.worker_id,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
+        "duration_seconds": run.duration_seconds,
+        "lag_seconds": run.lag_seconds,
+        "skipped_triggers": run.skipped_triggers,
+        "catch_up": run.catch_up,
+        "stores_total": run.stores_total,
+        "stores_unfinished": run.stores_unfinished,
+        **{counter: getattr(run, counter) for counter in COUNTERS},
+        "products_deferred": run.products_deferred,
+        "skip_ratio": skip_ratio(run.products_unchanged, run.products_processed),
+        "phases": {phase: getattr(run, f"{phase}_seconds") for phase in PHASES},
+    }
+
+
+def run_summary(db: Session, since: datetime, recent: int = 20) -> Dict[str, Any]:
+    """Recent runs, the skip ratio and p50/p95 of duration, lag and each phase over runs since `since`"""
+    runs = db.query(RepricingRun).filter(
+        RepricingRun.started_at >= since
+    ).order_by(RepricingRun.started_at.desc()).all()
+    series = {
+        "duration_seconds": [r.duration_seconds for r in runs],
+        "lag_seconds": [r.lag_seconds for r in runs],
+        **{f"{phase}_seconds": [getattr(r, f"{phase}_seconds") for r in runs] for phase in PHASES},
+    }
+    return {
+        "runs": len(runs),
+        "throttled_calls": sum(r.throttled_calls for r in runs),
+        "errors": sum(r.errors for r in runs),
+        "skip_ratio": skip_ratio(sum(r.products_unchanged for r in runs), sum(r.products_processed for r in runs)),
+        "percentiles": {
+            name: {"p50": _percentile(values, 0.5), "p95": _percentile(values, 0.95)}
+            for name, values in series.items()
+        },
+        "recent": [_run_dict(r) for r in runs[:recent]],
+    }
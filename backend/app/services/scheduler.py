@@ -1,28 +1,53 @@
 from __future__ import annotations
 from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import or_
+from ..config import settings
 from ..database import SessionLocal
-from ..models import Product, PriceHistory, CompetitorOffer, Store, Notification, User
+from ..models import Product, PriceHistory, Store, Notification, User, PushSubscription
 from .spapi import SPAPIClient as MockSPAPIClient
-from .amazon_spapi import create_spapi_client, AmazonSPAPIClient
+from .amazon_spapi import AmazonSPAPIClient
+from .spapi_client_cache import get_store_client, spapi_client_cache
 from .buybox import determine_buybox
 from .notify import send_email, send_push
 from .repricing_engine import RepricingEngine
+from .pricing_core import strategy_for
+from .offer_notifications import NotificationQueue, offer_notification_queue, parse_any_offer_changed, latest_per_listing
+from .cycle_offer_pool import CycleOfferPool, OfferSnapshot
+from .price_feed import submit_price_feed, record_price_change, pending_feed_product_ids, reconcile_price_feeds
+from .poll_schedule import DueQueue, schedule_next_check, plan_cadence, tier_backlog
+from .fair_scheduler import WeightedFairQueue, chunk, tenant_lag
+from .plan_limits import get_scheduling_weight
+from .call_planner import PlanCandidate, plan_store_cycle, pricing_call_budget, record_deferrals
+from . import work_queue
+from .cycle_coordinator import CycleRun, cycle_coordinator
+from .offer_snapshots import OfferSnapshotWriter, to_stored_offers, offer_fingerprint
+from .run_log import PHASES, timed, add_phase, count, counting_calls, merge_stats, save_run
 import json
+import time
 import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Rows streamed per round trip when scanning a store's due products
+DUE_SCAN_CHUNK = 1000
+# Notifications sent per committed chunk
+NOTIFICATION_CHUNK = 500
 
-def _parse_sp_api_pricing_to_offers(pricing_data: dict, marketplace_id: str) -> list:
+
+def _parse_sp_api_pricing_to_offers(pricing_data: dict, marketplace_id: str, requester_seller_id: str = None) -> list:
     """
     Parse real SP-API pricing response into offer format for scheduler
     
     SP-API returns competitive pricing in a different format than our mock client.
     This function normalizes it to the format expected by the rest of the code.
+    
+    Prices that belong to the requesting seller are attributed to
+    `requester_seller_id` when given, so the offers stay meaningful when
+    shared with other tenants.
     """
     offers = []
     
@@ -51,8 +76,12 @@ def _parse_sp_api_pricing_to_offers(pricing_data: dict, marketplace_id: str) ->
                 
                 price_amount = float(landed_price.get("Amount", 0) or listing_price.get("Amount", 0))
                 
+                seller_id = comp_price.get("CompetitivePriceId", f"COMP_{len(offers)}")
+                if requester_seller_id and comp_price.get("belongsToRequester"):
+                    seller_id = requester_seller_id
+                
                 offers.append({
-                    "seller_id": comp_price.get("CompetitivePriceId", f"COMP_{len(offers)}"),
+                    "seller_id": seller_id,
                     "price": price_amount,
                     "shipping": 0.0,  # Landed price includes shipping
                     "is_buybox": comp_price.get("belongsToRequester", False)
@@ -64,8 +93,9 @@ def _parse_sp_api_pricing_to_offers(pricing_data: dict, marketplace_id: str) ->
                 listing_price_data = buying_price.get("ListingPrice", {})
                 shipping_data = buying_price.get("Shipping", {})
                 
+                # getPricing's Offers are the requester's own listings
                 offers.append({
-                    "seller_id": offer.get("SellerId", f"SELLER_{len(offers)}"),
+                    "seller_id": requester_seller_id or offer.get("SellerId", f"SELLER_{len(offers)}"),
                     "price": float(listing_price_data.get("Amount", 0)),
                     "shipping": float(shipping_data.get("Amount", 0)),
                     "is_buybox": offer.get("IsBuyBoxWinner", False)
@@ -78,214 +108,1092 @@ def _parse_sp_api_pricing_to_offers(pricing_data: dict, marketplace_id: str) ->
         return []
 
 
-def _run_async(coro):
+def _is_auth_error(error_msg) -> bool:
+    error_msg = str(error_msg).lower()
+    return "invalid_grant" in error_msg or "refresh_token" in error_msg
+
+
+def _buybox_held_by_other(pricing_data: dict) -> bool:
+    """Whether a getPricing response shows a Buy Box price that does not belong to the requester"""
+    return any(
+        not comp_price.get("belongsToRequester", False)
+        for asin_data in pricing_data.get("pricing", [])
+        for comp_price in asin_data.get("Product", {}).get("CompetitivePricing", {}).get("CompetitivePrices", [])
+    )
+
+
+async def _fetch_pricing_keys(client, keys: list, requester_seller_id: str, requester_specific: set = None):
+    """
+    Price (asin, marketplace_id, condition) keys with the real SP-API client,
+    batching up to 20 ASINs per call within each (marketplace, condition).
+
+    Returns ``(offers_by_key, auth_failed)``; keys whose pricing failed are
+    missing from the result. Keys whose Buy Box is held by a seller other
+    than the requester are added to ``requester_specific`` when given.
+    """
+    offers_by_key: dict = {}
+    groups: dict = {}
+    for asin, marketplace_id, condition in keys:
+        groups.setdefault((marketplace_id, condition), []).append(asin)
+    
+    for (marketplace_id, condition), asins in groups.items():
+        if client.is_circuit_open():
+            # Store's SP-API circuit is open - leave the rest unpriced this cycle
+            break
+        pricing_by_asin = await client.get_product_pricing_batch(
+            asins, marketplace_id, item_condition=condition
+        )
+        
+        # Check if pricing failed due to authentication error
+        if any(
+            not r.get("success", False) and _is_auth_error(r.get("error", ""))
+            for r in pricing_by_asin.values()
+        ):
+            return offers_by_key, True
+        
+        for asin in asins:
+            result = pricing_by_asin.get(asin, {})
+            if result.get("success"):
+                offers_by_key[(asin, marketplace_id, condition)] = _parse_sp_api_pricing_to_offers(
+                    result, marketplace_id, requester_seller_id
+                )
+                if requester_specific is not None and _buybox_held_by_other(result):
+                    requester_specific.add((asin, marketplace_id, condition))
+    
+    return offers_by_key, False
+
+
+async def _fetch_store_offers(client, is_real_client: bool, products: list, default_marketplace_id: str,
+                              seller_id: str = None, pool: CycleOfferPool = None):
+    """
+    Fetch competitor offers for all of a store's products.
+
+    With the real SP-API client, products are reduced to unique
+    (asin, marketplace, condition) keys priced in batches of up to 20 ASINs
+    per call. When a cycle-wide ``pool`` is given, keys another store is
+    already fetching are awaited instead of fetched again; if that store
+    fails, or the Buy Box it saw belongs to another seller (possibly this
+    one), this store fetches them with its own credentials.
+
+    Returns ``(offers_by_product_id, auth_failed)``.
+    """
+    offers_by_product: dict = {}
+    
+    if not is_real_client:
+        # Mock client - use get_competitive_pricing
+        for p in products:
+            offers_by_product[p.id] = await client.get_competitive_pricing(p.asin)
+        return offers_by_product, False
+    
+    key_for = {
+        p.id: (p.asin, p.marketplace_id or default_marketplace_id, p.condition_type or "New")
+        for p in products
+    }
+    keys = list(dict.fromkeys(key_for.values()))
+    
+    if pool is None:
+        offers_by_key, auth_failed = await _fetch_pricing_keys(client, keys, seller_id)
+    else:
+        owned, waiting = pool.claim(keys)
+        try:
+            requester_specific: set = set()
+            offers_by_key, auth_failed = await _fetch_pricing_keys(client, owned, seller_id, requester_specific)
+            for key in owned:
+                offers = offers_by_key.get(key)
+                if key in requester_specific:
+                    pool.withhold(key)
+                else:
+                    pool.resolve(key, OfferSnapshot(offers, seller_id) if offers is not None else None)
+        finally:
+            pool.release(owned)
+        if auth_failed:
+            return offers_by_product, True
+        
+        snapshots = await pool.wait(waiting)
+        missing = [key for key, snapshot in snapshots.items() if snapshot is None]
+        for key, snapshot in snapshots.items():
+            if snapshot is not None:
+                offers_by_key[key] = snapshot.offers
+        if missing:
+            fetched, auth_failed = await _fetch_pricing_keys(client, missing, seller_id)
+            offers_by_key.update(fetched)
+    
+    if auth_failed:
+        return offers_by_product, True
+    
+    for p in products:
+        # Copy so per-tenant handling never mutates a shared snapshot
+        offers_by_product[p.id] = [dict(o) for o in offers_by_key.get(key_for[p.id], [])]
+    return offers_by_product, False
+
+
+async def _push_price_changes(db: Session, st: Store, client, is_real_client: bool, price_changes: list) -> int:
+    """
+    Send a store's price changes for this cycle to Amazon.
+
+    Large change sets (>= ``settings.price_feed_min_changes`` per marketplace)
+    go out as one JSON_LISTINGS_FEED and are applied to the products when the
+    feed is reconciled; smaller ones use per-SKU PATCH and apply immediately.
+    Returns the number of products whose new price was applied now.
+    """
+    applied = 0
+    by_marketplace: dict = {}
+    for change in price_changes:
+        by_marketplace.setdefault(change["marketplace_id"], []).append(change)
+    
+    for marketplace_id, changes in by_marketplace.items():
+        if is_real_client and len(changes) >= settings.price_feed_min_changes:
+            submission = await submit_price_feed(db, st, client, marketplace_id, changes)
+            if submission is not None:
+                continue
+            # Feed upload failed - fall back to per-SKU updates
+        
+        for change in changes:
+            p = change["product"]
+            try:
+                # Update price on Amazon - different method for real vs mock client
+                if is_real_client:
+                    if client.is_circuit_open():
+                        break
+                    # Real SP-API - use update_price with all required params
+                    result = await client.update_price(
+                        p.sku,
+                        st.selling_partner_id,
+                        marketplace_id,
+                        change["new_price"]
+                    )
+                    ok = result.get("success", False)
+                else:
+                    # Mock client - simple update_price
+                    ok = await client.update_price(p.sku, change["new_price"])
+                
+                if ok:
+                    applied += 1
+                    record_price_change(db, p, change["new_price"], change["strategy"], change["repricing_result"])
+            except Exception as e:
+                logger.error(f"  ⚠️ Error updating price for {p.sku}: {e}")
+    
+    return applied
+
+
+def _apply_offers(db: Session, st: Store, p: Product, offers: list, marketplace_id: str, stats: dict,
+                  offer_writer: OfferSnapshotWriter):
+    """
+    Apply freshly fetched offers to one product.
+
+    Updates Buy Box ownership, stages the product's offers on
+    ``offer_writer`` (the caller flushes it before committing), schedules the
+    product's next check and runs the repricing engine. Shared by the polling
+    cycle and the ANY_OFFER_CHANGED consumer. Returns the price change to
+    push, or None.
+
+    A product whose offer fingerprint matches the one stored with its last
+    settled decision only has its next check scheduled.
+    """
+    stats["products_processed"] += 1
+    persist_started = time.perf_counter()
+    was_owning = p.buybox_owning
+    cadence = plan_cadence(st.user.subscription_plan if st.user else None)
+    
+    if not offers:
+        logger.debug(f"No offers found for product {p.sku} (ASIN: {p.asin})")
+        schedule_next_check(p, [], was_owning, cadence=cadence)
+        add_phase(stats, "persist", time.perf_counter() - persist_started)
+        return None
+    
+    rivals = [o for o in offers if o.get("seller_id") != st.selling_partner_id]
+    stored_offers = to_stored_offers(offers)
+    fingerprint = offer_fingerprint(p, stored_offers)
+    if fingerprint == p.offer_fingerprint:
+        count(stats, "products_unchanged")
+        offer_writer.touch(p.id)
+        schedule_next_check(p, rivals, was_owning, cadence=cadence)
+        add_phase(stats, "persist", time.perf_counter() - persist_started)
+        return None
+    
+    bb = determine_buybox(offers)
+    owning = (bb.get("seller_id") == st.selling_partner_id) if bb else False
+    if owning != p.buybox_owning:
+        stats["buybox_changes"] += 1
+        status_change = "✅ GAINED" if owning else "❌ LOST"
+        logger.info(f"  {status_change} Buy Box: {p.sku} ({p.title[:40]}...)")
+    
+        p.buybox_owning = owning
+        p.buybox_owner = bb.get("seller_id") if bb else None
+        db.add(PriceHistory(product_id=p.id, price=p.price, buybox_owning=owning))
+        db.add(Notification(
+            user_id=p.user_id,
+            type=("BUYBOX_GAINED" if owning else "BUYBOX_LOST"),
+            payload_json=json.dumps({"asin": p.asin, "owner": p.buybox_owner}),
+            sent=False
+        ))
+    # The tenant's own offer decides Buy Box ownership above but is not a competitor
+    competitors = [c for c in stored_offers if c.seller_id != st.selling_partner_id]
+    # Replaces the product's stored offers when the writer is flushed; only rivals
+    # are stored, so every reader of the snapshot prices against the same offers
+    offer_writer.stage(p.id, competitors)
+    
+    schedule_next_check(p, rivals, was_owning, cadence=cadence)
+    add_phase(stats, "persist", time.perf_counter() - persist_started)
+    
+    # Skip repricing if product doesn't have repricing enabled
+    if not p.repricing_enabled:
+        p.offer_fingerprint = fingerprint
+        return None
+    
+    # Use new RepricingEngine with advanced strategies
+    engine = RepricingEngine(db)
+    strategy = strategy_for(p)  # Win Buy Box unless set
+    
+    # Calculate optimal price using new engine
+    with timed(stats, "compute"):
+        repricing_result = engine.calculate_optimal_price(
+            product=p,
+            competitors=competitors,
+            strategy=strategy
+        )
+    
+    # Check if repricing is needed
+    if not repricing_result['should_reprice']:
+        p.offer_fingerprint = fingerprint
+        return None
+    # Settled only once a later check finds the pushed price needs no change
+    p.offer_fingerprint = None
+    
+    repricing_result.setdefault('competitor_count', len(competitors))
+    return {
+        "product": p,
+        "product_id": p.id,
+        "sku": p.sku,
+        "marketplace_id": p.marketplace_id or marketplace_id,
+        "old_price": p.price,
+        "new_price": repricing_result['new_price'],
+        "strategy": strategy,
+        "repricing_result": repricing_result
+    }
+
+
+def _store_client(st: Store):
+    """The store's cached real SP-API client, or the mock client when unavailable"""
+    real_client = get_store_client(st)
+    client = real_client if real_client else MockSPAPIClient(st.region, st.refresh_token)
+    
+    is_real_client = isinstance(client, AmazonSPAPIClient)
+    if is_real_client:
+        logger.info(f"Using real SP-API client for store {st.id}")
+    else:
+        logger.info(f"Using mock SP-API client for store {st.id} (real credentials not available)")
+    return client, is_real_client
+
+
+def _store_marketplace(st: Store) -> str:
+    """Store's primary marketplace ID"""
+    return st.marketplace_ids.split(",")[0] if st.marketplace_ids else "ATVPDKIKX0DER"
+
+
+def _due_candidates(db: Session, st: Store, now: datetime) -> list:
+    """
+    The store's products whose next check is due, most overdue first.
+
+    Only due rows are read, streamed in chunks of DUE_SCAN_CHUNK, and only the
+    columns the call planner needs - never ORM objects for the catalogue.
+    """
+    rows = db.query(
+        Product.id, Product.next_check_at, Product.asin, Product.marketplace_id, Product.condition_type,
+        Product.buybox_owning, Product.repricing_enabled, Product.deferred_at
+    ).filter(
+        Product.user_id == st.user_id,
+        or_(Product.next_check_at.is_(None), Product.next_check_at <= now)
+    ).execution_options(yield_per=DUE_SCAN_CHUNK)
+    candidates = {}
+    queue = DueQueue()
+    for row in rows:
+        candidates[row.id] = PlanCandidate(
+            row.id, row.asin, row.marketplace_id, row.condition_type,
+            bool(row.buybox_owning), bool(row.repricing_enabled), row.deferred_at
+        )
+        queue.push(row.id, row.next_check_at)
+    return [candidates[product_id] for product_id in queue.pop_due(now)]
+
+
+def _empty_store_stats() -> dict:
+    return {"products_processed": 0, "products_repriced": 0, "products_unchanged": 0, "buybox_changes": 0}
+
+
+class _StoreRun:
+    """A store's client, counters and pending price changes across its work units in one cycle"""
+    
+    def __init__(self, st: Store, client, is_real_client: bool, in_flight: set):
+        self.store_id = st.id
+        self.label = {
+            "store_id": st.id,
+            "store_name": st.store_name,
+            "user_id": st.user_id,
+            "plan": st.user.subscription_plan if st.user else None,
+        }
+        self.client = client
+        self.is_real_client = is_real_client
+        self.marketplace_id = _store_marketplace(st)
+        self.in_flight = in_flight
+        self.price_changes: list = []
+        self.stats = _empty_store_stats()
+        self.stopped = False
+        # Event-loop time by which all of the store's units must finish, set when its first unit starts
+        self.deadline = None
+    
+    def remaining(self, loop) -> float:
+        """Seconds left before the store's deadline, starting the clock on first use"""
+        if self.deadline is None:
+            self.deadline = loop.time() + settings.scheduler_store_timeout_seconds
+        return self.deadline - loop.time()
+
+
+def _open_store(store_id: int):
+    """
+    Prepare a store for the cycle.
+
+    Plans which due products fit the seller's pricing quota this cycle and
+    records the rest as deferred. Returns ``(run, planned_product_ids)``, or
+    None when the store is gone or inactive.
+    """
+    db: Session = SessionLocal()
     try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        return asyncio.run(coro)
-    fut = asyncio.run_coroutine_threadsafe(coro, loop)
-    return fut.result()
+        st = db.query(Store).filter(Store.id == store_id).first()
+        if not st or not st.is_active:
+            spapi_client_cache.evict(store_id)
+            return None
+        
+        client, is_real_client = _store_client(st)
+        now = datetime.utcnow()
+        candidates = _due_candidates(db, st, now)
+        
+        call_budget = None
+        if is_real_client:
+            call_budget = 0 if client.is_circuit_open() else pricing_call_budget(
+                client.rate_limit_key, settings.scheduler_tick_seconds
+            )
+        plan = plan_store_cycle(
+            candidates, call_budget, _store_marketplace(st), settings.scheduler_max_products_per_store
+        )
+        if plan.deferred_ids:
+            record_deferrals(db, plan.deferred_ids, now)
+            db.commit()
+        logger.info(
+            f"  📦 Store {st.id} ({st.store_name}): {len(candidates)} products due, "
+            f"{len(plan.product_ids)} planned in {plan.calls_planned} calls"
+            + (f" (budget {plan.call_budget})" if plan.call_budget is not None else "")
+            + (f", {len(plan.deferred_ids)} deferred" if plan.deferred_ids else "")
+        )
+        
+        in_flight = pending_feed_product_ids(db, st.id) if is_real_client and plan.product_ids else set()
+        run = _StoreRun(st, client, is_real_client, in_flight)
+        run.stats["deferred"] = len(plan.deferred_ids)
+        return run, plan.product_ids
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
 
-def run_cycle():
-    start_time = datetime.utcnow()
-    products_processed = 0
-    products_repriced = 0
-    buybox_changes = 0
+async def _process_store_batch(run: _StoreRun, product_ids: list, pool: CycleOfferPool = None):
+    """
+    Fetch offers for one batch of a store's due products and apply them.
+
+    Each unit gets its own session so that stores running concurrently on the
+    cycle's event loop never share ORM state, and a cancelled unit (deadline
+    exceeded) only rolls back its own uncommitted work. Price changes are
+    collected on ``run`` and pushed once the store's last unit is done.
+    """
+    db: Session = SessionLocal()
+    try:
+        st = db.query(Store).filter(Store.id == run.store_id).first()
+        if not st or not st.is_active:
+            run.stopped = True
+            return
+        
+        order = {product_id: i for i, product_id in enumerate(product_ids)}
+        products = sorted(
+            db.query(Product).filter(Product.id.in_(product_ids)).all(),
+            key=lambda p: order[p.id]
+        )
+        started_at = datetime.utcnow()
+        tenant_lag.record(run.store_id, [
+            max(0.0, (started_at - p.next_check_at).total_seconds())
+            for p in products if p.next_check_at is not None
+        ])
+        
+        client, is_real_client = run.client, run.is_real_client
+        with timed(run.stats, "fetch"), counting_calls(run.stats):
+            offers_by_product, auth_failed = await _fetch_store_offers(
+                client, is_real_client, products, run.marketplace_id,
+                seller_id=st.selling_partner_id, pool=pool
+            )
+        if auth_failed:
+            logger.error(f"🔒 Authentication failed for store {st.id} - marking as inactive")
+            st.is_active = False
+            db.commit()
+            spapi_client_cache.evict(st.id)
+            run.price_changes.clear()
+            run.stopped = True
+            return
+        
+        offer_writer = OfferSnapshotWriter()
+        for p in products:
+            if is_real_client and client.is_circuit_open():
+                logger.warning(f"🔌 SP-API circuit open for store {st.id} - skipping its remaining products this cycle")
+                run.stats["circuit_open"] = True
+                run.stopped = True
+                break
+            try:
+                offers = offers_by_product.get(p.id, [])
+                change = _apply_offers(db, st, p, offers, run.marketplace_id, run.stats, offer_writer)
+                # Products whose previous price change is still in a processing feed wait for it
+                if change is not None and p.id not in run.in_flight:
+                    # Keep the id only; the push rebinds it, so no ORM object outlives this unit
+                    run.price_changes.append({k: v for k, v in change.items() if k != "product"})
+            except Exception as e:
+                logger.error(f"  ⚠️ Error processing product {p.sku}: {e}")
+                count(run.stats, "errors")
+                continue  # Continue with next product
+        
+        with timed(run.stats, "persist"):
+            offer_writer.flush(db)
+            db.commit()
+    except BaseException:
+        # Includes asyncio.CancelledError when the unit deadline fires
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def _push_store_changes(run: _StoreRun):
+    """Send the price changes a store collected over the cycle to Amazon"""
+    changes, run.price_changes = run.price_changes, []
+    if not changes:
+        return
+    db: Session = SessionLocal()
+    try:
+        st = db.query(Store).filter(Store.id == run.store_id).first()
+        by_id = {
+            p.id: p for p in
+            db.query(Product).filter(Product.id.in_([c["product_id"] for c in changes])).all()
+        }
+        # Rebind each change to this session's instance of its product
+        changes = [{**c, "product": by_id[c["product_id"]]} for c in changes if c["product_id"] in by_id]
+        with timed(run.stats, "push"), counting_calls(run.stats):
+            run.stats["products_repriced"] += await _push_price_changes(
+                db, st, run.client, run.is_real_client, changes
+            )
+            db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def _run_store_unit(queue: WeightedFairQueue, run: _StoreRun, product_ids: list, pool: CycleOfferPool,
+                          cycle: CycleRun = None):
+    """
+    Run one (store, batch) work unit within what is left of the store's
+    deadline; push the store's changes after its last unit.
+
+    The deadline covers all of the store's units and its push, so a store
+    split into many batches cannot run longer than one store's budget.
+    Once the cycle has overrun, the store is checkpointed instead: what it
+    priced so far is pushed and the rest resumes first next cycle.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        if cycle is not None and cycle.overran():
+            cycle.unfinished.add(run.store_id)
+            queue.drop(run.store_id)
+        else:
+            await asyncio.wait_for(
+                _process_store_batch(run, product_ids, pool),
+                timeout=run.remaining(loop)
+            )
+        if run.stopped:
+            queue.drop(run.store_id)
+        if queue.remaining(run.store_id) == 0:
+            await asyncio.wait_for(
+                _push_store_changes(run),
+                timeout=run.remaining(loop)
+            )
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"⏱️ Store {run.store_id} exceeded its {settings.scheduler_store_timeout_seconds}s deadline - cancelled"
+        )
+        run.stats["timed_out"] = True
+        count(run.stats, "errors")
+        if cycle is not None:
+            cycle.unfinished.add(run.store_id)
+        queue.drop(run.store_id)
+    except Exception as e:
+        logger.error(f"⚠️ Error processing store {run.store_id}: {e}")
+        run.stats["failed"] = True
+        count(run.stats, "errors")
+        queue.drop(run.store_id)
+
+
+def _dispatch_notifications():
+    """
+    Send unsent notifications in id-ordered chunks of NOTIFICATION_CHUNK.
+
+    Each chunk is committed and expunged before the next is loaded, so memory
+    stays bounded and a failure only re-sends its own chunk.
+    """
+    db: Session = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            pending = db.query(Notification, User).join(User, User.id == Notification.user_id).filter(
+                Notification.sent == False,
+                Notification.id > last_id
+            ).order_by(Notification.id).limit(NOTIFICATION_CHUNK).all()
+            if not pending:
+                break
+            subscriptions: dict = {}
+            for sub in db.query(PushSubscription).filter(
+                PushSubscription.user_id.in_({u.id for _, u in pending})
+            ):
+                subscriptions.setdefault(sub.user_id, []).append(sub)
+            for n, u in pending:
+                send_email(u.email, f"[BuyBox] {n.type}", n.payload_json)
+                for sub in subscriptions.get(u.id, []):
+                    send_push(
+                        {"endpoint": sub.endpoint, "keys": {"p256dh": sub.p256dh, "auth": sub.auth}},
+                        json.loads(n.payload_json)
+                    )
+                n.sent = True
+            last_id = pending[-1][0].id
+            db.commit()
+            db.expunge_all()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _log_tier_backlog():
+    """Warn about plan tiers whose products are overdue by more than a full tier interval"""
+    db: Session = SessionLocal()
+    try:
+        for plan, backlog in tier_backlog(db).items():
+            if backlog["behind"]:
+                logger.warning(
+                    f"   🐢 {plan} tier behind: {backlog['behind']} of {backlog['due']} due products, "
+                    f"oldest {backlog['max_lag_seconds']}s late"
+                )
+    finally:
+        db.close()
+
+
+def _save_run(cycle: CycleRun, store_stats: dict, cycle_stats: dict, worker_id: str = None):
+    """Persist the cycle to the run log; a failure here never fails the cycle"""
+    db: Session = SessionLocal()
+    try:
+        save_run(
+            db, cycle, store_stats,
+            notify_seconds=cycle_stats.get("phases", {}).get("notify", 0.0),
+            mode="distributed" if worker_id else "local",
+            worker_id=worker_id
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"⚠️ Error saving repricing run: {e}")
+    finally:
+        db.close()
+
+
+async def run_cycle_async() -> bool:
+    """
+    Run one repricing cycle on the current event loop.
+
+    Each store's due products are split into batches and dispatched by a
+    weighted fair queue across tenants (weights from the owner's plan), with
+    at most ``settings.scheduler_store_concurrency`` units in flight. A large
+    store therefore shares the workers instead of delaying every smaller
+    store behind it. Each store only prices the products whose adaptive next
+    check is due; intervals follow the owner's plan tier.
+    
+    Only one cycle runs at a time (see ``cycle_coordinator``). Returns True
+    when triggers were skipped while it ran and a catch-up cycle is owed.
+    """
+    cycle = cycle_coordinator.begin(settings.scheduler_tick_seconds, settings.scheduler_max_cycle_seconds)
+    if cycle is None:
+        logger.warning("⏭️ Repricing cycle still running - trigger coalesced into a catch-up cycle")
+        return False
+    start_time = cycle.started_at
     
     logger.info("="*80)
     logger.info(f"🔄 REPRICING CYCLE STARTED at {start_time.strftime('%Y-%m-%d %H:%M:%S UTC')}")
+    if cycle.lag_seconds:
+        logger.info(f"   ⏰ Started {cycle.lag_seconds}s late" + (" (catch-up)" if cycle.catch_up else ""))
     logger.info("="*80)
     
-    db: Session = SessionLocal()
+    runs = {}
+    cycle_stats: dict = {}
     try:
-        # Only process active stores
-        stores = db.query(Store).filter(Store.is_active == True).all()
-        logger.info(f"📊 Processing {len(stores)} active store(s)")
-        for st in stores:
+        db: Session = SessionLocal()
+        try:
+            # Only process active stores
+            store_ids = [row[0] for row in db.query(Store.id).filter(Store.is_active == True).all()]
+        finally:
+            db.close()
+        logger.info(f"📊 Processing {len(store_ids)} active store(s)")
+        spapi_client_cache.retain(store_ids)
+        tenant_lag.retain(store_ids)
+        # Stores the previous cycle left unfinished are dispatched first
+        store_ids = cycle_coordinator.resume_order(store_ids)
+        cycle.stores_total = len(store_ids)
+        
+        # Interleave (store, batch) units across tenants, weighted by plan
+        queue = WeightedFairQueue(settings.scheduler_max_tenant_wait_seconds)
+        for store_id in store_ids:
             try:
-                # Try to create real SP-API client, fallback to mock if unavailable
-                real_client = create_spapi_client(st.refresh_token, st.region)
-                client = real_client if real_client else MockSPAPIClient(st.region, st.refresh_token)
-                
-                is_real_client = isinstance(client, AmazonSPAPIClient)
-                if is_real_client:
-                    logger.info(f"Using real SP-API client for store {st.id}")
-                else:
-                    logger.info(f"Using mock SP-API client for store {st.id} (real credentials not available)")
-                
-                products = db.query(Product).filter(Product.user_id == st.user_id).all()
-                logger.info(f"  📦 Store {st.id} ({st.store_name}): {len(products)} products")
-                
-                # Get marketplace ID from store
-                marketplace_id = st.marketplace_ids.split(",")[0] if st.marketplace_ids else "ATVPDKIKX0DER"
-                
-                for p in products:
-                    try:
-                        # Get competitive pricing - different method for real vs mock client
-                        if is_real_client:
-                            # Real SP-API client - use get_product_pricing
-                            pricing_result = _run_async(client.get_product_pricing(p.asin, marketplace_id))
-                            
-                            # Check if pricing failed due to authentication error
-                            if not pricing_result.get("success", False):
-                                error_msg = pricing_result.get("error", "")
-                                if "invalid_grant" in str(error_msg).lower() or "refresh_token" in str(error_msg).lower():
-                                    logger.error(f"🔒 Authentication failed for store {st.id} - marking as inactive")
-                                    st.is_active = False
-                                    db.commit()
-                                    break  # Skip remaining products for this store
-                            
-                            offers = _parse_sp_api_pricing_to_offers(pricing_result, marketplace_id)
-                        else:
-                            # Mock client - use get_competitive_pricing
-                            offers = _run_async(client.get_competitive_pricing(p.asin))
-                        
-                        products_processed += 1
-                        
-                        if not offers:
-                            logger.debug(f"No offers found for product {p.sku} (ASIN: {p.asin})")
-                            continue
-                        
-                        bb = determine_buybox(offers)
-                        owning = (bb.get("seller_id") == st.selling_partner_id) if bb else False
-                        if owning != p.buybox_owning:
-                            buybox_changes += 1
-                            status_change = "✅ GAINED" if owning else "❌ LOST"
-                            logger.info(f"  {status_change} Buy Box: {p.sku} ({p.title[:40]}...)")
-                            
-                            p.buybox_owning = owning
-                            p.buybox_owner = bb.get("seller_id") if bb else None
-                            db.add(PriceHistory(product_id=p.id, price=p.price, buybox_owning=owning))
-                            db.add(Notification(
-                                user_id=p.user_id,
-                                type=("BUYBOX_GAINED" if owning else "BUYBOX_LOST"),
-                                payload_json=json.dumps({"asin": p.asin, "owner": p.buybox_owner}),
-                                sent=False
-                            ))
-                        # Delete old competitor offers for this product to prevent bloat
-                        db.query(CompetitorOffer).filter(
-                            CompetitorOffer.product_id == p.id
-                        ).delete()
-                        
-                        # Store fresh competitor offers in database
-                        competitor_offers_list = []
-                        for o in offers:
-                            comp_offer = CompetitorOffer(
-                                product_id=p.id,
-                                seller_id=o.get("seller_id", ""),
-                                price=float(o.get("price", 0.0)),
-                                shipping=float(o.get("shipping", 0.0)),
-                                is_buybox=bool(o.get("is_buybox", False))
-                            )
-                            db.add(comp_offer)
-                            competitor_offers_list.append(comp_offer)
-                        
-                        # Skip repricing if product doesn't have repricing enabled
-                        if not p.repricing_enabled:
-                            continue
-                        
-                        # Use new RepricingEngine with advanced strategies
-                        engine = RepricingEngine(db)
-                        strategy = p.repricing_strategy or 'win_buybox'  # Default to Win Buy Box
-                        
-                        # Calculate optimal price using new engine
-                        repricing_result = engine.calculate_optimal_price(
-                            product=p,
-                            competitors=competitor_offers_list,
-                            strategy=strategy
-                        )
-                        
-                        # Check if repricing is needed
-                        if repricing_result['should_reprice']:
-                            new_price = repricing_result['new_price']
-                            
-                            # Update price on Amazon - different method for real vs mock client
-                            if is_real_client:
-                                # Real SP-API - use update_price with all required params
-                                result = _run_async(client.update_price(
-                                    p.sku, 
-                                    st.selling_partner_id, 
-                                    marketplace_id, 
-                                    new_price
-                                ))
-                                ok = result.get("success", False)
-                            else:
-                                # Mock client - simple update_price
-                                ok = _run_async(client.update_price(p.sku, new_price))
-                            
-                            if ok:
-                                products_repriced += 1
-                                old_price = p.price
-                                p.price = new_price
-                                p.last_repriced_at = datetime.utcnow()
-                                p.competitor_count = repricing_result.get('competitor_count', len(offers))
-                                p.lowest_competitor_price = repricing_result.get('lowest_competitor_price')
-                                
-                                # Log price change
-                                db.add(PriceHistory(
-                                    product_id=p.id,
-                                    price=new_price,
-                                    buybox_owning=p.buybox_owning
-                                ))
-                                
-                                db.add(Notification(
-                                    user_id=p.user_id,
-                                    type="PRICE_CHANGED",
-                                    payload_json=json.dumps({
-                                        "asin": p.asin,
-                                        "sku": p.sku,
-                                        "old_price": old_price,
-                                        "new_price": new_price,
-                                        "strategy": strategy,
-                                        "reason": repricing_result.get('reason', ''),
-                                        "buybox_chance": repricing_result.get('estimated_buybox_chance', 0)
-                                    }),
-                                    sent=False
-                                ))
-                                
-                                price_change = ((new_price - old_price) / old_price) * 100
-                                logger.info(
-                                    f"  💰 REPRICED {p.sku}: ${old_price:.2f} → ${new_price:.2f} ({price_change:+.1f}%) | "
-                                    f"Strategy: {strategy.upper()} | Buy Box: {repricing_result.get('estimated_buybox_chance', 0)}%"
-                                )
-                    except Exception as e:
-                        logger.error(f"  ⚠️ Error processing product {p.sku}: {e}")
-                        continue  # Continue with next product
+                opened = _open_store(store_id)
             except Exception as e:
-                logger.error(f"⚠️ Error processing store {st.id}: {e}")
-                continue  # Continue with next store
-                
-        db.commit()
-        pending = db.query(Notification, User).join(User, User.id == Notification.user_id).filter(Notification.sent == False).all()
-        for n, u in pending:
-            send_email(u.email, f"[BuyBox] {n.type}", n.payload_json)
-            for row in db.execute(text("SELECT endpoint, p256dh, auth FROM push_subscriptions WHERE user_id=:uid"), {"uid": u.id}):
-                send_push(
-                    {"endpoint": row[0], "keys": {"p256dh": row[1], "auth": row[2]}},
-                    json.loads(n.payload_json)
-                )
-            n.sent = True
-        db.commit()
+                logger.error(f"⚠️ Error processing store {store_id}: {e}")
+                continue
+            if opened is None:
+                continue
+            run, due_ids = opened
+            runs[store_id] = run
+            queue.add(
+                store_id,
+                get_scheduling_weight(run.label["plan"] or 'free'),
+                chunk(due_ids, settings.scheduler_batch_size)
+            )
+        
+        # Stores selling the same ASIN share one pricing fetch per cycle
+        pool = CycleOfferPool()
+        await queue.run(
+            settings.scheduler_store_concurrency,
+            lambda store_id, product_ids: _run_store_unit(queue, runs[store_id], product_ids, pool, cycle)
+        )
+        results = [run.stats for run in runs.values()]
+        tenant_lag.finish_cycle({store_id: run.label for store_id, run in runs.items()})
+        
+        with timed(cycle_stats, "notify"):
+            _dispatch_notifications()
         
         # Log cycle summary
         end_time = datetime.utcnow()
         duration = (end_time - start_time).total_seconds()
         logger.info("="*80)
         logger.info(f"✅ REPRICING CYCLE COMPLETED in {duration:.1f}s")
-        logger.info(f"   📦 Products Processed: {products_processed}")
-        logger.info(f"   💰 Products Repriced: {products_repriced}")
-        logger.info(f"   🎯 Buy Box Changes: {buybox_changes}")
+        logger.info(f"   📦 Products Processed: {sum(r['products_processed'] for r in results)}")
+        logger.info(f"   💰 Products Repriced: {sum(r['products_repriced'] for r in results)}")
+        processed = sum(r['products_processed'] for r in results)
+        unchanged = sum(r['products_unchanged'] for r in results)
+        if processed:
+            logger.info(f"   💤 Products Unchanged (skipped): {unchanged} ({unchanged / processed:.0%})")
+        logger.info(f"   🎯 Buy Box Changes: {sum(r['buybox_changes'] for r in results)}")
+        deferred = sum(r.get("deferred", 0) for r in results)
+        if deferred:
+            logger.info(f"   ⏳ Products Deferred (quota): {deferred}")
+        timed_out = sum(1 for r in results if r.get("timed_out"))
+        if timed_out:
+            logger.info(f"   ⏱️ Stores Timed Out: {timed_out}")
+        pool_stats = pool.stats()
+        if pool_stats["keys_shared"]:
+            logger.info(
+                f"   🤝 Pricing Keys: {pool_stats['keys_fetched']} fetched, "
+                f"{pool_stats['keys_shared']} shared across stores"
+            )
+        short_circuited = sum(1 for r in results if r.get("circuit_open"))
+        if short_circuited:
+            logger.info(f"   🔌 Stores Short-Circuited: {short_circuited}")
+        totals = merge_stats({}, cycle_stats)
+        for r in results:
+            merge_stats(totals, {"phases": r.get("phases", {})})
+        phases = totals.get("phases", {})
+        logger.info("   ⏱️ Phases: " + ", ".join(f"{phase} {phases.get(phase, 0.0):.1f}s" for phase in PHASES))
+        if cycle.unfinished:
+            logger.warning(
+                f"   ⏸️ Cycle overran its {settings.scheduler_max_cycle_seconds}s budget - "
+                f"{len(cycle.unfinished)} store(s) checkpointed to resume first"
+            )
+        _log_tier_backlog()
         logger.info("="*80)
     except Exception as e:
         logger.error(f"❌ Error in repricing cycle: {e}", exc_info=True)
+    finally:
+        catch_up = cycle_coordinator.finish(cycle, settings.scheduler_tick_seconds)
+    _save_run(cycle, {store_id: run.stats for store_id, run in runs.items()}, cycle_stats)
+    if catch_up:
+        logger.warning("⏭️ Triggers were skipped while the cycle ran - starting one catch-up cycle")
+    return catch_up
+
+
+def _enqueue_cycle() -> int:
+    """
+    Plan stores that have no open work items and persist their units.
+
+    Units are stored in the order a weighted fair queue would dispatch them,
+    so workers leasing oldest-first interleave tenants by plan weight. Stores
+    whose previous units are still pending or leased are skipped, so a slow
+    store is never planned twice.
+    """
+    db: Session = SessionLocal()
+    try:
+        busy = work_queue.stores_with_open_work(db)
+        store_ids = [
+            row[0] for row in db.query(Store.id).filter(Store.is_active == True).all()
+            if row[0] not in busy
+        ]
+    finally:
+        db.close()
+    
+    queue = WeightedFairQueue(settings.scheduler_max_tenant_wait_seconds)
+    for store_id in store_ids:
+        try:
+            opened = _open_store(store_id)
+        except Exception as e:
+            logger.error(f"⚠️ Error planning store {store_id}: {e}")
+            continue
+        if opened is None:
+            continue
+        run, due_ids = opened
+        queue.add(store_id, get_scheduling_weight(run.label["plan"] or 'free'), chunk(due_ids, settings.scheduler_batch_size))
+    
+    units = []
+    while queue.pending():
+        store_id, product_ids = queue.next()
+        units.append((store_id, product_ids))
+        queue.done(store_id)
+    
+    db = SessionLocal()
+    try:
+        return work_queue.enqueue(db, units)
+    finally:
+        db.close()
+
+
+def _load_store_run(store_id: int):
+    """A store's client and in-flight feed products for one leased work item, or None if it is inactive"""
+    db: Session = SessionLocal()
+    try:
+        st = db.query(Store).filter(Store.id == store_id).first()
+        if not st or not st.is_active:
+            spapi_client_cache.evict(store_id)
+            return None
+        client, is_real_client = _store_client(st)
+        in_flight = pending_feed_product_ids(db, st.id) if is_real_client else set()
+        return _StoreRun(st, client, is_real_client, in_flight)
+    finally:
+        db.close()
+
+
+def _holds_lease(item_id: int, worker_id: str) -> bool:
+    db: Session = SessionLocal()
+    try:
+        return work_queue.heartbeat(db, item_id, worker_id)
+    finally:
+        db.close()
+
+
+def _finish_item(item_id: int, worker_id: str, error: str = None):
+    db: Session = SessionLocal()
+    try:
+        work_queue.finish(db, item_id, worker_id, error)
+    finally:
+        db.close()
+
+
+async def _off_loop(fn, *args):
+    """Run a blocking work-queue call on the default executor, off the worker's event loop"""
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+async def _work_item(item_id: int, store_id: int, product_ids: list, worker_id: str, pool: CycleOfferPool) -> dict:
+    """
+    Price one leased (store, batch) work item.
+
+    Prices are only pushed while the lease is still held: if it expired and
+    another worker took the item over, this worker's results are discarded
+    instead of double-pricing the batch.
+    """
+    run = await _off_loop(_load_store_run, store_id)
+    if run is None:
+        await _off_loop(_finish_item, item_id, worker_id)
+        return _empty_store_stats()
+    await _process_store_batch(run, product_ids, pool)
+    if not await _off_loop(_holds_lease, item_id, worker_id):
+        logger.warning(f"🔒 Lost lease on work item {item_id} (store {store_id}) - not pushing its prices")
+        return run.stats
+    await _push_store_changes(run)
+    await _off_loop(_finish_item, item_id, worker_id)
+    return run.stats
+
+
+async def _run_leased_item(item: work_queue.LeasedItem, worker_id: str, pool: CycleOfferPool) -> dict:
+    """
+    Work a leased item under the unit deadline, renewing its lease until done
+
+    If the worker itself is cancelled, the item's uncommitted work is rolled
+    back, its lease is released for a retry and the cancellation propagates.
+    """
+    item_id, store_id = item.id, item.store_id
+    task = asyncio.ensure_future(_work_item(item_id, store_id, item.product_ids, worker_id, pool))
+    lost_lease = False
+    
+    async def keep_lease():
+        nonlocal lost_lease
+        while not task.done():
+            await asyncio.sleep(settings.scheduler_lease_seconds / 3)
+            if not task.done() and not await _off_loop(_holds_lease, item_id, worker_id):
+                logger.warning(f"🔒 Lost lease on work item {item_id} (store {store_id}) - abandoning it")
+                lost_lease = True
+                task.cancel()
+    
+    heartbeat = asyncio.ensure_future(keep_lease())
+    try:
+        return await asyncio.wait_for(task, timeout=settings.scheduler_store_timeout_seconds)
+    except asyncio.CancelledError:
+        if lost_lease:
+            # Another worker owns the item now; only this attempt is abandoned
+            return _empty_store_stats()
+        # wait_for has already cancelled the unit, which rolled its session back
+        await _off_loop(_finish_item, item_id, worker_id, "cancelled")
+        raise
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"⏱️ Work item {item_id} (store {store_id}) exceeded its "
+            f"{settings.scheduler_store_timeout_seconds}s deadline - cancelled"
+        )
+        await _off_loop(_finish_item, item_id, worker_id, "timed out")
+        return {**_empty_store_stats(), "timed_out": True, "errors": 1}
+    except Exception as e:
+        logger.error(f"⚠️ Error processing work item {item_id} (store {store_id}): {e}")
+        await _off_loop(_finish_item, item_id, worker_id, str(e))
+        return {**_empty_store_stats(), "failed": True, "errors": 1}
+    finally:
+        heartbeat.cancel()
+
+
+async def run_worker_cycle_async(worker_id: str) -> bool:
+    """
+    Run one distributed repricing tick as worker ``worker_id``.
+
+    Whichever worker gets the planning advisory lock enqueues due work; then
+    every worker leases items (``FOR UPDATE SKIP LOCKED``) and prices them,
+    at most ``settings.scheduler_store_concurrency`` at a time, until the
+    queue is empty. Workers are interchangeable; there is no leader.
+    Unfinished items stay leased or pending in the table, which is this
+    mode's checkpoint.
+    """
+    cycle = cycle_coordinator.begin(settings.scheduler_tick_seconds)
+    if cycle is None:
+        return False
+    start_time = cycle.started_at
+    store_stats: dict = {}
+    cycle_stats: dict = {}
+    try:
+        with work_queue.advisory_lock("repricing-plan") as acquired:
+            if acquired:
+                enqueued = _enqueue_cycle()
+                if enqueued:
+                    logger.info(f"🗂️ Worker {worker_id} enqueued {enqueued} work item(s)")
+        
+        pool = CycleOfferPool()
+        results = []
+        while True:
+            db: Session = SessionLocal()
+            try:
+                items = work_queue.lease(db, worker_id, settings.scheduler_store_concurrency)
+            finally:
+                db.close()
+            if not items:
+                break
+            unit_stats = await asyncio.gather(*(_run_leased_item(item, worker_id, pool) for item in items))
+            for item, stats in zip(items, unit_stats):
+                merge_stats(store_stats.setdefault(item.store_id, {}), stats)
+            results += unit_stats
+        
+        cycle.stores_total = len(store_stats)
+        if results:
+            with timed(cycle_stats, "notify"):
+                _dispatch_notifications()
+            duration = (datetime.utcnow() - start_time).total_seconds()
+            logger.info(
+                f"✅ Worker {worker_id}: {len(results)} work item(s) in {duration:.1f}s, "
+                f"{sum(r['products_processed'] for r in results)} processed, "
+                f"{sum(r['products_unchanged'] for r in results)} unchanged, "
+                f"{sum(r['products_repriced'] for r in results)} repriced, "
+                f"{sum(r['buybox_changes'] for r in results)} Buy Box changes"
+            )
+    except Exception as e:
+        logger.error(f"❌ Error in worker cycle: {e}", exc_info=True)
+    finally:
+        catch_up = cycle_coordinator.finish(cycle, settings.scheduler_tick_seconds)
+    if store_stats:
+        # Idle ticks are not logged
+        _save_run(cycle, store_stats, cycle_stats, worker_id)
+    return catch_up
+
+
+async def _reprice_seller_offer_changes(seller_id: str, changes: list) -> dict:
+    """Reprice the SKUs of one seller named by its ANY_OFFER_CHANGED notifications"""
+    stats = _empty_store_stats()
+    db: Session = SessionLocal()
+    try:
+        stores = db.query(Store).filter(
+            Store.selling_partner_id == seller_id,
+            Store.is_active == True
+        ).all()
+        for st in stores:
+            client, is_real_client = _store_client(st)
+            marketplace_id = _store_marketplace(st)
+            offers_by_listing = {
+                (c["marketplace_id"] or marketplace_id, c["asin"], c["condition"]): c["offers"]
+                for c in changes
+            }
+            products = db.query(Product).filter(
+                Product.user_id == st.user_id,
+                Product.asin.in_({c["asin"] for c in changes})
+            ).all()
+            in_flight = pending_feed_product_ids(db, st.id) if is_real_client else set()
+            
+            price_changes = []
+            offer_writer = OfferSnapshotWriter()
+            for p in products:
+                key = (p.marketplace_id or marketplace_id, p.asin, (p.condition_type or "New").lower())
+                if key not in offers_by_listing:
+                    continue
+                try:
+                    change = _apply_offers(db, st, p, offers_by_listing[key], marketplace_id, stats, offer_writer)
+                    if change is not None and p.id not in in_flight:
+                        price_changes.append(change)
+                except Exception as e:
+                    logger.error(f"  ⚠️ Error processing offer change for {p.sku}: {e}")
+            offer_writer.flush(db)
+            
+            if price_changes:
+                stats["products_repriced"] += await _push_price_changes(
+                    db, st, client, is_real_client, price_changes
+                )
+            db.commit()
+        return stats
+    except Exception:
         db.rollback()
+        raise
     finally:
         db.close()
 
 
-def start_scheduler():
-    sch = BackgroundScheduler(daemon=True)
-    sch.add_job(run_cycle, "interval", minutes=10, id="poll-buybox", replace_existing=True)
+async def reprice_from_offer_notifications(queue: NotificationQueue = None) -> dict:
+    """
+    Drain one batch of ANY_OFFER_CHANGED notifications and reprice only the
+    affected SKUs.
+
+    Only the newest notification per listing in the batch is applied.
+    Messages are acknowledged even if a seller fails; the polling cycle
+    remains the safety net for anything missed here.
+    """
+    queue = queue or offer_notification_queue
+    if queue is None:
+        return {"received": 0, **_empty_store_stats()}
+    messages = queue.receive(settings.offer_notification_batch_size)
+    totals = {"received": len(messages), **_empty_store_stats()}
+    if not messages:
+        return totals
+    
+    changes = [c for c in (parse_any_offer_changed(m.body) for m in messages) if c]
+    by_seller: dict = {}
+    for change in latest_per_listing(changes):
+        by_seller.setdefault(change["seller_id"], []).append(change)
+    
+    for seller_id, seller_changes in by_seller.items():
+        try:
+            stats = await _reprice_seller_offer_changes(seller_id, seller_changes)
+            for k in _empty_store_stats():
+                totals[k] += stats[k]
+        except Exception as e:
+            logger.error(f"⚠️ Error repricing offer changes for seller {seller_id}: {e}")
+    
+    queue.ack(messages)
+    
+    if totals["products_repriced"] or totals["buybox_changes"]:
+        _dispatch_notifications()
+    logger.info(
+        f"🔔 Offer notifications: {totals['received']} received, {totals['products_processed']} SKUs checked, "
+        f"{totals['products_repriced']} repriced"
+    )
+    return totals
+
+
+def run_cycle():
+    """APScheduler entry point: one event loop drives the whole cycle, then any owed catch-up cycle"""
+    while asyncio.run(run_cycle_async()):
+        pass
+
+
+def run_worker_cycle(worker_id: str):
+    """APScheduler entry point for distributed mode"""
+    while asyncio.run(run_worker_cycle_async(worker_id)):
+        pass
+
+
+def run_feed_reconciliation():
+    """APScheduler entry point: reconcile finished price feeds (one process at a time)"""
+    try:
+        with work_queue.advisory_lock("price-feed-reconciliation") as acquired:
+            if not acquired:
+                return
+            totals = asyncio.run(reconcile_price_feeds())
+        if totals["reconciled"] or totals["failed"]:
+            logger.info(f"📥 Price feeds: {totals['reconciled']} reconciled, {totals['failed']} failed")
+    except Exception as e:
+        logger.error(f"❌ Error reconciling price feeds: {e}", exc_info=True)
+
+
+def run_offer_notification_consumer():
+    """APScheduler entry point: react to queued ANY_OFFER_CHANGED notifications"""
+    try:
+        asyncio.run(reprice_from_offer_notifications())
+    except Exception as e:
+        logger.error(f"❌ Error consuming offer notifications: {e}", exc_info=True)
+
+
+def _note_skipped_cycle(event):
+    if event.job_id == "poll-buybox":
+        cycle_coordinator.note_skipped()
+
+
+def start_scheduler(sch=None, worker_id: str = None):
+    """
+    Register the scheduler jobs and start them.
+
+    In "distributed" mode each process is one of many interchangeable
+    workers identified by ``worker_id``; see ``app.worker``.
+    """
+    sch = sch or BackgroundScheduler(daemon=True)
+    # Ticks often; each tick only prices products whose adaptive next check is due
+    if settings.scheduler_mode == "distributed":
+        worker_id = worker_id or work_queue.default_worker_id()
+        sch.add_job(
+            run_worker_cycle, "interval", seconds=settings.scheduler_tick_seconds, args=[worker_id],
+            id="poll-buybox", replace_existing=True, max_instances=1, coalesce=True
+        )
+    else:
+        sch.add_job(
+            run_cycle, "interval", seconds=settings.scheduler_tick_seconds,
+            id="poll-buybox", replace_existing=True, max_instances=1, coalesce=True
+        )
+    sch.add_listener(_note_skipped_cycle, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+    sch.add_job(
+        run_feed_reconciliation, "interval", seconds=settings.price_feed_poll_seconds,
+        id="reconcile-price-feeds", replace_existing=True
+    )
+    if offer_notification_queue is not None:
+        sch.add_job(
+            run_offer_notification_consumer, "interval", seconds=settings.offer_notification_poll_seconds,
+            id="offer-notifications", replace_existing=True
+        )
     sch.start()
     return sch
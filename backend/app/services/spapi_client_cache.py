@@ -0,0 +1,181 @@
+# backend/app/services/spapi_client_cache.py
+"""
+Process-wide cache of SP-API clients and LWA access tokens
+
+Building an AmazonSPAPIClient decrypts the store's refresh token and creates
+six python-amazon-sp-api API objects, each of which would otherwise exchange
+the refresh token for its own LWA access token (the library's shared token
+cache only holds 10 entries, far fewer than our connected stores).
+
+Here clients are cached per store and reused across cycles, and all API
+objects of a store share a single access token that is refreshed shortly
+before its `expires_in`. Entries are evicted when a store is deactivated,
+disconnected or re-authorised with a new refresh token.
+"""
+import time
+import hashlib
+import threading
+import logging
+from typing import Dict, Any, Optional, Iterable, Tuple
+
+from .amazon_spapi import create_spapi_client, AmazonSPAPIClient, SPAPI_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+# Refresh access tokens this many seconds before Amazon expires them
+TOKEN_REFRESH_MARGIN_SECONDS = 120
+# Drop clients for stores that have not been used for this long
+CLIENT_IDLE_TTL_SECONDS = 6 * 3600
+
+
+class LWATokenCache:
+    """Access tokens keyed by refresh token fingerprint, valid until expiry"""
+
+    def __init__(self):
+        self._tokens: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.refreshes = 0
+
+    @staticmethod
+    def key_for(refresh_token: str, client_id: str) -> str:
+        return hashlib.sha256(f"{client_id}:{refresh_token}".encode()).hexdigest()
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, key: str, fetch) -> Dict[str, Any]:
+        """Return a live token for `key`, calling `fetch()` at most once per expiry"""
+        entry = self._tokens.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        # One LWA round-trip per store even when several API objects ask at once
+        with self._key_lock(key):
+            entry = self._tokens.get(key)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            token = fetch()
+            expires_in = int(token.get("expires_in") or 3600)
+            expires_at = time.monotonic() + max(0, expires_in - TOKEN_REFRESH_MARGIN_SECONDS)
+            self._tokens[key] = (token, expires_at)
+            self.refreshes += 1
+            return token
+
+    def evict(self, key: str):
+        self._tokens.pop(key, None)
+
+    def clear(self):
+        self._tokens.clear()
+
+
+lwa_token_cache = LWATokenCache()
+
+
+if SPAPI_AVAILABLE:
+    from sp_api.auth import AccessTokenClient, AccessTokenResponse
+
+    class SharedAccessTokenClient(AccessTokenClient):
+        """AccessTokenClient that serves every API object of a store from lwa_token_cache"""
+
+        def get_auth(self) -> AccessTokenResponse:
+            key = LWATokenCache.key_for(self.cred.refresh_token, self.cred.client_id)
+            token = lwa_token_cache.get(
+                key,
+                lambda: self._request(self.scheme + self.host + self.path, self.data, self.headers)
+            )
+            return AccessTokenResponse(**token)
+else:
+    SharedAccessTokenClient = None
+
+
+class _CachedClient:
+    __slots__ = ("client", "fingerprint", "token_key", "last_used")
+
+    def __init__(self, client: AmazonSPAPIClient, fingerprint: str, token_key: str):
+        self.client = client
+        self.fingerprint = fingerprint
+        self.token_key = token_key
+        self.last_used = time.monotonic()
+
+
+class SPAPIClientCache:
+    """AmazonSPAPIClient instances keyed by store id"""
+
+    def __init__(self):
+        self._clients: Dict[int, _CachedClient] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _fingerprint(store) -> str:
+        # The encrypted token changes whenever the store is re-authorised,
+        # so it identifies the credentials without decrypting them
+        raw = f"{store._encrypted_refresh_token}|{store.region}|{store.selling_partner_id}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, store) -> Optional[AmazonSPAPIClient]:
+        """Return the store's cached client, building it on first use"""
+        fingerprint = self._fingerprint(store)
+        with self._lock:
+            entry = self._clients.get(store.id)
+            if entry and entry.fingerprint == fingerprint:
+                entry.last_used = time.monotonic()
+                self.hits += 1
+                return entry.client
+
+        self.misses += 1
+        client = create_spapi_client(
+            store.refresh_token,
+            store.region,
+            store.selling_partner_id,
+            auth_token_client_class=SharedAccessTokenClient
+        )
+        if client is None:
+            return None
+
+        with self._lock:
+            stale = self._clients.get(store.id)
+            self._clients[store.id] = _CachedClient(
+                client, fingerprint, LWATokenCache.key_for(client.refresh_token, client.client_id)
+            )
+        if stale and stale.token_key != self._clients[store.id].token_key:
+            lwa_token_cache.evict(stale.token_key)
+        return client
+
+    def evict(self, store_id: int):
+        """Forget a store's client and access token (deactivated/disconnected)"""
+        with self._lock:
+            entry = self._clients.pop(store_id, None)
+        if entry:
+            lwa_token_cache.evict(entry.token_key)
+            logger.info(f"Evicted cached SP-API client for store {store_id}")
+
+    def retain(self, active_store_ids: Iterable[int]):
+        """Evict every store not in `active_store_ids`, plus clients idle past their TTL"""
+        active = set(active_store_ids)
+        cutoff = time.monotonic() - CLIENT_IDLE_TTL_SECONDS
+        with self._lock:
+            to_evict = [
+                store_id for store_id, entry in self._clients.items()
+                if store_id not in active or entry.last_used < cutoff
+            ]
+        for store_id in to_evict:
+            self.evict(store_id)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "cached_clients": len(self._clients),
+            "hits": self.hits,
+            "misses": self.misses,
+            "token_refreshes": lwa_token_cache.refreshes,
+        }
+
+
+spapi_client_cache = SPAPIClientCache()
+
+
+def get_store_client(store) -> Optional[AmazonSPAPIClient]:
+    """Cached SP-API client for a Store row, or None when SP-API is not configured"""
+    return spapi_client_cache.get(store)
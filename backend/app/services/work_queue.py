@@ -0,0 +1,209 @@
+# backend/app/services/work_queue.py
+"""
+Postgres-backed work queue for distributed scheduler workers
+
+Repricing work is persisted as (store, batch of product ids) rows in
+repricing_work_items. Any worker may plan a cycle, guarded by an advisory
+lock so only one of them enqueues at a time, and every worker leases items
+with `SELECT ... FOR UPDATE SKIP LOCKED`, so concurrent workers never take
+the same item and there is no leader.
+
+A lease lasts `scheduler_lease_seconds` and is extended by heartbeats while
+the item is worked on. Items whose lease expired (worker crashed or hung)
+become claimable again, up to `scheduler_max_attempts` times. A worker must
+still hold the lease before pushing prices, so an item taken over after
+expiry is never priced twice.
+"""
+import json
+import os
+import socket
+import zlib
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Optional, Iterable, Tuple, Set, NamedTuple
+
+from sqlalchemy import text, or_, and_, func
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models import RepricingWorkItem
+
+logger = logging.getLogger(__name__)
+
+PENDING = "PENDING"
+LEASED = "LEASED"
+DONE = "DONE"
+FAILED = "FAILED"
+
+# Finished items are kept this long for inspection
+FINISHED_RETENTION = timedelta(days=1)
+
+
+class LeasedItem(NamedTuple):
+    id: int
+    store_id: int
+    product_ids: List[int]
+    attempts: int
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def lock_key(name: str) -> int:
+    """Stable signed 32-bit key for pg advisory locks"""
+    return zlib.crc32(name.encode()) - 2 ** 31
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+@contextmanager
+def advisory_lock(name: str):
+    """
+    Try to take a cluster-wide advisory lock; yields whether it was acquired
+
+    Without Postgres (local SQLite runs) there is only one process, so the
+    lock is always granted.
+    """
+    db: Session = SessionLocal()
+    acquired = False
+    try:
+        if not _is_postgres(db):
+            acquired = True
+            yield True
+            return
+        acquired = bool(db.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": lock_key(name)}).scalar())
+        yield acquired
+    finally:
+        if acquired and _is_postgres(db):
+            db.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": lock_key(name)})
+        db.close()
+
+
+def stores_with_open_work(db: Session) -> Set[int]:
+    """Stores that still have pending or leased items (not planned again until drained)"""
+    return {
+        row[0] for row in db.query(RepricingWorkItem.store_id).filter(
+            RepricingWorkItem.status.in_((PENDING, LEASED))
+        ).distinct().all()
+    }
+
+
+def enqueue(db: Session, units: Iterable[Tuple[int, List[int]]]) -> int:
+    """Persist (store_id, product_ids) units in dispatch order"""
+    now = datetime.utcnow()
+    count = 0
+    for sequence, (store_id, product_ids) in enumerate(units):
+        db.add(RepricingWorkItem(
+            store_id=store_id,
+            product_ids_json=json.dumps(product_ids),
+            sequence=sequence,
+            status=PENDING,
+            created_at=now
+        ))
+        count += 1
+    db.query(RepricingWorkItem).filter(
+        RepricingWorkItem.status.in_((DONE, FAILED)),
+        RepricingWorkItem.finished_at < now - FINISHED_RETENTION
+    ).delete(synchronize_session=False)
+    db.commit()
+    return count
+
+
+def lease(db: Session, worker_id: str, limit: int) -> List[LeasedItem]:
+    """
+    Claim up to `limit` items: pending ones, or leased ones whose lease expired
+
+    Rows locked by another worker's claim are skipped, not waited for.
+    Expired items that have no attempts left are failed first, so they
+    stop holding their store out of planning.
+    """
+    now = datetime.utcnow()
+    db.query(RepricingWorkItem).filter(
+        RepricingWorkItem.status == LEASED,
+        RepricingWorkItem.lease_expires_at < now,
+        RepricingWorkItem.attempts >= settings.scheduler_max_attempts
+    ).update({
+        RepricingWorkItem.status: FAILED,
+        RepricingWorkItem.lease_owner: None,
+        RepricingWorkItem.lease_expires_at: None,
+        RepricingWorkItem.finished_at: now,
+        RepricingWorkItem.error_message: "lease expired on the last attempt",
+    }, synchronize_session=False)
+    items = db.query(RepricingWorkItem).filter(
+        or_(
+            RepricingWorkItem.status == PENDING,
+            and_(RepricingWorkItem.status == LEASED, RepricingWorkItem.lease_expires_at < now)
+        ),
+        RepricingWorkItem.attempts < settings.scheduler_max_attempts
+    ).order_by(
+        RepricingWorkItem.created_at, RepricingWorkItem.sequence
+    ).limit(limit).with_for_update(skip_locked=True).all()
+
+    for item in items:
+        if item.status == LEASED:
+            logger.warning(f"♻️ Work item {item.id} lease of {item.lease_owner} expired - taking it over")
+        item.status = LEASED
+        item.lease_owner = worker_id
+        item.lease_expires_at = now + timedelta(seconds=settings.scheduler_lease_seconds)
+        item.heartbeat_at = now
+        item.attempts += 1
+    leased = [LeasedItem(item.id, item.store_id, json.loads(item.product_ids_json), item.attempts) for item in items]
+    db.commit()
+    return leased
+
+
+def heartbeat(db: Session, item_id: int, worker_id: str) -> bool:
+    """Extend this worker's lease; False if the item is no longer ours"""
+    now = datetime.utcnow()
+    updated = db.query(RepricingWorkItem).filter(
+        RepricingWorkItem.id == item_id,
+        RepricingWorkItem.status == LEASED,
+        RepricingWorkItem.lease_owner == worker_id
+    ).update({
+        RepricingWorkItem.heartbeat_at: now,
+        RepricingWorkItem.lease_expires_at: now + timedelta(seconds=settings.scheduler_lease_seconds),
+    }, synchronize_session=False)
+    db.commit()
+    return updated == 1
+
+
+def finish(db: Session, item_id: int, worker_id: str, error: Optional[str] = None):
+    """
+    Close this worker's lease: DONE on success; on error back to PENDING, or
+    FAILED once attempts are used up
+    """
+    item = db.query(RepricingWorkItem).filter(
+        RepricingWorkItem.id == item_id,
+        RepricingWorkItem.lease_owner == worker_id,
+        RepricingWorkItem.status == LEASED
+    ).first()
+    if item is None:
+        db.rollback()
+        return
+    item.lease_owner = None
+    item.lease_expires_at = None
+    if error is None:
+        item.status = DONE
+        item.finished_at = datetime.utcnow()
+    else:
+        item.error_message = error
+        if item.attempts >= settings.scheduler_max_attempts:
+            item.status = FAILED
+            item.finished_at = datetime.utcnow()
+        else:
+            item.status = PENDING
+    db.commit()
+
+
+def queue_depth(db: Session) -> dict:
+    """Items per status, for diagnostics"""
+    return {
+        status: count for status, count in db.query(
+            RepricingWorkItem.status, func.count(RepricingWorkItem.id)
+        ).group_by(RepricingWorkItem.status).all()
+    }
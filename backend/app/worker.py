@@ -0,0 +1,34 @@
+"""
+Standalone scheduler worker
+
+    SCHEDULER_MODE=distributed python -m app.worker
+
+Runs the repricing, price-feed and offer-notification jobs outside the API.
+Start as many workers as needed; they share work through the
+repricing_work_items table. API processes should then run with
+SCHEDULER_ENABLED=false.
+"""
+import logging
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from .config import settings
+from .database import init_db
+from .services import work_queue
+from .services.scheduler import start_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    init_db()
+    worker_id = work_queue.default_worker_id()
+    if settings.scheduler_mode != "distributed":
+        logger.warning("SCHEDULER_MODE is not 'distributed' - this worker assumes it is the only scheduler")
+    logger.info(f"👷 Scheduler worker {worker_id} starting ({settings.scheduler_mode} mode)")
+    start_scheduler(BlockingScheduler(), worker_id=worker_id)
+
+
+if __name__ == "__main__":
+    main()
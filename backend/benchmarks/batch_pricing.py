@@ -0,0 +1,75 @@
+"""
+Benchmark: scalar pricing core vs vectorized batch pricing
+
+    python -m benchmarks.batch_pricing [--sizes 10000 100000 1000000] [--offers 5] [--processes N]
+
+Builds synthetic products with competitor offers and prices them once per
+path: the scalar core one product at a time, and price_batch over the
+columnar arrays. build_batch (turning products and offers into arrays) is
+timed separately, since a caller that keeps its inputs columnar skips it.
+With --processes, pricing_core.price_records also prices the products as
+PricingRecords (offers packed as stored), in-process and sharded over N
+worker processes; the speed-up needs N free cores.
+"""
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from app.services.batch_pricing import build_batch, price_batch
+from app.services.pricing_core import calculate_optimal_price, price_records, record_for
+from app.services.offer_snapshots import StoredOffer
+
+STRATEGIES = ("win_buybox", "maximize_profit", "boost_sales")
+
+
+def make_products(count: int, offers: int, rng: random.Random):
+    products, competitors_by_product = [], {}
+    for i in range(count):
+        lowest = round(rng.uniform(5, 100), 2)
+        products.append(SimpleNamespace(
+            id=i, price=round(lowest * rng.uniform(0.8, 1.2), 2), min_price=round(lowest * 0.7, 2),
+            max_price=round(lowest * 1.8, 2), target_margin_percent=15.0, repricing_strategy=rng.choice(STRATEGIES),
+            lowest_competitor_price=None,
+        ))
+        competitors_by_product[i] = [
+            StoredOffer(f"S{j}", round(lowest * rng.uniform(1, 1.2), 2), 0.0, j == 0) for j in range(offers)
+        ]
+    return products, competitors_by_product
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--offers", type=int, default=5)
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'products':>10} {'scalar':>9} {'build':>9} {'vector':>9} {'speed-up (vector / build+vector)':>34}")
+    for size in args.sizes:
+        products, competitors_by_product = make_products(size, args.offers, rng)
+        scalar, _ = timed(lambda: [
+            calculate_optimal_price(p, competitors_by_product[p.id], p.repricing_strategy) for p in products
+        ])
+        build, batch = timed(lambda: build_batch(products, competitors_by_product))
+        vector, _ = timed(lambda: price_batch(batch))
+        print(f"{size:>10} {scalar:>8.3f}s {build:>8.3f}s {vector:>8.3f}s "
+              f"{scalar / vector:>14.0f}x / {scalar / (build + vector):.1f}x")
+        if args.processes > 1:
+            records = [record_for(p, competitors_by_product[p.id]) for p in products]
+            single, _ = timed(lambda: price_records(records))
+            price_records(records[:args.processes], args.processes)  # start the long-lived pool first
+            sharded, _ = timed(lambda: price_records(records, args.processes))
+            print(f"{'':>10} price_records: in-process {single:.3f}s, "
+                  f"{args.processes} processes {sharded:.3f}s ({single / sharded:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
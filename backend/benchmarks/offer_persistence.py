@@ -0,0 +1,139 @@
+"""
+Benchmark: per-offer competitor_offers rows vs packed offer_snapshots
+
+    python -m benchmarks.offer_persistence [--products 2000] [--offers 8] [--database-url URL]
+
+Seeds one user's products with stored offers, then replaces every product's
+offers twice per path (as two consecutive cycles would) and reads them back
+one product at a time (as the engine does), reporting the best times and
+the rows each layout stores. Defaults to a throwaway SQLite file; pass a PostgreSQL URL to
+measure against the production database engine.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import User, Product, CompetitorOffer, OfferSnapshot
+from app.services.offer_snapshots import OfferSnapshotWriter, load_offers
+
+
+def fresh_offers(count: int) -> list:
+    return [
+        {"seller_id": f"S{i}", "price": round(random.uniform(5, 50), 2), "shipping": 0.0, "is_buybox": i == 0}
+        for i in range(count)
+    ]
+
+
+def legacy_replace(db, offers_by_product: dict):
+    """The previous path: one DELETE and one ORM insert per offer, per product"""
+    for product_id, offers in offers_by_product.items():
+        db.query(CompetitorOffer).filter(CompetitorOffer.product_id == product_id).delete()
+        for o in offers:
+            db.add(CompetitorOffer(
+                product_id=product_id,
+                seller_id=o["seller_id"],
+                price=float(o["price"]),
+                shipping=float(o["shipping"]),
+                is_buybox=bool(o["is_buybox"])
+            ))
+    db.commit()
+
+
+def legacy_read(db, offers_by_product: dict):
+    for product_id in offers_by_product:
+        db.query(CompetitorOffer).filter(CompetitorOffer.product_id == product_id).all()
+
+
+def snapshot_read(db, offers_by_product: dict):
+    for product_id in offers_by_product:
+        load_offers(db, product_id)
+
+
+def bulk_replace(db, offers_by_product: dict):
+    writer = OfferSnapshotWriter()
+    for product_id, offers in offers_by_product.items():
+        writer.stage(product_id, offers)
+    writer.flush(db)
+    db.commit()
+
+
+def best_of(session_factory, fn, offers_by_product: dict, rounds: int = 2) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            fn(db, offers_by_product)
+            best = min(best, time.perf_counter() - started)
+        finally:
+            db.close()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--offers", type=int, default=8)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    path = None
+    url = args.database_url
+    if not url:
+        fd, path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+
+    try:
+        db = session_factory()
+        user = User(email=f"bench-{time.time_ns()}@repricelab.com")
+        db.add(user)
+        db.flush()
+        products = [
+            Product(user_id=user.id, sku=f"BENCH-{i}", asin=f"B{i:09d}", title="Bench", price=10.0)
+            for i in range(args.products)
+        ]
+        db.add_all(products)
+        db.commit()
+        product_ids = [p.id for p in products]
+        db.close()
+
+        offers_by_product = {product_id: fresh_offers(args.offers) for product_id in product_ids}
+        legacy_replace(session_factory(), offers_by_product)  # Seed existing offers
+        bulk_replace(session_factory(), offers_by_product)
+
+        legacy = best_of(session_factory, legacy_replace, offers_by_product)
+        bulk = best_of(session_factory, bulk_replace, offers_by_product)
+        legacy_reads = best_of(session_factory, legacy_read, offers_by_product)
+        snapshot_reads = best_of(session_factory, snapshot_read, offers_by_product)
+
+        db = session_factory()
+        legacy_rows = db.query(CompetitorOffer).count()
+        snapshot_rows = db.query(OfferSnapshot).count()
+        db.close()
+
+        offers = args.products * args.offers
+        print(f"{args.products} products x {args.offers} offers ({offers} offers), {engine.dialect.name}")
+        print(f"  write  competitor_offers (ORM delete + add): {legacy:8.3f}s")
+        print(f"         offer_snapshots (bulk upsert):        {bulk:8.3f}s  ({legacy / bulk:.1f}x)")
+        print(f"  read   competitor_offers per product:        {legacy_reads:8.3f}s")
+        print(f"         offer_snapshots per product:          {snapshot_reads:8.3f}s  "
+              f"({legacy_reads / snapshot_reads:.1f}x)")
+        print(f"  rows   competitor_offers {legacy_rows}, offer_snapshots {snapshot_rows}")
+    finally:
+        engine.dispose()
+        if path:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Add offer_snapshots
+
+Revision ID: a1c6e4d8b3f5
+Revises: f3a7c9e1b2d4
+Create Date: 2026-10-17 21:05:00.000000
+
+competitor_offers is left in place but no longer written; offers older than
+15 minutes are ignored by the engine, so no backfill is needed.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1c6e4d8b3f5'
+down_revision: Union[str, Sequence[str], None] = 'f3a7c9e1b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'offer_snapshots',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('captured_at', sa.DateTime(), nullable=False),
+        sa.Column('offer_count', sa.Integer(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('offers_packed', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('offer_snapshots')
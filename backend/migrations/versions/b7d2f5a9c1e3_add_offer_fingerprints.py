@@ -0,0 +1,32 @@
+"""Add products.offer_fingerprint and products_unchanged run counters
+
+Revision ID: b7d2f5a9c1e3
+Revises: a1c6e4d8b3f5
+Create Date: 2026-10-17 22:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2f5a9c1e3'
+down_revision: Union[str, Sequence[str], None] = 'a1c6e4d8b3f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('offer_fingerprint', sa.String(length=64), nullable=True))
+    for table in ('repricing_runs', 'repricing_run_stores'):
+        op.add_column(table, sa.Column('products_unchanged', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('repricing_runs', 'repricing_run_stores'):
+        op.drop_column(table, 'products_unchanged')
+    op.drop_column('products', 'offer_fingerprint')
@@ -0,0 +1,34 @@
+"""Add adaptive polling fields to products
+
+Revision ID: c3d91e7a5b20
+Revises: bff8a1847f3f
+Create Date: 2026-10-17 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d91e7a5b20'
+down_revision: Union[str, Sequence[str], None] = 'bff8a1847f3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('next_check_at', sa.DateTime(), nullable=True))
+    op.add_column('products', sa.Column('check_interval_seconds', sa.Integer(), nullable=True))
+    op.add_column('products', sa.Column('observed_lowest_price', sa.Float(), nullable=True))
+    op.create_index(op.f('ix_products_next_check_at'), 'products', ['next_check_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_products_next_check_at'), table_name='products')
+    op.drop_column('products', 'observed_lowest_price')
+    op.drop_column('products', 'check_interval_seconds')
+    op.drop_column('products', 'next_check_at')
@@ -0,0 +1,49 @@
+"""Add price_feed_submissions
+
+Revision ID: c4e8a2d6f9b1
+Revises: b7d2f5a9c1e3
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a2d6f9b1'
+down_revision: Union[str, Sequence[str], None] = 'b7d2f5a9c1e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'price_feed_submissions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('store_id', sa.Integer(), nullable=False),
+        sa.Column('marketplace_id', sa.String(length=16), nullable=False),
+        sa.Column('feed_id', sa.String(length=64), nullable=True),
+        sa.Column('status', sa.String(length=32), nullable=False),
+        sa.Column('items_json', sa.Text(), nullable=False),
+        sa.Column('message_count', sa.Integer(), nullable=False),
+        sa.Column('accepted_count', sa.Integer(), nullable=False),
+        sa.Column('error_count', sa.Integer(), nullable=False),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('reconciled_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_price_feed_submissions_store_id'), 'price_feed_submissions', ['store_id'], unique=False)
+    op.create_index(op.f('ix_price_feed_submissions_status'), 'price_feed_submissions', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_price_feed_submissions_status'), table_name='price_feed_submissions')
+    op.drop_index(op.f('ix_price_feed_submissions_store_id'), table_name='price_feed_submissions')
+    op.drop_table('price_feed_submissions')
@@ -0,0 +1,28 @@
+"""Add deferred_at to products
+
+Revision ID: d5e2a8c41f73
+Revises: c3d91e7a5b20
+Create Date: 2026-10-17 17:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e2a8c41f73'
+down_revision: Union[str, Sequence[str], None] = 'c3d91e7a5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('deferred_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('products', 'deferred_at')
@@ -0,0 +1,50 @@
+"""Add repricing_work_items
+
+Revision ID: e8b4f1c2a9d6
+Revises: d5e2a8c41f73
+Create Date: 2026-10-17 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4f1c2a9d6'
+down_revision: Union[str, Sequence[str], None] = 'd5e2a8c41f73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'repricing_work_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('store_id', sa.Integer(), nullable=False),
+        sa.Column('product_ids_json', sa.Text(), nullable=False),
+        sa.Column('sequence', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('lease_owner', sa.String(length=128), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error_message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_repricing_work_items_store_id'), 'repricing_work_items', ['store_id'], unique=False)
+    op.create_index(op.f('ix_repricing_work_items_status'), 'repricing_work_items', ['status'], unique=False)
+    op.create_index(op.f('ix_repricing_work_items_created_at'), 'repricing_work_items', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_repricing_work_items_created_at'), table_name='repricing_work_items')
+    op.drop_index(op.f('ix_repricing_work_items_status'), table_name='repricing_work_items')
+    op.drop_index(op.f('ix_repricing_work_items_store_id'), table_name='repricing_work_items')
+    op.drop_table('repricing_work_items')
@@ -0,0 +1,67 @@
+"""Add repricing_runs and repricing_run_stores
+
+Revision ID: f3a7c9e1b2d4
+Revises: e8b4f1c2a9d6
+Create Date: 2026-10-17 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7c9e1b2d4'
+down_revision: Union[str, Sequence[str], None] = 'e8b4f1c2a9d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ('products_processed', 'products_repriced', 'products_deferred', 'buybox_changes',
+            'spapi_calls', 'throttled_calls', 'errors')
+STORE_PHASES = ('fetch_seconds', 'persist_seconds', 'compute_seconds', 'push_seconds')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'repricing_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('mode', sa.String(length=16), nullable=False),
+        sa.Column('worker_id', sa.String(length=128), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('duration_seconds', sa.Float(), nullable=False),
+        sa.Column('lag_seconds', sa.Float(), nullable=False),
+        sa.Column('skipped_triggers', sa.Integer(), nullable=False),
+        sa.Column('catch_up', sa.Boolean(), nullable=False),
+        sa.Column('stores_total', sa.Integer(), nullable=False),
+        sa.Column('stores_unfinished', sa.Integer(), nullable=False),
+        *[sa.Column(name, sa.Integer(), nullable=False) for name in COUNTERS],
+        *[sa.Column(name, sa.Float(), nullable=False) for name in STORE_PHASES + ('notify_seconds',)],
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_repricing_runs_started_at'), 'repricing_runs', ['started_at'], unique=False)
+    op.create_table(
+        'repricing_run_stores',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('run_id', sa.Integer(), nullable=False),
+        sa.Column('store_id', sa.Integer(), nullable=False),
+        *[sa.Column(name, sa.Integer(), nullable=False) for name in COUNTERS],
+        *[sa.Column(name, sa.Float(), nullable=False) for name in STORE_PHASES],
+        sa.Column('timed_out', sa.Boolean(), nullable=False),
+        sa.Column('failed', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['run_id'], ['repricing_runs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_repricing_run_stores_run_id'), 'repricing_run_stores', ['run_id'], unique=False)
+    op.create_index(op.f('ix_repricing_run_stores_store_id'), 'repricing_run_stores', ['store_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_repricing_run_stores_store_id'), table_name='repricing_run_stores')
+    op.drop_index(op.f('ix_repricing_run_stores_run_id'), table_name='repricing_run_stores')
+    op.drop_table('repricing_run_stores')
+    op.drop_index(op.f('ix_repricing_runs_started_at'), table_name='repricing_runs')
+    op.drop_table('repricing_runs')
@@ -0,0 +1,75 @@
+"""
+Equivalence tests: vectorized batch pricing against the scalar RepricingEngine
+"""
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services.batch_pricing import build_batch, price_batch, _round_cents
+from app.services.offer_snapshots import StoredOffer
+from app.services.repricing_engine import RepricingEngine
+
+STRATEGIES = ["win_buybox", "maximize_profit", "boost_sales", "unknown", None]
+
+
+def random_case(rng, product_id):
+    lowest = round(rng.uniform(1, 200), 2)
+    product = SimpleNamespace(
+        id=product_id,
+        price=round(lowest * rng.uniform(0.5, 1.5), 2),
+        min_price=rng.choice([None, 0.0, round(lowest * rng.uniform(0.3, 1.2), 2)]),
+        max_price=rng.choice([None, 0.0, round(lowest * rng.uniform(0.8, 2.5), 2)]),
+        target_margin_percent=rng.choice([None, 0.0, 5.0, 15.0, 40.0]),
+        repricing_strategy=rng.choice(STRATEGIES),
+    )
+    competitors = [
+        StoredOffer(f"S{i}", round(lowest * rng.uniform(1, 1.3), 2), rng.choice([0.0, 0.0, 3.99]), False)
+        for i in range(rng.randint(0, 6))
+    ]
+    if competitors and rng.random() < 0.7:
+        holder = rng.randrange(len(competitors))
+        competitors[holder] = competitors[holder]._replace(is_buybox=True)
+    return product, competitors
+
+
+@pytest.fixture(scope="module")
+def cases():
+    rng = random.Random(20261017)
+    return [random_case(rng, i) for i in range(5000)]
+
+
+def test_batch_matches_scalar_engine(cases):
+    engine = RepricingEngine(None)
+    products = [product for product, _ in cases]
+    decision = price_batch(build_batch(products, {p.id: competitors for p, competitors in cases}))
+
+    for i, (product, competitors) in enumerate(cases):
+        expected = engine.calculate_optimal_price(product, competitors, product.repricing_strategy or "win_buybox")
+        assert decision.should_reprice[i] == expected["should_reprice"], product
+        assert decision.buybox_chance[i] == expected["estimated_buybox_chance"], product
+        assert decision.new_price[i] == expected["new_price"], product
+
+
+def test_half_cent_prices_round_like_python():
+    values = np.array([12.075, 1.005, 2.675, 0.125, 10.0, 9.995])
+
+    assert _round_cents(values).tolist() == [round(v, 2) for v in values.tolist()]
+
+
+def test_products_without_competitors_keep_their_price():
+    product = SimpleNamespace(id=1, price=12.34, min_price=None, max_price=None,
+                              target_margin_percent=None, repricing_strategy="win_buybox")
+
+    decision = price_batch(build_batch([product], {}))
+
+    assert decision.new_price.tolist() == [12.34]
+    assert decision.should_reprice.tolist() == [False]
+    assert decision.buybox_chance.tolist() == [100]
+
+
+def test_empty_batch():
+    decision = price_batch(build_batch([], {}))
+
+    assert len(decision.new_price) == 0
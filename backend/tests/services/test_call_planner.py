@@ -0,0 +1,96 @@
+"""
+Unit tests for quota-aware planning of a store's pricing calls
+"""
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.models import User, Product
+from app.services import call_planner
+from app.services.call_planner import PlanCandidate, plan_store_cycle, pricing_call_budget, record_deferrals
+from app.services.rate_limiter import SPAPIRateLimiter
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+US = "ATVPDKIKX0DER"
+
+
+def candidate(product_id, asin=None, owning=True, enabled=True, deferred_at=None, marketplace_id=US):
+    return PlanCandidate(
+        product_id, asin or f"ASIN{product_id:06d}", marketplace_id, "New", owning, enabled, deferred_at
+    )
+
+
+def test_budget_caps_planned_calls_and_defers_the_rest():
+    candidates = [candidate(i) for i in range(100)]
+
+    plan = plan_store_cycle(candidates, call_budget=2, default_marketplace_id=US)
+
+    assert plan.calls_planned == 2
+    assert plan.product_ids == list(range(40))
+    assert plan.deferred_ids == list(range(40, 100))
+
+
+def test_products_sharing_an_asin_cost_no_extra_call():
+    candidates = [candidate(i, asin=f"ASIN{i:06d}") for i in range(20)] + [candidate(20, asin="ASIN000003")]
+
+    plan = plan_store_cycle(candidates, call_budget=1, default_marketplace_id=US)
+
+    assert plan.calls_planned == 1
+    assert 20 in plan.product_ids
+    assert not plan.deferred_ids
+
+
+def test_each_marketplace_needs_its_own_call():
+    candidates = [candidate(1), candidate(2, marketplace_id="A1F83G8C2ARO7P")]
+
+    plan = plan_store_cycle(candidates, call_budget=1, default_marketplace_id=US)
+
+    assert plan.product_ids == [1]
+    assert plan.deferred_ids == [2]
+
+
+def test_priority_deferred_then_lost_buybox_then_repricing_enabled_then_staleness():
+    candidates = [
+        candidate(1, owning=True, enabled=False),
+        candidate(2, owning=True, enabled=True),
+        candidate(3, owning=False, enabled=False),
+        candidate(4, owning=True, enabled=False, deferred_at=NOW),
+        candidate(5, owning=True, enabled=True),
+    ]
+
+    plan = plan_store_cycle(candidates, call_budget=None, default_marketplace_id=US)
+
+    assert plan.product_ids == [4, 3, 2, 5, 1]
+
+
+def test_max_products_caps_work_list():
+    plan = plan_store_cycle([candidate(i) for i in range(10)], None, US, max_products=3)
+
+    assert plan.product_ids == [0, 1, 2]
+    assert len(plan.deferred_ids) == 7
+
+
+def test_pricing_call_budget_keeps_a_share_free(monkeypatch):
+    monkeypatch.setattr(call_planner, "spapi_rate_limiter", SPAPIRateLimiter({"getPricing": (0.5, 1)}))
+    monkeypatch.setattr(settings, "planner_quota_share", 0.8)
+
+    # One burst token plus 0.5 calls/s over 60s, of which 80% may be planned
+    assert pricing_call_budget("PLANNER_SELLER", 60) == 24
+
+
+def test_record_deferrals_keeps_earliest(db):
+    user = User(email="planner@repricelab.com")
+    db.add(user)
+    db.flush()
+    earlier = NOW - timedelta(minutes=5)
+    fresh = Product(user_id=user.id, sku="FRESH", asin="FRESH", title="Fresh", price=10.0)
+    old = Product(user_id=user.id, sku="OLD", asin="OLD", title="Old", price=10.0, deferred_at=earlier)
+    db.add_all([fresh, old])
+    db.commit()
+
+    record_deferrals(db, [fresh.id, old.id], NOW)
+    db.commit()
+    db.refresh(fresh)
+    db.refresh(old)
+
+    assert fresh.deferred_at == NOW
+    assert old.deferred_at == earlier
@@ -0,0 +1,53 @@
+"""
+Unit tests for repricing cycle overlap protection and checkpointing
+"""
+from datetime import timedelta
+
+from app.services.cycle_coordinator import CycleCoordinator
+
+
+def test_overlapping_trigger_is_coalesced_into_one_catch_up():
+    coordinator = CycleCoordinator()
+    first = coordinator.begin(60)
+
+    assert coordinator.begin(60) is None
+    coordinator.note_skipped()
+
+    assert coordinator.finish(first, 60) is True
+    catch_up = coordinator.begin(60)
+    assert catch_up.catch_up
+    assert coordinator.finish(catch_up, 60) is False
+
+    recent = coordinator.snapshot()["recent"]
+    assert recent[1]["skipped_triggers"] == 2
+    assert recent[0]["catch_up"] is True
+
+
+def test_start_lag_is_measured_against_the_interval():
+    coordinator = CycleCoordinator()
+    first = coordinator.begin(60)
+    coordinator.finish(first, 60)
+    coordinator._last_started -= timedelta(seconds=90)
+
+    second = coordinator.begin(60)
+
+    assert 29 <= second.lag_seconds <= 31
+
+
+def test_unfinished_stores_resume_first_next_cycle():
+    coordinator = CycleCoordinator()
+    run = coordinator.begin(60, max_seconds=600)
+    run.unfinished.update({7, 3})
+    coordinator.finish(run, 60)
+
+    assert coordinator.resume_order([1, 3, 5, 7]) == [3, 7, 1, 5]
+    assert coordinator.snapshot()["recent"][0]["stores_unfinished"] == 2
+
+
+def test_cycle_overruns_after_its_budget():
+    coordinator = CycleCoordinator()
+    run = coordinator.begin(60, max_seconds=600)
+
+    assert not run.overran()
+    assert run.overran(run.started_at + timedelta(seconds=600))
+    assert not coordinator.begin(60)
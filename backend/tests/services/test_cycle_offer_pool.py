@@ -0,0 +1,110 @@
+"""
+Unit tests for cross-tenant offer deduplication within a repricing cycle
+"""
+import asyncio
+from types import SimpleNamespace
+
+from app.services.cycle_offer_pool import CycleOfferPool
+from app.services.buybox import determine_buybox
+from app.services.scheduler import _fetch_store_offers
+
+
+class FakePricingClient:
+    """Stands in for AmazonSPAPIClient.get_product_pricing_batch, answering as seller `seller_id`"""
+
+    def __init__(self, seller_id="S1", fail=False, buybox_holder="RIVAL"):
+        self.seller_id = seller_id
+        self.requested = []
+        self.fail = fail
+        self.buybox_holder = buybox_holder
+
+    def is_circuit_open(self):
+        return False
+
+    async def get_product_pricing_batch(self, asins, marketplace_id, item_condition="New"):
+        self.requested.extend(asins)
+        await asyncio.sleep(0.01)
+        if self.fail:
+            return {asin: {"success": False, "error": "throttled"} for asin in asins}
+        holds_buybox = self.buybox_holder == self.seller_id
+        return {
+            asin: {
+                "success": True,
+                "pricing": [{
+                    "Product": {
+                        "CompetitivePricing": {
+                            "CompetitivePrices": [{
+                                "CompetitivePriceId": "1",
+                                "belongsToRequester": holds_buybox,
+                                "Price": {"LandedPrice": {"Amount": 9.99}}
+                            }]
+                        },
+                        "Offers": [{
+                            "BuyingPrice": {"ListingPrice": {"Amount": 9.99 if holds_buybox else 10.49}},
+                            "IsBuyBoxWinner": holds_buybox
+                        }]
+                    }
+                }]
+            }
+            for asin in asins
+        }
+
+
+def product(product_id, asin):
+    return SimpleNamespace(id=product_id, asin=asin, marketplace_id="ATVPDKIKX0DER", condition_type="New")
+
+
+def test_shared_asins_are_fetched_once_per_cycle():
+    async def run():
+        pool = CycleOfferPool()
+        first, second = FakePricingClient("S1", buybox_holder="S1"), FakePricingClient("S2", buybox_holder="S1")
+        results = await asyncio.gather(
+            _fetch_store_offers(first, True, [product(1, "B001"), product(2, "B002")], "ATVPDKIKX0DER", "S1", pool),
+            _fetch_store_offers(second, True, [product(3, "B002"), product(4, "B003")], "ATVPDKIKX0DER", "S2", pool),
+        )
+        return pool, first, second, results
+
+    pool, first, second, results = asyncio.run(run())
+
+    assert sorted(first.requested + second.requested) == ["B001", "B002", "B003"]
+    assert pool.stats() == {"keys_fetched": 3, "keys_shared": 1}
+    (first_offers, _), (second_offers, _) = results
+    assert first_offers[2] == second_offers[3]
+    assert first_offers[2] is not second_offers[3]
+
+
+def test_waiting_store_fetches_itself_when_owner_fails():
+    async def run():
+        pool = CycleOfferPool()
+        failing, healthy = FakePricingClient("S1", fail=True), FakePricingClient("S2")
+        results = await asyncio.gather(
+            _fetch_store_offers(failing, True, [product(1, "B001")], "ATVPDKIKX0DER", "S1", pool),
+            _fetch_store_offers(healthy, True, [product(2, "B001")], "ATVPDKIKX0DER", "S2", pool),
+        )
+        return healthy, results
+
+    healthy, results = asyncio.run(run())
+
+    assert healthy.requested == ["B001"]
+    assert results[0] == ({1: []}, False)
+    assert results[1][0][2][0]["price"] == 9.99
+
+
+def test_snapshot_is_not_shared_when_another_seller_holds_the_buybox():
+    async def run():
+        pool = CycleOfferPool()
+        fetcher, holder = FakePricingClient("S1", buybox_holder="S2"), FakePricingClient("S2", buybox_holder="S2")
+        results = await asyncio.gather(
+            _fetch_store_offers(fetcher, True, [product(1, "B001")], "ATVPDKIKX0DER", "S1", pool),
+            _fetch_store_offers(holder, True, [product(2, "B001")], "ATVPDKIKX0DER", "S2", pool),
+        )
+        return pool, holder, results
+
+    pool, holder, results = asyncio.run(run())
+
+    # S1's response cannot tell whether the Buy Box holder is S2, so S2 asks for itself
+    assert holder.requested == ["B001"]
+    assert pool.stats() == {"keys_fetched": 1, "keys_shared": 0}
+    holder_offers = results[1][0][2]
+    assert determine_buybox(holder_offers)["seller_id"] == "S2"
+    assert all(o["seller_id"] == "S2" for o in holder_offers)
@@ -0,0 +1,86 @@
+"""
+Unit tests for memoized repricing decisions
+"""
+from types import SimpleNamespace
+
+from app.services import decision_cache as decision_cache_module
+from app.services.decision_cache import DecisionCache
+from app.services.offer_snapshots import StoredOffer
+
+
+def product(product_id=1, price=20.0, **settings):
+    return SimpleNamespace(id=product_id, price=price, min_price=settings.get("min_price", 5.0),
+                           max_price=30.0, target_margin_percent=15.0)
+
+
+OFFERS = [StoredOffer("A", 12.0, 0.0, True), StoredOffer("B", 11.0, 1.0, False)]
+
+
+def counting():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"new_price": len(calls)}
+    return calls, compute
+
+
+def test_identical_inputs_hit_regardless_of_offer_order():
+    cache = DecisionCache(10, 60)
+    calls, compute = counting()
+
+    first = cache.get_or_compute(product(), OFFERS, "win_buybox", compute)
+    first["competitor_count"] = 2  # Callers annotating a result do not touch the cached copy
+    again = cache.get_or_compute(product(), list(reversed(OFFERS)), "win_buybox", compute)
+
+    assert len(calls) == 1
+    assert again == {"new_price": 1}
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_any_input_change_misses():
+    cache = DecisionCache(10, 60)
+    calls, compute = counting()
+    cache.get_or_compute(product(), OFFERS, "win_buybox", compute)
+
+    cache.get_or_compute(product(price=21.0), OFFERS, "win_buybox", compute)
+    cache.get_or_compute(product(min_price=6.0), OFFERS, "win_buybox", compute)
+    cache.get_or_compute(product(), OFFERS, "boost_sales", compute)
+    cache.get_or_compute(product(), [OFFERS[0]._replace(is_buybox=False), OFFERS[1]], "win_buybox", compute)
+
+    assert len(calls) == 5
+
+
+def test_lru_size_and_ttl_bound_the_cache(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(decision_cache_module.time, "monotonic", lambda: clock[0])
+    cache = DecisionCache(2, 60)
+    calls, compute = counting()
+    for product_id in (1, 2):
+        cache.get_or_compute(product(product_id), OFFERS, "win_buybox", compute)
+    cache.get_or_compute(product(1), OFFERS, "win_buybox", compute)  # 1 is now most recent
+    cache.get_or_compute(product(3), OFFERS, "win_buybox", compute)  # Evicts 2
+
+    cache.get_or_compute(product(1), OFFERS, "win_buybox", compute)
+    assert len(calls) == 3
+    cache.get_or_compute(product(2), OFFERS, "win_buybox", compute)
+    assert len(calls) == 4
+
+    clock[0] += 61
+    cache.get_or_compute(product(2), OFFERS, "win_buybox", compute)
+    assert len(calls) == 5
+    assert cache.stats()["evictions"] == 3
+
+
+def test_invalidate_drops_a_products_decisions():
+    cache = DecisionCache(10, 60)
+    calls, compute = counting()
+    cache.get_or_compute(product(1), OFFERS, "win_buybox", compute)
+    cache.get_or_compute(product(2), OFFERS, "win_buybox", compute)
+
+    cache.invalidate([1])
+    cache.get_or_compute(product(1), OFFERS, "win_buybox", compute)
+    cache.get_or_compute(product(2), OFFERS, "win_buybox", compute)
+
+    assert len(calls) == 3
+    assert cache.stats()["invalidations"] == 1
@@ -0,0 +1,109 @@
+"""
+Unit tests for weighted fair queuing of repricing work across tenants
+"""
+import asyncio
+import time
+
+from app.services.fair_scheduler import WeightedFairQueue, TenantLagTracker, chunk
+
+
+def drain(queue: WeightedFairQueue) -> list:
+    """Serve one unit at a time and return the order of flow keys"""
+    order = []
+    while queue.pending():
+        key, _ = queue.next()
+        order.append(key)
+        queue.done(key)
+    return order
+
+
+def test_small_store_is_not_queued_behind_large_store():
+    queue = WeightedFairQueue()
+    queue.add("large", 1, chunk(list(range(1000)), 100))
+    queue.add("small", 1, chunk(list(range(100)), 100))
+
+    order = drain(queue)
+
+    assert order.index("small") <= 1
+
+
+def test_units_are_shared_in_proportion_to_weight():
+    queue = WeightedFairQueue()
+    queue.add("enterprise", 8, chunk(list(range(10000)), 100))
+    queue.add("free", 1, chunk(list(range(10000)), 100))
+
+    first_units = drain(queue)[:36]
+
+    assert first_units.count("enterprise") == 32
+    assert first_units.count("free") == 4
+
+
+def test_busy_flow_is_not_handed_a_second_unit():
+    queue = WeightedFairQueue()
+    queue.add("only", 1, [[1], [2]])
+
+    assert queue.next() == ("only", [1])
+    assert queue.next() is None
+    queue.done("only")
+    assert queue.next() == ("only", [2])
+
+
+def test_starved_flow_is_served_first():
+    queue = WeightedFairQueue(max_wait_seconds=0.01)
+    queue.add("heavy", 1000, chunk(list(range(100)), 1))
+    queue.add("light", 0.001, [[1]])
+    queue.next()
+    queue.done("heavy")
+
+    time.sleep(0.02)
+
+    assert queue.next()[0] == "light"
+
+
+def test_dropped_flow_stops_after_its_current_unit():
+    queue = WeightedFairQueue()
+    queue.add("store", 1, [[1], [2], [3]])
+
+    queue.next()
+    queue.drop("store")
+    queue.done("store")
+
+    assert not queue.pending()
+
+
+def test_run_drains_every_flow_with_bounded_concurrency():
+    queue = WeightedFairQueue()
+    queue.add("a", 1, [[1], [2], [3]])
+    queue.add("b", 2, [[4], [5]])
+    in_flight = []
+    peak = []
+    served = []
+
+    async def run_batch(key, batch):
+        in_flight.append(key)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(key)
+        served.extend(batch)
+
+    asyncio.run(queue.run(2, run_batch))
+
+    assert sorted(served) == [1, 2, 3, 4, 5]
+    assert max(peak) == 2
+
+
+def test_lag_tracker_reports_p95_per_store():
+    tracker = TenantLagTracker()
+    tracker.record(1, [float(i) for i in range(1, 101)])
+    tracker.record(2, [5.0])
+
+    tracker.finish_cycle({1: {"plan": "free"}})
+    lag = tracker.snapshot()
+
+    assert lag[1]["p95_lag_seconds"] == 95.0
+    assert lag[1]["max_lag_seconds"] == 100.0
+    assert lag[1]["plan"] == "free"
+    assert lag[2]["products"] == 1
+
+    tracker.retain([2])
+    assert list(tracker.snapshot()) == [2]
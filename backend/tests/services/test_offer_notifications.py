@@ -0,0 +1,138 @@
+"""
+Unit tests for ANY_OFFER_CHANGED notification parsing, queue backends and the consumer
+"""
+import asyncio
+import json
+
+from sqlalchemy.orm import Session
+
+from app.models import User, Store, Product, PriceHistory
+from app.services import scheduler
+from app.services.buybox import determine_buybox
+from app.services.offer_notifications import (
+    InMemoryNotificationQueue,
+    FileNotificationQueue,
+    build_notification_queue,
+    parse_any_offer_changed,
+    latest_per_listing,
+)
+
+
+def make_notification(asin="B000TEST01", seller_id="A1SELLER", time_of_change="2026-01-01T00:00:00Z", prices=(9.99, 10.49)):
+    return {
+        "NotificationVersion": "1.0",
+        "NotificationType": "ANY_OFFER_CHANGED",
+        "PayloadVersion": "1.0",
+        "EventTime": time_of_change,
+        "Payload": {
+            "AnyOfferChangedNotification": {
+                "SellerId": seller_id,
+                "OfferChangeTrigger": {
+                    "MarketplaceId": "ATVPDKIKX0DER",
+                    "ASIN": asin,
+                    "ItemCondition": "new",
+                    "TimeOfOfferChange": time_of_change
+                },
+                "Offers": [
+                    {
+                        "SellerId": f"COMP{i}",
+                        "SubCondition": "new",
+                        "ListingPrice": {"Amount": price, "CurrencyCode": "USD"},
+                        "Shipping": {"Amount": 1.5 if i else 0.0, "CurrencyCode": "USD"},
+                        "IsBuyBoxWinner": i == 0
+                    }
+                    for i, price in enumerate(prices)
+                ]
+            }
+        },
+        "NotificationMetadata": {"NotificationId": f"n-{asin}-{time_of_change}"}
+    }
+
+
+def test_parse_produces_scheduler_offer_dicts():
+    """Parsed offers feed straight into determine_buybox"""
+    change = parse_any_offer_changed(json.dumps(make_notification()))
+
+    assert change["seller_id"] == "A1SELLER"
+    assert (change["marketplace_id"], change["asin"], change["condition"]) == ("ATVPDKIKX0DER", "B000TEST01", "new")
+    assert change["offers"] == [
+        {"seller_id": "COMP0", "price": 9.99, "shipping": 0.0, "is_buybox": True},
+        {"seller_id": "COMP1", "price": 10.49, "shipping": 1.5, "is_buybox": False},
+    ]
+    assert determine_buybox(change["offers"])["seller_id"] == "COMP0"
+
+
+def test_parse_rejects_other_notifications():
+    assert parse_any_offer_changed({"NotificationType": "REPORT_PROCESSING_FINISHED", "Payload": {}}) is None
+    assert parse_any_offer_changed("not json") is None
+
+
+def test_latest_notification_per_listing_wins():
+    older = parse_any_offer_changed(make_notification(time_of_change="2026-01-01T00:00:00Z", prices=(9.0,)))
+    newer = parse_any_offer_changed(make_notification(time_of_change="2026-01-01T00:05:00Z", prices=(8.0,)))
+    other = parse_any_offer_changed(make_notification(asin="B000TEST02"))
+
+    latest = latest_per_listing([newer, older, other])
+
+    assert len(latest) == 2
+    assert next(c for c in latest if c["asin"] == "B000TEST01")["offers"][0]["price"] == 8.0
+
+
+def test_in_memory_queue_receives_in_batches():
+    queue = InMemoryNotificationQueue()
+    for i in range(3):
+        queue.publish(make_notification(asin=f"B00{i}"))
+
+    first = queue.receive(max_messages=2)
+    queue.ack(first)
+
+    assert [parse_any_offer_changed(m.body)["asin"] for m in first] == ["B000", "B001"]
+    assert len(queue.receive()) == 1
+
+
+def test_file_queue_redelivers_until_acked(tmp_path):
+    queue = FileNotificationQueue(str(tmp_path))
+    queue.publish(make_notification(asin="B001"))
+    queue.publish(make_notification(asin="B002"))
+
+    received = queue.receive()
+    assert [parse_any_offer_changed(m.body)["asin"] for m in received] == ["B001", "B002"]
+    assert len(queue.receive()) == 2
+
+    queue.ack(received[:1])
+    assert [parse_any_offer_changed(m.body)["asin"] for m in queue.receive()] == ["B002"]
+
+
+def test_consumer_reprices_only_the_notified_listing(db, monkeypatch):
+    monkeypatch.setattr(scheduler, "SessionLocal", lambda: Session(bind=db.get_bind()))
+    monkeypatch.setattr(scheduler, "_dispatch_notifications", lambda: None)
+    user = User(email="notified@repricelab.com")
+    db.add(user)
+    db.flush()
+    db.add(Store(user_id=user.id, selling_partner_id="A1SELLER", refresh_token="token", region="NA",
+                 marketplace_ids="ATVPDKIKX0DER", store_name="Store"))
+    changed, untouched = [
+        Product(user_id=user.id, sku=f"SKU-{asin}", asin=asin, title="t", price=12.0,
+                min_price=5.0, max_price=30.0, repricing_enabled=True)
+        for asin in ("B000TEST01", "B000TEST02")
+    ]
+    db.add_all([changed, untouched])
+    db.commit()
+    queue = InMemoryNotificationQueue()
+    queue.publish(json.dumps(make_notification(asin="B000TEST01", prices=(9.99, 10.49))))
+
+    totals = asyncio.run(scheduler.reprice_from_offer_notifications(queue))
+
+    db.expire_all()
+    assert (totals["received"], totals["products_processed"], totals["products_repriced"]) == (1, 1, 1)
+    assert len(queue) == 0
+    new_price = db.get(Product, changed.id).price
+    assert new_price < 9.99
+    assert db.get(Product, untouched.id).price == 12.0
+    [history] = db.query(PriceHistory).all()
+    assert (history.product_id, history.price) == (changed.id, new_price)
+
+
+def test_notifications_are_off_by_default():
+    assert build_notification_queue("off") is None
+    assert asyncio.run(scheduler.reprice_from_offer_notifications())["received"] == 0
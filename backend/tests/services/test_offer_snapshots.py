@@ -0,0 +1,70 @@
+"""
+Unit tests for packed latest-offer snapshots
+"""
+from datetime import datetime, timedelta
+
+from app.models import User, Product, OfferSnapshot
+from app.services import offer_snapshots
+from app.services.offer_snapshots import OfferSnapshotWriter, StoredOffer, load_offers, load_offers_many
+
+
+def make_products(db, count):
+    user = User(email="offers@repricelab.com")
+    db.add(user)
+    db.flush()
+    products = [Product(user_id=user.id, sku=f"SKU{i}", asin=f"ASIN{i}", title="t", price=10.0) for i in range(count)]
+    db.add_all(products)
+    db.commit()
+    return [p.id for p in products]
+
+
+def test_flush_replaces_only_staged_products(db, monkeypatch):
+    monkeypatch.setattr(offer_snapshots, "SNAPSHOT_CHUNK", 2)
+    first, second, untouched = make_products(db, 3)
+    writer = OfferSnapshotWriter()
+    for product_id in (first, second, untouched):
+        writer.stage(product_id, [{"seller_id": "OLD", "price": 9.0}])
+    writer.flush(db)
+    db.commit()
+
+    stored = writer.stage(first, [{"seller_id": "B", "price": 9.5}, {"seller_id": "A", "price": 8.5, "is_buybox": True}])
+    writer.stage(second, [])
+    writer.flush(db)
+    db.commit()
+
+    assert stored[1] == StoredOffer("A", 8.5, 0.0, True)
+    assert load_offers(db, first) == [StoredOffer("A", 8.5, 0.0, True), StoredOffer("B", 9.5, 0.0, False)]
+    assert load_offers(db, second) == []
+    assert load_offers(db, untouched) == [StoredOffer("OLD", 9.0, 0.0, False)]
+    assert db.query(OfferSnapshot).count() == 3
+    assert len(writer) == 0
+
+
+def test_content_hash_ignores_offer_order(db):
+    first, second = make_products(db, 2)
+    offers = [{"seller_id": "A", "price": 8.5}, {"seller_id": "B", "price": 9.5, "is_buybox": True}]
+    writer = OfferSnapshotWriter()
+    writer.stage(first, offers)
+    writer.stage(second, list(reversed(offers)))
+    writer.flush(db)
+    db.commit()
+
+    snapshots = {s.product_id: s for s in db.query(OfferSnapshot)}
+    assert snapshots[first].content_hash == snapshots[second].content_hash
+    assert snapshots[first].offer_count == 2
+
+
+def test_stale_snapshots_are_not_loaded(db):
+    fresh, stale, missing = make_products(db, 3)
+    now = datetime.utcnow()
+    writer = OfferSnapshotWriter()
+    writer.stage(stale, [{"seller_id": "A", "price": 8.5}])
+    writer.flush(db, now=now - timedelta(hours=1))
+    writer.stage(fresh, [{"seller_id": "B", "price": 9.5}])
+    writer.flush(db, now=now)
+    db.commit()
+
+    since = now - timedelta(minutes=15)
+    assert load_offers(db, stale, since=since) is None
+    assert load_offers(db, missing) is None
+    assert load_offers_many(db, [fresh, stale, missing], since=since) == {fresh: [StoredOffer("B", 9.5, 0.0, False)]}
@@ -0,0 +1,182 @@
+"""
+Unit tests for adaptive per-product polling intervals and the due-time queue
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import settings
+from app.models import User, Product
+from app.services.poll_schedule import (
+    DueQueue, next_check_interval, schedule_next_check, plan_cadence, tier_backlog
+)
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture(autouse=True)
+def polling_settings(monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_interval_minutes", 10)
+    monkeypatch.setattr(settings, "poll_min_interval_seconds", 120)
+    monkeypatch.setattr(settings, "poll_max_interval_seconds", 3600)
+    monkeypatch.setattr(settings, "poll_busy_competitor_count", 10)
+
+
+def make_product(**overrides):
+    fields = dict(
+        stock_qty=10,
+        listing_status="active",
+        buybox_owning=False,
+        observed_lowest_price=None,
+        check_interval_seconds=None,
+        next_check_at=None,
+    )
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def offers(*prices):
+    return [{"seller_id": f"S{i}", "price": price, "shipping": 0.0} for i, price in enumerate(prices)]
+
+
+def test_stable_listing_backs_off_to_max():
+    interval = None
+    for _ in range(20):
+        interval = next_check_interval(
+            interval, lost_buybox=False, price_moved=False, competitor_count=2, in_stock=True
+        )
+    assert interval == 3600
+
+
+def test_lost_buybox_checks_again_soon():
+    interval = next_check_interval(3000, lost_buybox=True, price_moved=False, competitor_count=2, in_stock=True)
+    assert interval == 120
+
+
+def test_moving_price_halves_interval():
+    interval = next_check_interval(1200, lost_buybox=False, price_moved=True, competitor_count=2, in_stock=True)
+    assert interval == 600
+
+
+def test_crowded_listing_stays_below_half_base_interval():
+    interval = next_check_interval(3600, lost_buybox=False, price_moved=False, competitor_count=15, in_stock=True)
+    assert interval == 300
+
+
+def test_out_of_stock_listing_backs_off():
+    interval = next_check_interval(120, lost_buybox=True, price_moved=True, competitor_count=15, in_stock=False)
+    assert interval == 3600
+
+
+def test_schedule_next_check_detects_price_movement():
+    product = make_product(check_interval_seconds=1200, observed_lowest_price=10.0)
+
+    schedule_next_check(product, offers(9.5, 11.0), was_owning=False, now=NOW)
+
+    assert product.check_interval_seconds == 600
+    assert product.observed_lowest_price == 9.5
+    assert product.next_check_at == NOW + timedelta(seconds=600)
+
+
+def test_schedule_next_check_detects_lost_buybox():
+    product = make_product(check_interval_seconds=1800, observed_lowest_price=10.0, buybox_owning=False)
+
+    schedule_next_check(product, offers(10.0), was_owning=True, now=NOW)
+
+    assert product.check_interval_seconds == 120
+
+
+def test_first_check_starts_from_base_interval():
+    product = make_product()
+
+    schedule_next_check(product, offers(10.0), was_owning=False, now=NOW)
+
+    assert product.check_interval_seconds == 900
+
+
+def test_due_queue_pops_due_products_most_overdue_first():
+    queue = DueQueue([
+        (1, NOW - timedelta(minutes=1)),
+        (2, None),
+        (3, NOW + timedelta(minutes=5)),
+        (4, NOW - timedelta(minutes=30)),
+    ])
+
+    assert queue.pop_due(NOW) == [2, 4, 1]
+    assert len(queue) == 1
+    assert queue.pop_due(NOW + timedelta(minutes=5)) == [3]
+
+
+def test_due_queue_respects_limit():
+    queue = DueQueue([(i, NOW - timedelta(minutes=i)) for i in range(1, 6)])
+
+    assert queue.pop_due(NOW, limit=2) == [5, 4]
+    assert len(queue) == 3
+
+
+def test_plan_frequency_sets_base_and_floor():
+    pro, free = plan_cadence("pro"), plan_cadence("free")
+
+    assert (pro.base, pro.low) == (300, 120)
+    assert (free.base, free.low) == (3600, 900)
+    assert plan_cadence("unknown") == free
+
+
+@pytest.mark.parametrize("plan", ["free", "pro"])
+def test_volatile_listings_are_polled_faster_than_the_plan_base(plan):
+    cadence = plan_cadence(plan)
+
+    moved = next_check_interval(
+        cadence.base, lost_buybox=False, price_moved=True, competitor_count=2, in_stock=True, cadence=cadence
+    )
+    crowded = next_check_interval(
+        cadence.base, lost_buybox=False, price_moved=False, competitor_count=15, in_stock=True, cadence=cadence
+    )
+    lost = next_check_interval(
+        cadence.base, lost_buybox=True, price_moved=False, competitor_count=2, in_stock=True, cadence=cadence
+    )
+
+    assert moved == crowded == cadence.base // 2
+    assert lost == cadence.low < cadence.base
+
+
+def test_free_tier_is_never_checked_faster_than_its_floor():
+    interval = next_check_interval(
+        900, lost_buybox=True, price_moved=True, competitor_count=15, in_stock=True,
+        cadence=plan_cadence("free")
+    )
+    assert interval == 900
+
+
+def test_pro_tier_lost_buybox_checks_at_plan_floor():
+    product = make_product(check_interval_seconds=1800, observed_lowest_price=10.0)
+
+    schedule_next_check(product, offers(10.0), was_owning=True, now=NOW, cadence=plan_cadence("pro"))
+
+    assert product.check_interval_seconds == 120
+
+
+def test_tier_backlog_counts_overdue_products(db):
+    pro = User(email="pro@repricelab.com", subscription_plan="pro")
+    free = User(email="free@repricelab.com", subscription_plan="free")
+    db.add_all([pro, free])
+    db.flush()
+    due_at = {
+        "P-ONTIME": NOW + timedelta(minutes=1),
+        "P-DUE": NOW - timedelta(minutes=2),
+        "P-BEHIND": NOW - timedelta(minutes=20),
+        "P-NEW": None,
+    }
+    for sku, next_check_at in due_at.items():
+        db.add(Product(user_id=pro.id, sku=sku, asin=sku, title=sku, price=10.0, next_check_at=next_check_at))
+    db.add(Product(user_id=free.id, sku="F-DUE", asin="F-DUE", title="F-DUE", price=10.0,
+                   next_check_at=NOW - timedelta(minutes=20)))
+    db.commit()
+
+    backlog = tier_backlog(db, NOW)
+
+    assert backlog["pro"] == {"due": 3, "behind": 1, "max_lag_seconds": 1200}
+    # 20 minutes late is within the free tier's hourly interval
+    assert backlog["free"] == {"due": 1, "behind": 0, "max_lag_seconds": 1200}
+    assert backlog["enterprise"]["due"] == 0
@@ -0,0 +1,196 @@
+"""
+Unit tests for bulk price submission through JSON_LISTINGS_FEED and its reconciliation
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import User, Store, Product, PriceHistory, Notification, PriceFeedSubmission
+from app.services import price_feed, scheduler
+from app.services.price_feed import (
+    build_price_feed, parse_processing_report, submit_price_feed, reconcile_price_feeds, pending_feed_product_ids
+)
+
+
+class FakeFeedClient:
+    """Stands in for AmazonSPAPIClient's feed and listings calls"""
+
+    def __init__(self, submit_ok=True, processing_status="DONE", report=None):
+        self.submit_ok = submit_ok
+        self.processing_status = processing_status
+        self.report = report or {"issues": []}
+        self.feeds = []
+        self.status_polls = []
+        self.patched = []
+
+    def is_circuit_open(self):
+        return False
+
+    async def submit_listings_feed(self, feed, marketplace_id):
+        self.feeds.append(feed)
+        if not self.submit_ok:
+            return {"success": False, "error": "upload failed"}
+        return {"success": True, "feed_id": f"FEED{len(self.feeds)}", "feed_document_id": "DOC"}
+
+    async def get_feed_status(self, feed_id):
+        self.status_polls.append(feed_id)
+        return {"success": True, "processing_status": self.processing_status, "result_document_id": "RESULT"}
+
+    async def get_feed_result(self, result_document_id):
+        return {"success": True, "report": self.report}
+
+    async def update_price(self, sku, seller_id, marketplace_id, new_price):
+        self.patched.append((sku, new_price))
+        return {"success": True}
+
+
+@pytest.fixture
+def store(db):
+    user = User(email="feeds@repricelab.com")
+    db.add(user)
+    db.flush()
+    st = Store(user_id=user.id, selling_partner_id="SELLER", refresh_token="token", region="NA",
+               marketplace_ids="ATVPDKIKX0DER", store_name="Store")
+    db.add(st)
+    db.commit()
+    return st
+
+
+@pytest.fixture
+def products(db, store):
+    rows = [
+        Product(user_id=store.user_id, sku=f"SKU{i}", asin=f"ASIN{i}", title="t", price=20.0)
+        for i in range(3)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def changes_for(products, new_price=18.5):
+    return [
+        {
+            "product": p,
+            "product_id": p.id,
+            "sku": p.sku,
+            "marketplace_id": "ATVPDKIKX0DER",
+            "old_price": p.price,
+            "new_price": new_price,
+            "strategy": "win_buybox",
+            "repricing_result": {"new_price": new_price, "competitor_count": 2, "lowest_competitor_price": 18.51},
+        }
+        for p in products
+    ]
+
+
+@pytest.fixture
+def feed_sessions(db, monkeypatch):
+    monkeypatch.setattr(price_feed, "SessionLocal", lambda: Session(bind=db.get_bind()))
+
+
+def test_feed_has_one_patch_message_per_sku():
+    feed = build_price_feed("SELLER", "ATVPDKIKX0DER", [
+        {"sku": "A", "new_price": 9.99},
+        {"sku": "B", "new_price": 19.5},
+    ])
+
+    assert feed["header"]["sellerId"] == "SELLER"
+    assert [(m["messageId"], m["sku"], m["operationType"]) for m in feed["messages"]] == [
+        (1, "A", "PATCH"), (2, "B", "PATCH")
+    ]
+    [offer] = feed["messages"][1]["patches"][0]["value"]
+    assert offer["marketplaceId"] == "ATVPDKIKX0DER"
+    assert offer["ourPrice"][0]["schedule"][0]["valueWithTax"] == 19.5
+
+
+def test_processing_report_keeps_only_errors_per_message():
+    errors = parse_processing_report({"issues": [
+        {"messageId": 1, "severity": "ERROR", "code": "90220", "message": "Bad price"},
+        {"messageId": "1", "severity": "ERROR", "code": "90221", "message": "Still bad"},
+        {"messageId": 2, "severity": "WARNING", "code": "1", "message": "Fine"},
+        {"messageId": None, "severity": "ERROR", "code": "2", "message": "Feed-level"},
+    ]})
+
+    assert errors == {1: ["90220: Bad price", "90221: Still bad"]}
+
+
+def test_done_feed_applies_accepted_skus_only(db, store, products, feed_sessions, monkeypatch):
+    client = FakeFeedClient(report={"issues": [
+        {"messageId": 2, "severity": "ERROR", "code": "90220", "message": "Bad price"}
+    ]})
+    monkeypatch.setattr(price_feed, "get_store_client", lambda st: client)
+
+    submission = asyncio.run(submit_price_feed(db, store, client, "ATVPDKIKX0DER", changes_for(products)))
+    assert submission.feed_id == "FEED1"
+    assert pending_feed_product_ids(db, store.id) == {p.id for p in products}
+
+    totals = asyncio.run(reconcile_price_feeds())
+
+    assert totals == {"polled": 1, "reconciled": 1, "failed": 0}
+    db.expire_all()
+    reconciled = db.get(PriceFeedSubmission, submission.id)
+    assert (reconciled.status, reconciled.accepted_count, reconciled.error_count) == ("RECONCILED", 2, 1)
+    assert [db.get(Product, p.id).price for p in products] == [18.5, 20.0, 18.5]
+    assert db.query(PriceHistory).count() == 2
+    assert db.query(Notification).filter(Notification.type == "PRICE_CHANGED").count() == 2
+    assert pending_feed_product_ids(db, store.id) == set()
+
+
+@pytest.mark.parametrize("processing_status", ["FATAL", "CANCELLED"])
+def test_failed_feed_leaves_prices_alone(db, store, products, feed_sessions, monkeypatch, processing_status):
+    client = FakeFeedClient(processing_status=processing_status)
+    monkeypatch.setattr(price_feed, "get_store_client", lambda st: client)
+    submission = asyncio.run(submit_price_feed(db, store, client, "ATVPDKIKX0DER", changes_for(products)))
+
+    totals = asyncio.run(reconcile_price_feeds())
+
+    assert totals == {"polled": 1, "reconciled": 0, "failed": 1}
+    db.expire_all()
+    assert db.get(PriceFeedSubmission, submission.id).status == processing_status
+    assert [db.get(Product, p.id).price for p in products] == [20.0, 20.0, 20.0]
+    assert pending_feed_product_ids(db, store.id) == set()
+
+
+def test_feed_unprocessed_after_24h_is_given_up(db, store, products, feed_sessions, monkeypatch):
+    client = FakeFeedClient(processing_status="IN_PROGRESS")
+    monkeypatch.setattr(price_feed, "get_store_client", lambda st: client)
+    submission = asyncio.run(submit_price_feed(db, store, client, "ATVPDKIKX0DER", changes_for(products)))
+    submission.created_at = datetime.utcnow() - price_feed.FEED_MAX_AGE - timedelta(minutes=1)
+    db.commit()
+
+    totals = asyncio.run(reconcile_price_feeds())
+
+    assert totals == {"polled": 1, "reconciled": 0, "failed": 1}
+    assert client.status_polls == []
+    db.expire_all()
+    expired = db.get(PriceFeedSubmission, submission.id)
+    assert expired.status == "FATAL"
+    assert expired.error_message == "Feed not processed within 24h"
+
+
+def test_large_change_sets_go_out_as_a_feed(db, store, products, monkeypatch):
+    monkeypatch.setattr(settings, "price_feed_min_changes", 2)
+    client = FakeFeedClient()
+
+    applied = asyncio.run(scheduler._push_price_changes(db, store, client, True, changes_for(products)))
+
+    assert applied == 0
+    assert len(client.feeds) == 1 and client.patched == []
+    assert json.loads(db.query(PriceFeedSubmission).one().items_json)["3"]["sku"] == "SKU2"
+
+
+def test_failed_feed_upload_falls_back_to_patch(db, store, products, monkeypatch):
+    monkeypatch.setattr(settings, "price_feed_min_changes", 2)
+    client = FakeFeedClient(submit_ok=False)
+
+    applied = asyncio.run(scheduler._push_price_changes(db, store, client, True, changes_for(products)))
+    db.commit()
+
+    assert applied == 3
+    assert client.patched == [("SKU0", 18.5), ("SKU1", 18.5), ("SKU2", 18.5)]
+    assert db.query(PriceFeedSubmission).count() == 0
+    assert [p.price for p in products] == [18.5, 18.5, 18.5]
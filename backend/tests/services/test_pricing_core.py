@@ -0,0 +1,64 @@
+"""
+Unit tests for the session-free pricing core and its process-pool mode
+"""
+import pickle
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.services import pricing_core
+from app.services.pricing_core import StoredOffer, price_records, record_for, with_fallback
+
+STRATEGIES = ["win_buybox", "maximize_profit", "boost_sales"]
+
+
+def records(count):
+    rng = random.Random(7)
+    batch = []
+    for i in range(count):
+        product = SimpleNamespace(
+            id=i, price=round(rng.uniform(10, 30), 2), min_price=5.0, max_price=rng.choice([None, 40.0]),
+            target_margin_percent=15.0, repricing_strategy=STRATEGIES[i % 3],
+            lowest_competitor_price=rng.choice([None, 12.0]),
+        )
+        competitors = [StoredOffer(f"S{j}", round(rng.uniform(8, 25), 2), 0.0, j == 0) for j in range(i % 4)]
+        batch.append((record_for(product, competitors), with_fallback(product, competitors)))
+    return batch
+
+
+def test_records_are_priced_like_the_scalar_core():
+    batch = records(200)
+
+    decision = price_records([record for record, _ in batch])
+
+    for i, (record, competitors) in enumerate(batch):
+        expected = pricing_core.calculate_optimal_price(record, competitors, record.repricing_strategy)
+        assert decision.new_price[i] == expected["new_price"]
+        assert decision.should_reprice[i] == expected["should_reprice"]
+        assert decision.competitor_count[i] == len(competitors)
+
+
+def test_process_pool_shards_match_in_process_pricing():
+    batch = [record for record, _ in records(301)]
+    assert pickle.loads(pickle.dumps(batch)) == batch
+
+    in_process = price_records(batch)
+    try:
+        sharded = price_records(batch, processes=2)
+        pool = pricing_core._pool
+        price_records(batch, processes=2)
+        assert pricing_core._pool is pool  # workers are spawned once, not per call
+    finally:
+        pricing_core.shutdown_pool()
+
+    for column, expected in zip(sharded, in_process):
+        np.testing.assert_array_equal(column, expected)
+
+
+def test_small_record_sets_never_start_the_pool():
+    batch = [record for record, _ in records(20)]
+
+    price_records(batch, processes=2, min_records=100)
+
+    assert pricing_core._pool is None
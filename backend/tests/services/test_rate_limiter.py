@@ -0,0 +1,61 @@
+"""
+Unit tests for the SP-API token-bucket rate limiter
+"""
+import asyncio
+import time
+
+from app.services.rate_limiter import SPAPIRateLimiter, TokenBucket
+
+
+def test_bucket_allows_burst_then_waits():
+    """A fresh bucket serves its burst immediately, then asks callers to wait"""
+    bucket = TokenBucket(rate=2.0, burst=3)
+    waits = [bucket.reserve() for _ in range(4)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 0.4 < waits[3] <= 0.5
+
+
+def test_buckets_are_keyed_by_seller_and_operation():
+    """Sellers and operations never share quota"""
+    limiter = SPAPIRateLimiter()
+
+    assert limiter.bucket("SELLER_A", "getPricing") is limiter.bucket("SELLER_A", "getPricing")
+    assert limiter.bucket("SELLER_A", "getPricing") is not limiter.bucket("SELLER_B", "getPricing")
+    assert limiter.bucket("SELLER_A", "getPricing") is not limiter.bucket("SELLER_A", "patchListingsItem")
+
+
+def test_documented_usage_plan_is_seeded():
+    limiter = SPAPIRateLimiter()
+
+    pricing = limiter.bucket("SELLER_A", "getPricing")
+    patches = limiter.bucket("SELLER_A", "patchListingsItem")
+
+    assert (pricing.rate, pricing.burst) == (0.5, 1)
+    assert (patches.rate, patches.burst) == (5.0, 10)
+
+
+def test_rate_updated_from_response_header():
+    limiter = SPAPIRateLimiter()
+
+    limiter.update_from_headers("SELLER_A", "getPricing", {"x-amzn-RateLimit-Limit": "2.5"})
+    assert limiter.bucket("SELLER_A", "getPricing").rate == 2.5
+
+    # Missing or garbage headers leave the bucket alone
+    limiter.update_from_headers("SELLER_A", "getPricing", {})
+    limiter.update_from_headers("SELLER_A", "getPricing", {"x-amzn-RateLimit-Limit": "n/a"})
+    assert limiter.bucket("SELLER_A", "getPricing").rate == 2.5
+
+
+def test_acquire_paces_calls_to_the_quota():
+    limiter = SPAPIRateLimiter({"op": (20.0, 1)})
+
+    async def run():
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire("SELLER_A", "op")
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    # Burst of 1, then two more tokens at 20 rps
+    assert elapsed >= 0.09
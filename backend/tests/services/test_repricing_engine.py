@@ -0,0 +1,98 @@
+"""
+Unit tests for the bulk flash reprice path
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.models import User, Product, PriceHistory
+from app.services import pricing_core
+from app.services.offer_snapshots import OfferSnapshotWriter
+from app.services.repricing_engine import RepricingEngine
+
+STRATEGIES = ["win_buybox", "maximize_profit", "boost_sales"]
+
+
+def seed(db, count):
+    user = User(email="flash@repricelab.com")
+    db.add(user)
+    db.flush()
+    products = [
+        Product(user_id=user.id, sku=f"SKU{i}", asin=f"ASIN{i}", title="t", price=20.0 + i % 7,
+                min_price=5.0, max_price=40.0, repricing_enabled=True, repricing_strategy=STRATEGIES[i % 3],
+                lowest_competitor_price=18.0 if i % 5 == 0 else None)
+        for i in range(count)
+    ]
+    db.add_all(products)
+    db.commit()
+    # Blank strategies price with the default on every path
+    db.query(Product).filter(Product.id.in_([p.id for p in products[3::4]])).update(
+        {Product.repricing_strategy: ""}, synchronize_session="fetch"
+    )
+    writer = OfferSnapshotWriter()
+    for i, p in enumerate(products):
+        if i % 4:
+            writer.stage(p.id, [{"seller_id": "A", "price": 15.0 + i % 9, "is_buybox": True},
+                                {"seller_id": "B", "price": 16.5, "shipping": 1.0}])
+    writer.flush(db)
+    # Stale snapshots fall back to lowest_competitor_price like missing ones
+    writer.stage(products[4].id, [{"seller_id": "A", "price": 1.0}])
+    writer.flush(db, now=datetime.utcnow() - timedelta(hours=1))
+    db.commit()
+    return user, products
+
+
+def test_flash_reprice_matches_per_product_reprice(db):
+    user, products = seed(db, 60)
+    engine = RepricingEngine(db)
+    expected = {p.id: engine.reprice_product(p, dry_run=True) for p in products}
+
+    results = engine.reprice_all_active_products(user.id)
+
+    db.expire_all()
+    repriced = [p for p in products if expected[p.id]["should_reprice"]]
+    assert results["repriced_count"] == len(repriced)
+    assert results["skipped_count"] == len(products) - len(repriced)
+    assert results["errors"] == []
+    for p in products:
+        if expected[p.id]["should_reprice"]:
+            assert p.price == expected[p.id]["new_price"]
+            assert p.lowest_competitor_price == expected[p.id]["lowest_competitor_price"]
+            assert p.competitor_count == expected[p.id]["competitor_count"]
+    assert db.query(PriceHistory).count() == len(repriced)
+
+
+def test_flash_reprice_statement_count_does_not_grow_with_products(db):
+    user, _ = seed(db, 300)
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        results = RepricingEngine(db).reprice_all_active_products(user.id)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert results["repriced_count"] > 100
+    assert len(statements) < 10
+
+
+def test_flash_reprice_in_a_process_pool_matches_in_process(db, monkeypatch):
+    user, products = seed(db, 40)
+    engine = RepricingEngine(db)
+    expected = {
+        p.id: (p.price, engine.reprice_product(p, dry_run=True)) for p in products
+    }
+    monkeypatch.setattr(settings, "pricing_processes", 2)
+    monkeypatch.setattr(settings, "pricing_process_min_products", 10)
+
+    try:
+        results = engine.reprice_all_active_products(user.id)
+    finally:
+        pricing_core.shutdown_pool()
+
+    db.expire_all()
+    assert results["errors"] == []
+    for p in products:
+        old_price, decision = expected[p.id]
+        assert p.price == (decision["new_price"] if decision["should_reprice"] else old_price)
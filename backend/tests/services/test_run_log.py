@@ -0,0 +1,68 @@
+"""
+Unit tests for the persisted repricing run log
+"""
+from datetime import datetime, timedelta
+
+from app.models import RepricingRun, RepricingRunStore
+from app.services.cycle_coordinator import CycleCoordinator
+from app.services.run_log import add_phase, count, merge_stats, save_run, run_summary
+
+
+def finished_cycle(stores_total=2):
+    coordinator = CycleCoordinator()
+    cycle = coordinator.begin(60)
+    cycle.stores_total = stores_total
+    coordinator.finish(cycle, 60)
+    return cycle
+
+
+def store_stats(fetch, compute, repriced=0, calls=0, throttled=0, unchanged=0):
+    stats = {"products_processed": 10, "products_repriced": repriced, "products_unchanged": unchanged, "buybox_changes": 0,
+             "spapi_calls": calls, "throttled_calls": throttled}
+    add_phase(stats, "fetch", fetch)
+    add_phase(stats, "compute", compute)
+    return stats
+
+
+def test_merge_stats_adds_counters_and_phases():
+    store = {}
+    merge_stats(store, store_stats(1.0, 0.5, repriced=2))
+    merge_stats(store, {**store_stats(2.0, 0.5, repriced=1), "timed_out": True})
+    count(store, "errors")
+
+    assert store["products_repriced"] == 3
+    assert store["phases"] == {"fetch": 3.0, "compute": 1.0}
+    assert store["timed_out"] is True
+    assert store["errors"] == 1
+
+
+def test_run_is_saved_with_store_rows_and_totals(db):
+    cycle = finished_cycle()
+
+    run = save_run(db, cycle, {
+        1: store_stats(1.0, 0.25, repriced=3, calls=4, throttled=1),
+        2: {**store_stats(2.0, 0.5, calls=2), "deferred": 5},
+    }, notify_seconds=0.1)
+
+    saved = db.get(RepricingRun, run.id)
+    assert saved.fetch_seconds == 3.0
+    assert saved.compute_seconds == 0.75
+    assert saved.notify_seconds == 0.1
+    assert saved.spapi_calls == 6
+    assert saved.throttled_calls == 1
+    assert saved.products_repriced == 3
+    assert saved.products_deferred == 5
+    assert db.query(RepricingRunStore).filter(RepricingRunStore.run_id == run.id).count() == 2
+
+
+def test_summary_serves_recent_runs_and_percentiles(db):
+    for fetch in (1.0, 2.0, 3.0, 4.0):
+        save_run(db, finished_cycle(), {1: store_stats(fetch, 0.1, unchanged=int(fetch))})
+
+    summary = run_summary(db, datetime.utcnow() - timedelta(hours=1))
+
+    assert summary["runs"] == 4
+    assert summary["percentiles"]["fetch_seconds"] == {"p50": 2.0, "p95": 4.0}
+    assert summary["recent"][0]["phases"]["fetch"] == 4.0
+    assert summary["recent"][0]["skip_ratio"] == 0.4
+    assert summary["skip_ratio"] == 0.25
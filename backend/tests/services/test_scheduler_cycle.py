@@ -0,0 +1,103 @@
+"""
+Unit tests for a repricing cycle's concurrency cap and per-store deadline
+"""
+import asyncio
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import User, Store, Product, OfferSnapshot, RepricingRunStore
+from app.services import scheduler
+
+
+def add_store(db, seller_id):
+    user = User(email=f"{seller_id.lower()}@repricelab.com")
+    db.add(user)
+    db.flush()
+    st = Store(user_id=user.id, selling_partner_id=seller_id, refresh_token="token", region="NA",
+               marketplace_ids="ATVPDKIKX0DER", store_name=seller_id)
+    db.add(st)
+    db.add_all([
+        Product(user_id=user.id, sku=f"{seller_id}-{i}", asin=f"{seller_id}-ASIN{i}", title="t", price=10.0,
+                min_price=5.0, max_price=30.0, repricing_enabled=True)
+        for i in range(3)
+    ])
+    db.commit()
+    return st
+
+
+class UnitSession(Session):
+    rolled_back = []
+
+    def rollback(self):
+        self.rolled_back.append(self)
+        super().rollback()
+
+
+def test_slow_store_is_cancelled_at_its_deadline_without_holding_up_the_others(db, monkeypatch):
+    monkeypatch.setattr(scheduler, "SessionLocal", lambda: UnitSession(bind=db.get_bind()))
+    monkeypatch.setattr(settings, "scheduler_store_concurrency", 2)
+    monkeypatch.setattr(settings, "scheduler_store_timeout_seconds", 0.2)
+    stores = [add_store(db, seller_id) for seller_id in ("SLOW", "FAST1", "FAST2", "FAST3")]
+    in_flight, peak = 0, 0
+    slow_session = None
+
+    async def fetch(client, is_real_client, products, marketplace_id, seller_id=None, pool=None):
+        nonlocal in_flight, peak, slow_session
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            if seller_id == "SLOW":
+                # Uncommitted work the deadline must roll back (unflushed: SQLite has a single writer)
+                products[0].price = 1.0
+                slow_session = Session.object_session(products[0])
+                await asyncio.sleep(60)
+            await asyncio.sleep(0.01)
+            return {
+                p.id: [{"seller_id": "RIVAL", "price": 15.0, "shipping": 0.0, "is_buybox": True}] for p in products
+            }, False
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(scheduler, "_fetch_store_offers", fetch)
+
+    asyncio.run(scheduler.run_cycle_async())
+
+    db.expire_all()
+    assert peak == 2
+    slow, fast = stores[0], stores[1:]
+    assert slow_session in UnitSession.rolled_back
+    assert [p.price for p in db.query(Product).filter(Product.user_id == slow.user_id)] == [10.0, 10.0, 10.0]
+    for st in fast:
+        product_ids = [p.id for p in db.query(Product).filter(Product.user_id == st.user_id)]
+        assert db.query(OfferSnapshot).filter(OfferSnapshot.product_id.in_(product_ids)).count() == 3
+    assert db.query(OfferSnapshot).count() == 9
+    run_stores = {row.store_id: row for row in db.query(RepricingRunStore)}
+    assert run_stores[slow.id].timed_out and run_stores[slow.id].products_processed == 0
+    assert all(not run_stores[st.id].timed_out and run_stores[st.id].products_processed == 3 for st in fast)
+
+
+def test_store_deadline_spans_all_of_its_units(db, monkeypatch):
+    monkeypatch.setattr(scheduler, "SessionLocal", lambda: UnitSession(bind=db.get_bind()))
+    monkeypatch.setattr(settings, "scheduler_store_concurrency", 1)
+    monkeypatch.setattr(settings, "scheduler_batch_size", 1)
+    monkeypatch.setattr(settings, "scheduler_store_timeout_seconds", 0.25)
+    st = add_store(db, "BATCHED")
+    fetched = []
+
+    async def fetch(client, is_real_client, products, marketplace_id, seller_id=None, pool=None):
+        # Each unit alone is well inside the deadline; the store's three together are not
+        await asyncio.sleep(0.15)
+        fetched.extend(p.id for p in products)
+        return {
+            p.id: [{"seller_id": "RIVAL", "price": 15.0, "shipping": 0.0, "is_buybox": True}] for p in products
+        }, False
+
+    monkeypatch.setattr(scheduler, "_fetch_store_offers", fetch)
+
+    asyncio.run(scheduler.run_cycle_async())
+
+    db.expire_all()
+    run_store = db.query(RepricingRunStore).filter(RepricingRunStore.store_id == st.id).one()
+    assert run_store.timed_out
+    assert len(fetched) == run_store.products_processed == 1
@@ -0,0 +1,157 @@
+"""
+Unit tests for the scheduler's bounded units of work
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import User, Store, Product, Notification, RepricingWorkItem, OfferSnapshot
+from app.services import scheduler, work_queue, pricing_core
+from app.services.repricing_engine import RepricingEngine
+from app.services.offer_snapshots import OfferSnapshotWriter
+
+NOW = datetime(2026, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def store(db):
+    user = User(email="persistence@repricelab.com")
+    db.add(user)
+    db.flush()
+    st = Store(user_id=user.id, selling_partner_id="SELLER", refresh_token="token", region="NA",
+               marketplace_ids="ATVPDKIKX0DER", store_name="Store")
+    db.add(st)
+    db.commit()
+    return st
+
+
+def test_due_candidates_reads_only_due_products_most_overdue_first(db, store):
+    db.add_all([
+        Product(user_id=store.user_id, sku="LATER", asin="LATER", title="t", price=1.0,
+                next_check_at=NOW + timedelta(minutes=5)),
+        Product(user_id=store.user_id, sku="RECENT", asin="RECENT", title="t", price=1.0,
+                next_check_at=NOW - timedelta(minutes=1)),
+        Product(user_id=store.user_id, sku="NEW", asin="NEW", title="t", price=1.0),
+        Product(user_id=store.user_id, sku="OLD", asin="OLD", title="t", price=1.0,
+                next_check_at=NOW - timedelta(minutes=30)),
+    ])
+    db.commit()
+
+    candidates = scheduler._due_candidates(db, store, NOW)
+
+    assert [c.asin for c in candidates] == ["NEW", "OLD", "RECENT"]
+
+
+def test_notifications_are_committed_per_chunk(db, store, monkeypatch):
+    monkeypatch.setattr(scheduler, "SessionLocal", lambda: Session(bind=db.get_bind()))
+    monkeypatch.setattr(scheduler, "NOTIFICATION_CHUNK", 2)
+    db.add_all([
+        Notification(user_id=store.user_id, type="BUYBOX_LOST", payload_json='{"n": %d}' % i, sent=False)
+        for i in range(5)
+    ])
+    db.commit()
+    sent = []
+
+    def send_email(to, subject, body):
+        if len(sent) == 3:
+            raise RuntimeError("SMTP down")
+        sent.append(body)
+
+    monkeypatch.setattr(scheduler, "send_email", send_email)
+
+    with pytest.raises(RuntimeError):
+        scheduler._dispatch_notifications()
+
+    db.expire_all()
+    assert [n.sent for n in db.query(Notification).order_by(Notification.id)] == [True, True, False, False, False]
+
+
+def test_unchanged_offers_skip_persist_compute_and_push(db, store, monkeypatch):
+    product = Product(user_id=store.user_id, sku="SKU", asin="ASIN", title="t", price=20.0,
+                      min_price=5.0, max_price=30.0, repricing_enabled=True)
+    db.add(product)
+    db.commit()
+    offers = [{"seller_id": "RIVAL", "price": 12.0, "shipping": 0.0, "is_buybox": True}]
+    computed = []
+    calculate = scheduler.RepricingEngine.calculate_optimal_price
+    monkeypatch.setattr(scheduler.RepricingEngine, "calculate_optimal_price",
+                        lambda self, **kw: computed.append(kw["product"].price) or calculate(self, **kw))
+
+    def apply():
+        stats = scheduler._empty_store_stats()
+        writer = OfferSnapshotWriter()
+        change = scheduler._apply_offers(db, store, product, offers, "ATVPDKIKX0DER", stats, writer)
+        writer.flush(db)
+        db.commit()
+        return change, stats
+
+    change, _ = apply()
+    assert change is not None and product.offer_fingerprint is None
+    product.price = change["new_price"]  # The push landed
+
+    change_after_push, stats = apply()
+    assert change_after_push is None and stats["products_unchanged"] == 0
+    assert product.offer_fingerprint is not None
+
+    _, stats = apply()
+    assert stats["products_unchanged"] == 1
+    assert computed == [20.0, change["new_price"]]
+
+    offers[0]["price"] = 11.0
+    _, stats = apply()
+    assert stats["products_unchanged"] == 0
+    assert len(computed) == 3
+
+
+def test_cancelled_worker_releases_its_item_and_propagates(db, store, monkeypatch):
+    monkeypatch.setattr(scheduler, "SessionLocal", lambda: Session(bind=db.get_bind()))
+    work_queue.enqueue(db, [(store.id, [1])])
+    [item] = work_queue.lease(db, "worker-a", 1)
+    started = asyncio.Event()
+
+    async def slow_item(*args):
+        started.set()
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(scheduler, "_work_item", slow_item)
+
+    async def run():
+        task = asyncio.create_task(scheduler._run_leased_item(item, "worker-a", None))
+        await started.wait()
+        task.cancel()
+        await task
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run())
+
+    db.expire_all()
+    released = db.get(RepricingWorkItem, item.id)
+    assert released.status == work_queue.PENDING
+    assert released.error_message == "cancelled"
+
+
+def test_scheduler_engine_and_flash_reprice_agree_on_a_stored_snapshot(db, store):
+    product = Product(user_id=store.user_id, sku="SKU", asin="ASIN", title="t", price=10.0,
+                      min_price=5.0, max_price=30.0, repricing_enabled=True, repricing_strategy="boost_sales")
+    db.add(product)
+    db.commit()
+    offers = [
+        {"seller_id": "SELLER", "price": 10.0, "shipping": 0.0, "is_buybox": True},
+        {"seller_id": "RIVAL", "price": 10.5, "shipping": 0.0, "is_buybox": False},
+    ]
+    writer = OfferSnapshotWriter()
+    change = scheduler._apply_offers(db, store, product, offers, "ATVPDKIKX0DER", scheduler._empty_store_stats(), writer)
+    writer.flush(db)
+    db.commit()
+
+    single = RepricingEngine(db).reprice_product(product, dry_run=True)
+    snapshot = db.get(OfferSnapshot, product.id)
+    flash = pricing_core.price_records([pricing_core.PricingRecord(
+        product.id, product.price, product.min_price, product.max_price, product.target_margin_percent,
+        product.repricing_strategy, product.lowest_competitor_price, snapshot.offers_packed
+    )])
+
+    assert change["new_price"] == single["new_price"] == flash.new_price[0] == 10.4
+    assert single["competitor_count"] == flash.competitor_count[0] == 1
@@ -0,0 +1,95 @@
+"""
+Unit tests for the per-store SP-API client cache and shared LWA access tokens
+"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import spapi_client_cache as cache_module
+from app.services.spapi_client_cache import SPAPIClientCache, SharedAccessTokenClient, LWATokenCache, lwa_token_cache
+
+CREDENTIALS = SimpleNamespace(lwa_app_id="APP", lwa_client_secret="SECRET", refresh_token=None)
+
+
+def make_store(store_id, refresh_token="RT1"):
+    return SimpleNamespace(
+        id=store_id, refresh_token=refresh_token, _encrypted_refresh_token=f"enc:{refresh_token}",
+        region="NA", selling_partner_id=f"SELLER{store_id}"
+    )
+
+
+@pytest.fixture
+def built(monkeypatch):
+    """Clients built by the cache, standing in for create_spapi_client"""
+    clients = []
+
+    def create_spapi_client(refresh_token, region, seller_id, auth_token_client_class=None):
+        client = SimpleNamespace(refresh_token=refresh_token, client_id="APP", seller_id=seller_id)
+        clients.append(client)
+        return client
+
+    monkeypatch.setattr(cache_module, "create_spapi_client", create_spapi_client)
+    lwa_token_cache.clear()
+    yield clients
+    lwa_token_cache.clear()
+
+
+def test_client_is_reused_until_the_store_reauthorises(built):
+    cache = SPAPIClientCache()
+    store = make_store(1)
+
+    first = cache.get(store)
+    assert cache.get(store) is first
+
+    old_key = LWATokenCache.key_for("RT1", "APP")
+    lwa_token_cache.get(old_key, lambda: {"access_token": "A", "expires_in": 3600})
+    store.refresh_token, store._encrypted_refresh_token = "RT2", "enc:RT2"
+    rebuilt = cache.get(store)
+
+    assert rebuilt is not first and rebuilt.refresh_token == "RT2"
+    assert old_key not in lwa_token_cache._tokens
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_evict_and_retain_drop_inactive_and_idle_stores(built, monkeypatch):
+    cache = SPAPIClientCache()
+    stores = [make_store(i, f"RT{i}") for i in (1, 2, 3)]
+    for store in stores:
+        cache.get(store)
+
+    cache.evict(1)
+    cache.retain([2])
+
+    assert cache.stats()["cached_clients"] == 1
+    kept = cache.get(stores[1])
+    assert cache.get(stores[1]) is kept
+
+    monkeypatch.setattr(cache_module, "CLIENT_IDLE_TTL_SECONDS", -1)
+    cache.retain([2])
+    assert cache.stats()["cached_clients"] == 0
+
+
+def test_api_objects_of_a_store_share_one_lwa_fetch(monkeypatch):
+    lwa_token_cache.clear()
+    fetched = []
+
+    def request(self, url, data, headers):
+        fetched.append(data["refresh_token"])
+        return {"access_token": f"token-{data['refresh_token']}", "expires_in": 3600, "token_type": "bearer"}
+
+    monkeypatch.setattr(SharedAccessTokenClient, "_request", request)
+    api_objects = [SharedAccessTokenClient(refresh_token="RT1", credentials=CREDENTIALS) for _ in range(6)]
+
+    tokens = []
+    threads = [threading.Thread(target=lambda c=c: tokens.append(c.get_auth().access_token)) for c in api_objects]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    other = SharedAccessTokenClient(refresh_token="RT2", credentials=CREDENTIALS).get_auth()
+
+    assert tokens == ["token-RT1"] * 6
+    assert other.access_token == "token-RT2"
+    assert fetched == ["RT1", "RT2"]
+    lwa_token_cache.clear()
@@ -0,0 +1,93 @@
+"""
+The SP-API client must not block the event loop while Amazon is slow to answer
+"""
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.services import amazon_spapi
+from app.services.amazon_spapi import AmazonSPAPIClient
+from app.services.rate_limiter import SPAPIRateLimiter
+
+SPAPI_LATENCY = 0.5
+
+
+class SlowResponse:
+    def __init__(self, payload):
+        self.payload = payload
+        self.headers = {}
+
+
+class SlowProductsApi:
+    """Stands in for python-amazon-sp-api: a blocking HTTP round-trip"""
+
+    def get_product_pricing_for_asins(self, asin_list, item_condition=None, MarketplaceId=None):
+        time.sleep(SPAPI_LATENCY)
+        return SlowResponse([{"ASIN": a, "status": "Success", "Product": {}} for a in asin_list])
+
+
+def make_client() -> AmazonSPAPIClient:
+    client = object.__new__(AmazonSPAPIClient)
+    client.selling_partner_id = "NONBLOCKING_SELLER"
+    client.rate_limit_key = "NONBLOCKING_SELLER"
+    client.products_api = SlowProductsApi()
+    return client
+
+
+def test_requests_are_served_while_spapi_call_in_flight(monkeypatch):
+    monkeypatch.setattr(amazon_spapi, "spapi_rate_limiter", SPAPIRateLimiter({"getPricing": (100.0, 10)}))
+    client = make_client()
+
+    app = FastAPI()
+
+    @app.get("/pricing")
+    async def pricing():
+        return await client.get_product_pricing("B000TEST01", "ATVPDKIKX0DER")
+
+    @app.get("/ping")
+    async def ping():
+        return {"pong": True}
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            start = time.monotonic()
+            pricing_task = asyncio.create_task(http.get("/pricing"))
+            await asyncio.sleep(0.05)  # let the SP-API call start
+
+            ping_latencies = []
+            for _ in range(5):
+                t0 = time.monotonic()
+                response = await http.get("/ping")
+                assert response.status_code == 200
+                ping_latencies.append(time.monotonic() - t0)
+
+            pings_done = time.monotonic() - start
+            pricing_response = await pricing_task
+            return pings_done, max(ping_latencies), pricing_response
+
+    pings_done, slowest_ping, pricing_response = asyncio.run(run())
+
+    assert pricing_response.json()["success"] is True
+    # Every ping was answered while the 0.5s SP-API call was still in flight
+    assert pings_done < SPAPI_LATENCY
+    assert slowest_ping < SPAPI_LATENCY / 2
+
+
+def test_concurrent_spapi_calls_overlap(monkeypatch):
+    monkeypatch.setattr(amazon_spapi, "spapi_rate_limiter", SPAPIRateLimiter({"getPricing": (100.0, 10)}))
+    client = make_client()
+
+    async def run():
+        start = time.monotonic()
+        results = await asyncio.gather(*(
+            client.get_product_pricing(f"B00000000{i}", "ATVPDKIKX0DER") for i in range(4)
+        ))
+        return time.monotonic() - start, results
+
+    elapsed, results = asyncio.run(run())
+
+    assert all(r["success"] for r in results)
+    assert elapsed < SPAPI_LATENCY * 2
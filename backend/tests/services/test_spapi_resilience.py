@@ -0,0 +1,204 @@
+"""
+Unit tests for SP-API retries and the per-store circuit breaker
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
+from sp_api.base.exceptions import SellingApiRequestThrottledException, SellingApiBadRequestException
+
+from app.config import settings
+from app.services import amazon_spapi
+from app.services.amazon_spapi import AmazonSPAPIClient
+from app.services.rate_limiter import SPAPIRateLimiter
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, store_breakers, OPEN, CLOSED, HALF_OPEN
+from app.services.run_log import counting_calls
+
+
+def make_client(seller_id: str) -> AmazonSPAPIClient:
+    """Client without real SP-API objects; tests call _call directly"""
+    client = object.__new__(AmazonSPAPIClient)
+    client.selling_partner_id = seller_id
+    client.rate_limit_key = seller_id
+    return client
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "spapi_retry_base_delay_seconds", 0.0)
+    monkeypatch.setattr(settings, "spapi_max_retries", 2)
+    monkeypatch.setattr(amazon_spapi, "spapi_rate_limiter", SPAPIRateLimiter({
+        op: (1000.0, 100) for op in ("getPricing", "createFeedDocument", "createFeed")
+    }))
+
+
+def test_breaker_opens_after_threshold_and_recovers():
+    breaker = CircuitBreaker("SELLER", failure_threshold=2, cooldown_seconds=0.05)
+
+    breaker.record_failure("boom")
+    assert breaker.state == CLOSED
+    breaker.record_failure("boom")
+    assert breaker.state == OPEN
+    assert breaker.trip_count == 1
+    assert not breaker.allow()
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.allow()  # trial call after cooldown
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_throttled_calls_are_retried():
+    client = make_client("RETRY_SELLER")
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise SellingApiRequestThrottledException([{"message": "QuotaExceeded", "code": "QuotaExceeded"}])
+        return "ok"
+
+    assert asyncio.run(client._call("getPricing", flaky)) == "ok"
+    assert len(calls) == 3
+    assert store_breakers.get("RETRY_SELLER").consecutive_failures == 0
+
+
+def test_calls_and_throttles_are_counted_for_the_work_unit():
+    client = make_client("COUNTED_SELLER")
+    calls = []
+    unit_stats = {}
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 2:
+            raise SellingApiRequestThrottledException([{"message": "QuotaExceeded", "code": "QuotaExceeded"}])
+        return "ok"
+
+    async def unit():
+        with counting_calls(unit_stats):
+            return await client._call("getPricing", flaky)
+
+    assert asyncio.run(unit()) == "ok"
+    assert unit_stats == {"spapi_calls": 2, "throttled_calls": 1}
+
+
+def test_client_errors_are_not_retried():
+    client = make_client("BAD_REQUEST_SELLER")
+    calls = []
+
+    def bad():
+        calls.append(1)
+        raise SellingApiBadRequestException([{"message": "Invalid ASIN", "code": "InvalidInput"}])
+
+    with pytest.raises(SellingApiBadRequestException):
+        asyncio.run(client._call("getPricing", bad))
+    assert len(calls) == 1
+    assert store_breakers.get("BAD_REQUEST_SELLER").consecutive_failures == 0
+
+
+def test_exhausted_retries_trip_the_store_circuit(monkeypatch):
+    monkeypatch.setattr(settings, "spapi_max_retries", 0)
+    client = make_client("DOWN_SELLER")
+    breaker = store_breakers.get("DOWN_SELLER")
+    monkeypatch.setattr(breaker, "failure_threshold", 2)
+
+    def down():
+        raise SellingApiRequestThrottledException([{"message": "QuotaExceeded", "code": "QuotaExceeded"}])
+
+    for _ in range(2):
+        with pytest.raises(SellingApiRequestThrottledException):
+            asyncio.run(client._call("getPricing", down))
+
+    assert client.is_circuit_open()
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(client._call("getPricing", down))
+
+
+def test_create_feed_is_only_retried_when_throttled():
+    client = make_client("FEED_SELLER")
+    calls = []
+
+    def timeout():
+        calls.append(1)
+        raise RequestsTimeout("read timed out")
+
+    with pytest.raises(RequestsTimeout):
+        asyncio.run(client._call("createFeed", timeout))
+    assert len(calls) == 1
+
+    def throttled_once():
+        calls.append(1)
+        if len(calls) < 3:
+            raise SellingApiRequestThrottledException([{"message": "QuotaExceeded", "code": "QuotaExceeded"}])
+        return "ok"
+
+    assert asyncio.run(client._call("createFeed", throttled_once)) == "ok"
+
+
+def test_retried_feed_upload_sends_the_whole_document():
+    client = make_client("UPLOAD_SELLER")
+    uploads = []
+
+    class FakeFeeds:
+        def create_feed_document(self, file, content_type):
+            uploads.append(file.read())
+            if len(uploads) == 1:
+                raise RequestsConnectionError("connection reset")
+            return SimpleNamespace(payload={"feedDocumentId": "DOC"})
+
+        def create_feed(self, feed_type, feed_document_id, marketplaceIds):
+            return SimpleNamespace(payload={"feedId": "FEED"})
+
+    client.feeds_api = FakeFeeds()
+    document = {"header": {"sellerId": "UPLOAD_SELLER"}, "messages": [{"messageId": 1}]}
+
+    result = asyncio.run(client.submit_listings_feed(document, "ATVPDKIKX0DER"))
+
+    assert result == {"success": True, "feed_id": "FEED", "feed_document_id": "DOC"}
+    assert len(uploads) == 2
+    assert uploads[1] == uploads[0] != b""
+
+
+def test_half_open_breaker_lets_one_trial_through_at_a_time():
+    breaker = CircuitBreaker("TRIAL_SELLER", failure_threshold=1, cooldown_seconds=0.05)
+    breaker.record_failure("boom")
+    assert breaker.is_open()
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert not breaker.is_open()
+    assert breaker.state == OPEN  # checking changed nothing
+
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    assert breaker.is_open()
+
+    breaker.release_trial()
+    assert breaker.allow()
+    breaker.record_failure("still down")
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_checking_the_circuit_does_not_take_the_trial_call(monkeypatch):
+    client = make_client("PROBED_SELLER")
+    breaker = store_breakers.get("PROBED_SELLER")
+    monkeypatch.setattr(breaker, "failure_threshold", 1)
+    monkeypatch.setattr(breaker, "cooldown_seconds", 0.05)
+    breaker.record_failure("boom")
+    asyncio.run(asyncio.sleep(0.06))
+
+    assert not client.is_circuit_open()
+    assert not client.is_circuit_open()
+
+    def bad():
+        raise SellingApiBadRequestException([{"message": "Invalid ASIN", "code": "InvalidInput"}])
+
+    # A client error ends the trial without closing or reopening the breaker
+    with pytest.raises(SellingApiBadRequestException):
+        asyncio.run(client._call("getPricing", bad))
+    assert breaker.state == HALF_OPEN and not client.is_circuit_open()
+
+    assert asyncio.run(client._call("getPricing", lambda: "ok")) == "ok"
+    assert breaker.state == CLOSED
@@ -0,0 +1,160 @@
+"""
+Identical concurrent SP-API reads share one in-flight call
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.services import amazon_spapi
+from app.services.amazon_spapi import AmazonSPAPIClient, SingleflightGroup
+from app.services.rate_limiter import SPAPIRateLimiter
+
+
+class Response:
+    def __init__(self, payload):
+        self.payload = payload
+        self.headers = {}
+
+
+class CountingProductsApi:
+    """Records every getPricing request; each takes long enough for callers to pile up"""
+
+    def __init__(self):
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get_product_pricing_for_asins(self, asin_list, item_condition=None, MarketplaceId=None):
+        with self._lock:
+            self.requests.append(list(asin_list))
+        threading.Event().wait(0.1)
+        return Response([{"ASIN": a, "status": "Success", "Product": {}} for a in asin_list])
+
+
+def make_client(seller_id: str) -> AmazonSPAPIClient:
+    client = object.__new__(AmazonSPAPIClient)
+    client.selling_partner_id = seller_id
+    client.rate_limit_key = seller_id
+    client.products_api = CountingProductsApi()
+    return client
+
+
+@pytest.fixture(autouse=True)
+def isolated_group(monkeypatch):
+    monkeypatch.setattr(amazon_spapi, "spapi_rate_limiter", SPAPIRateLimiter({"getPricing": (1000.0, 100)}))
+    monkeypatch.setattr(amazon_spapi, "spapi_singleflight", SingleflightGroup())
+
+
+def test_concurrent_identical_reads_share_one_call():
+    client = make_client("SF_SELLER")
+
+    async def run():
+        return await asyncio.gather(*(
+            client.get_product_pricing("B000SHARED", "ATVPDKIKX0DER") for _ in range(5)
+        ))
+
+    results = asyncio.run(run())
+
+    assert client.products_api.requests == [["B000SHARED"]]
+    assert all(r["success"] for r in results)
+    # Every caller gets its own result dict
+    assert len({id(r) for r in results}) == 5
+    assert amazon_spapi.spapi_singleflight.stats() == {"calls": 1, "calls_saved": 4, "in_flight": 0}
+
+
+def test_different_keys_and_sellers_are_not_shared():
+    first, second = make_client("SF_SELLER_A"), make_client("SF_SELLER_B")
+
+    async def run():
+        await asyncio.gather(
+            first.get_product_pricing("B000SHARED", "ATVPDKIKX0DER"),
+            first.get_product_pricing("B000SHARED", "ATVPDKIKX0DER", item_condition="Used"),
+            first.get_product_pricing("B000OTHER1", "ATVPDKIKX0DER"),
+            second.get_product_pricing("B000SHARED", "ATVPDKIKX0DER"),
+        )
+
+    asyncio.run(run())
+
+    assert len(first.products_api.requests) == 3
+    assert len(second.products_api.requests) == 1
+    assert amazon_spapi.spapi_singleflight.saved == 0
+
+
+def test_sequential_reads_are_not_cached():
+    client = make_client("SF_SELLER")
+
+    async def run():
+        await client.get_product_pricing("B000SHARED", "ATVPDKIKX0DER")
+        await client.get_product_pricing("B000SHARED", "ATVPDKIKX0DER")
+
+    asyncio.run(run())
+
+    assert len(client.products_api.requests) == 2
+
+
+def test_single_read_joins_asin_of_batch_in_flight():
+    client = make_client("SF_SELLER")
+    asins = [f"B00000000{i}" for i in range(3)]
+
+    async def run():
+        batch = asyncio.create_task(client.get_product_pricing_batch(asins, "ATVPDKIKX0DER"))
+        await asyncio.sleep(0.02)
+        single = await client.get_product_pricing("B000000001", "ATVPDKIKX0DER")
+        return await batch, single
+
+    batch, single = asyncio.run(run())
+
+    assert client.products_api.requests == [asins]
+    assert single["success"] and batch["B000000001"]["success"]
+
+
+def test_batch_waits_for_asins_in_flight_and_fetches_the_rest():
+    client = make_client("SF_SELLER")
+
+    async def run():
+        single = asyncio.create_task(client.get_product_pricing("B000000001", "ATVPDKIKX0DER"))
+        await asyncio.sleep(0.02)
+        batch = await client.get_product_pricing_batch(["B000000001", "B000000002"], "ATVPDKIKX0DER")
+        await single
+        return batch
+
+    batch = asyncio.run(run())
+
+    assert client.products_api.requests == [["B000000001"], ["B000000002"]]
+    assert set(batch) == {"B000000001", "B000000002"}
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    client = make_client("SF_SELLER")
+
+    async def run():
+        impatient = asyncio.create_task(client.get_product_pricing("B000SHARED", "ATVPDKIKX0DER"))
+        patient = asyncio.create_task(client.get_product_pricing("B000SHARED", "ATVPDKIKX0DER"))
+        await asyncio.sleep(0.02)
+        impatient.cancel()
+        return await patient
+
+    result = asyncio.run(run())
+
+    assert result["success"]
+    assert len(client.products_api.requests) == 1
+
+
+def test_released_batch_keys_are_fetched_by_waiters():
+    group = SingleflightGroup()
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        return {"success": True}
+
+    async def run():
+        owned, _ = group.claim(["KEY"])
+        waiter = asyncio.create_task(group.do("KEY", fetch))
+        await asyncio.sleep(0)
+        group.release(owned)
+        return await waiter
+
+    assert asyncio.run(run()) == {"success": True}
+    assert fetches == [1]
+    assert group.stats()["in_flight"] == 0
@@ -0,0 +1,73 @@
+"""
+Unit tests for leasing repricing work items across scheduler workers
+"""
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.models import RepricingWorkItem
+from app.services import work_queue
+
+
+def test_items_are_leased_once_in_dispatch_order(db):
+    work_queue.enqueue(db, [(1, [10, 11]), (2, [20]), (1, [12])])
+
+    first = work_queue.lease(db, "worker-a", 2)
+    second = work_queue.lease(db, "worker-b", 2)
+
+    assert [(item.store_id, item.product_ids) for item in first] == [(1, [10, 11]), (2, [20])]
+    assert [(item.store_id, item.product_ids) for item in second] == [(1, [12])]
+    assert work_queue.lease(db, "worker-c", 2) == []
+    assert work_queue.stores_with_open_work(db) == {1, 2}
+
+
+def test_expired_lease_is_taken_over_and_fences_the_old_owner(db):
+    work_queue.enqueue(db, [(1, [10])])
+    [item] = work_queue.lease(db, "worker-a", 1)
+
+    assert work_queue.heartbeat(db, item.id, "worker-a")
+    db.query(RepricingWorkItem).update({RepricingWorkItem.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+    [taken] = work_queue.lease(db, "worker-b", 1)
+
+    assert taken.id == item.id
+    assert taken.attempts == 2
+    assert not work_queue.heartbeat(db, item.id, "worker-a")
+    work_queue.finish(db, item.id, "worker-a")
+    assert db.get(RepricingWorkItem, item.id).status == work_queue.LEASED
+    work_queue.finish(db, item.id, "worker-b")
+    db.expire_all()
+    assert db.get(RepricingWorkItem, item.id).status == work_queue.DONE
+    assert work_queue.stores_with_open_work(db) == set()
+
+
+def test_failed_item_is_retried_until_attempts_run_out(db, monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_max_attempts", 2)
+    work_queue.enqueue(db, [(1, [10])])
+
+    [item] = work_queue.lease(db, "worker-a", 1)
+    work_queue.finish(db, item.id, "worker-a", "boom")
+    [retry] = work_queue.lease(db, "worker-b", 1)
+    work_queue.finish(db, retry.id, "worker-b", "boom again")
+
+    db.expire_all()
+    failed = db.get(RepricingWorkItem, item.id)
+    assert failed.status == work_queue.FAILED
+    assert failed.error_message == "boom again"
+    assert work_queue.lease(db, "worker-c", 1) == []
+
+
+def test_expired_lease_on_last_attempt_is_failed(db, monkeypatch):
+    monkeypatch.setattr(settings, "scheduler_max_attempts", 1)
+    work_queue.enqueue(db, [(1, [10])])
+    [item] = work_queue.lease(db, "worker-a", 1)
+    db.query(RepricingWorkItem).update({RepricingWorkItem.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+    assert work_queue.lease(db, "worker-b", 1) == []
+
+    db.expire_all()
+    failed = db.get(RepricingWorkItem, item.id)
+    assert failed.status == work_queue.FAILED
+    assert failed.lease_owner is None
+    assert work_queue.stores_with_open_work(db) == set()